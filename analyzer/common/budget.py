@@ -0,0 +1,196 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import time
+import ctypes
+import resource
+import threading
+
+# state of the budget being watched in each thread
+_local = threading.local()
+
+
+class BudgetExceeded(BaseException):
+    """
+    raised in a task that exceeds its execution budget
+    derived from BaseException, like KeyboardInterrupt, so that the `except Exception` clauses of the analysis methods
+    do not turn it into an ordinary failure
+    """
+
+    def __init__(self, reason=None):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def get_memory_usage():
+    """
+    get the resident memory of the process
+    :return: resident memory in MB, or the peak resident memory if the current one is not available
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ExecutionBudget:
+    """
+    execution budget of analysis tasks: a wall-clock timeout, a memory limit and a cancellation token
+    one budget can be shared by several tasks, e.g., to cancel all tasks of a batch at once
+    """
+
+    def __init__(self, timeout=None, max_memory=None, check_interval=0.05):
+        """
+        :param timeout: (optional) wall-clock time limit in seconds, counted from the first `watch`
+        :param max_memory: (optional) limit of the resident memory of the process in MB
+        :param check_interval: seconds between two checks of the budget by the watchdog
+        """
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self.check_interval = check_interval
+        self.start_time = None
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """
+        cancel all tasks performed under this budget
+        """
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def get_violation(self):
+        """
+        :return: the reason why the budget is exceeded, i.e., 'cancelled', 'timeout' or 'memory limit', or None
+        """
+        if self._cancelled.is_set():
+            return 'cancelled'
+        if self.timeout is not None and self.start_time is not None and \
+                time.time() - self.start_time > self.timeout:
+            return 'timeout'
+        if self.max_memory is not None and get_memory_usage() > self.max_memory:
+            return 'memory limit'
+        return None
+
+    def watch(self, interrupt=True):
+        """
+        watch the current thread under this budget
+        :param interrupt: True to also raise BudgetExceeded asynchronously in the thread when the budget is exceeded, so
+                that code that never calls `checkpoint`, e.g., NetworkX algorithms, is stopped as well
+        :return: a context manager
+        """
+        if self.start_time is None:
+            self.start_time = time.time()
+        return _Watch(self, interrupt)
+
+
+class _Watch:
+    """
+    watchdog of one thread performing a task under a budget
+    """
+
+    def __init__(self, budget, interrupt):
+        self.budget = budget
+        self.interrupt = interrupt and hasattr(ctypes, 'pythonapi')
+        self.thread_id = None
+        self.stopped = None  # reason why the task was stopped
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._injected = False
+        self._watchdog = None
+
+    def _set_async_exception(self, exception):
+        ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self.thread_id),
+                                                   ctypes.py_object(exception) if exception else None)
+
+    def _run(self):
+        while not self._done.wait(self.budget.check_interval):
+            reason = self.budget.get_violation()
+            if reason is not None:
+                with self._lock:
+                    if self._done.is_set():
+                        return
+                    self.stopped = reason
+                    if self.interrupt:
+                        self._set_async_exception(BudgetExceeded)
+                        self._injected = True
+                return
+
+    def __enter__(self):
+        self.thread_id = threading.get_ident()
+        self._previous = getattr(_local, 'watch', None)
+        _local.watch = self
+        self._watchdog = threading.Thread(target=self._run, daemon=True)
+        self._watchdog.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._lock:
+            self._done.set()
+            if self._injected and exc_type is None:
+                # the exception may still be pending if the task finished right after the injection
+                self._set_async_exception(None)
+        self._watchdog.join()
+        _local.watch = self._previous
+        if exc_type is not None and issubclass(exc_type, BudgetExceeded):
+            if self.stopped is None:
+                self.stopped = exc_value.reason if exc_value is not None else None
+        return False
+
+
+def checkpoint():
+    """
+    check the budget of the current thread, to be called in long loops of the analysis methods
+    methods that can return a partial result catch BudgetExceeded and stop the loop, others let it propagate
+    :return:
+    """
+    watch = getattr(_local, 'watch', None)
+    if watch is not None and watch.stopped is not None:
+        raise BudgetExceeded(watch.stopped)
+
+
+def get_budget(params):
+    """
+    get the execution budget of a task from its params, the budget can be given either as an ExecutionBudget under key
+    'budget', or by its limits under keys 'timeout' (seconds) and 'max_memory' (MB)
+    :param params: params of `InMemoryAnalyzer.perform_analysis`
+    :return: ExecutionBudget or None
+    """
+    if not params:
+        return None
+    if params.get('budget') is not None:
+        return params['budget']
+    if params.get('timeout') is not None or params.get('max_memory') is not None:
+        return ExecutionBudget(timeout=params.get('timeout'), max_memory=params.get('max_memory'))
+    return None
@@ -29,8 +29,16 @@ ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
 SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 ==============================================================================
 """
+import time
+import threading
+import functools
 import networkx as nx
 from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import LinearOperator
+from analyzer.common import tracing
+
+# active SharedConversions, converters look up the network they are called on in these
+_shared_conversions = []
 
 def is_valid(edge, params):
     """
@@ -57,7 +65,134 @@ def is_valid(edge, params):
     return True
 
 
+class SharedConversions:
+    """
+    context in which the conversions of a network are computed once and reused by all callers, including callers in other
+    threads, e.g., by the tasks of a batch that run on the same network
+    conversions are shared regardless of `params`, as `is_valid` does not filter edges by them
+    the converted graphs and matrices are shared, callers must not modify them
+    """
+
+    def __init__(self, network):
+        """
+        :param network: the network whose conversions are shared
+        """
+        self.network = network
+        self.results = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+        self.conversion_time = 0.0
+        self.num_conversions = 0
+        self.num_reuses = 0
+
+    def get(self, convert, network, params):
+        """
+        get the result of `convert`, computing it if it is the first call
+        """
+        name = convert.__name__
+        with self.lock:
+            if name not in self.locks:
+                self.locks[name] = threading.Lock()
+            lock = self.locks[name]
+        with lock:
+            if name in self.results:
+                self.num_reuses += 1
+            else:
+                start = time.time()
+                self.results[name] = convert(network, params)
+                self.conversion_time += time.time() - start
+                self.num_conversions += 1
+        return self.results[name]
+
+    def get_stats(self):
+        """
+        :return: dictionary of the number of computed and reused conversions and the time spent in computing them
+        """
+        return {'conversions': self.num_conversions, 'reuses': self.num_reuses, 'time': self.conversion_time}
+
+    def __enter__(self):
+        _shared_conversions.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _shared_conversions.remove(self)
+        self.results = {}
+
+
+def shareable(convert):
+    """
+    decorator for converters whose results are shared within a SharedConversions context, each call is traced as a
+    'conversion' span with the number of nodes and edges of the result
+    """
+    @functools.wraps(convert)
+    def wrapper(network, params=None):
+        with tracing.span('conversion', converter=convert.__name__) as current:
+            result = None
+            for shared in _shared_conversions:
+                if shared.network is network:
+                    result = shared.get(convert, network, params)
+                    current.set(shared=True)
+                    break
+            if result is None:
+                result = convert(network, params)
+            converted, node_ids = result
+            current.set(nodes=len(node_ids),
+                        edges=converted.nnz if hasattr(converted, 'nnz') else converted.number_of_edges())
+        return result
+    return wrapper
+
+
+class CSRNetwork:
+    """
+    network given by the arrays of its edges instead of an edge list, e.g., as resolved from a dataset by
+    `DataManager.get_csr_view`, so that the converters build graphs and matrices directly from the arrays
+    the edges are already selected by the data manager, `is_valid` is not applied to them
+    methods that read the edge list get edge dictionaries, which are built on first access
+    """
+
+    def __init__(self, rows, cols, weights, node_ids):
+        """
+        :param rows: array, rows[i] is the index of the source node of edge i
+        :param cols: array, cols[i] is the index of the target node of edge i
+        :param weights: array, weights[i] is the weight of edge i
+        :param node_ids: list, node_ids[j] is the id of node j
+        """
+        self.rows = rows
+        self.cols = cols
+        self.weights = weights
+        self.node_ids = node_ids
+        self._edges = None
+
+    @classmethod
+    def from_view(cls, view):
+        """
+        :param view: dictionary returned by `DataManager.get_csr_view`
+        :return: CSRNetwork
+        """
+        return cls(view['rows'], view['cols'], view['weights'], view['node_ids'])
+
+    def get_edges(self):
+        if self._edges is None:
+            node_ids = self.node_ids
+            self._edges = [{'source': node_ids[u], 'target': node_ids[v], 'properties': {'weight': w}}
+                           for u, v, w in zip(self.rows.tolist(), self.cols.tolist(), self.weights.tolist())]
+        return self._edges
+
+    def get(self, key, default=None):
+        if key == 'edges':
+            return self.get_edges()
+        return default
+
+    def __getitem__(self, key):
+        if key == 'edges':
+            return self.get_edges()
+        raise KeyError(key)
+
+
 def get_edges_and_node_ids(network, params):
+    if isinstance(network, CSRNetwork):
+        return list(zip(network.rows.tolist(), network.cols.tolist())), list(network.node_ids)
+
     nodes = {}
     edges = []
     node_ids = []
@@ -87,6 +222,7 @@ def get_edges_and_node_ids(network, params):
     return edges, node_ids
 
 
+@shareable
 def convert_to_nx_undirected_graph(network, params=None):
     """
     convert a undirected network in edge list format into `networkx` network
@@ -119,6 +255,7 @@ def convert_to_nx_undirected_graph(network, params=None):
     return graph, node_ids
 
 
+@shareable
 def convert_to_nx_directed_graph(network, params=None):
     """
     convert a directed network in edge list format into `networkx` network
@@ -150,6 +287,7 @@ def convert_to_nx_directed_graph(network, params=None):
     graph.add_edges_from(edges)
     return graph, node_ids
 
+@shareable
 def convert_to_csr_sparse_matrix(network, params=None):
     """
     convert a network in edge list format into scipy  csr_sparse matrix
@@ -175,6 +313,11 @@ def convert_to_csr_sparse_matrix(network, params=None):
         matrix: scipy csr_sparse matrix
         node_ids: ids of nodes in input matrix, i.e., node_ids[i] is original id node i of nx_network
     """
+    if isinstance(network, CSRNetwork):
+        num_nodes = len(network.node_ids)
+        matrix = csr_matrix((network.weights, (network.rows, network.cols)), shape=(num_nodes, num_nodes), dtype=float)
+        return matrix, list(network.node_ids)
+
     nodes = {}
     node_ids = []
     rows = []
@@ -208,6 +351,24 @@ def convert_to_csr_sparse_matrix(network, params=None):
             cols.append(target_index)
             weights.append(weight)
 
-    matrix = csr_matrix((weights, (rows, cols)))
-    matrix = matrix.asfptype()
+    matrix = csr_matrix((weights, (rows, cols)), shape=(len(node_ids), len(node_ids)), dtype=float)
     return matrix, node_ids
+
+
+def higher_order_proximity(matrix, as_operator=False):
+    """
+    get the second-order proximity matrix A + A^2 of an adjacency matrix A
+    :param matrix: scipy csr_sparse matrix A
+    :param as_operator: True to return a LinearOperator that only computes products with A + A^2 from products with A,
+            so that A^2 is never formed, False to return A + A^2 as a scipy csr_sparse matrix
+    :return: LinearOperator or scipy csr_sparse matrix
+    """
+    if not as_operator:
+        return (matrix + matrix @ matrix).tocsr()
+    transposed = matrix.T.tocsr()
+    return LinearOperator(matrix.shape,
+                          matvec=lambda x: matrix @ x + matrix @ (matrix @ x),
+                          rmatvec=lambda x: transposed @ x + transposed @ (transposed @ x),
+                          matmat=lambda x: matrix @ x + matrix @ (matrix @ x),
+                          rmatmat=lambda x: transposed @ x + transposed @ (transposed @ x),
+                          dtype=matrix.dtype)
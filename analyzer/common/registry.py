@@ -0,0 +1,85 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import time
+import importlib
+
+
+class LazyRegistry(object):
+    """
+    registry of objects that are imported only when they are looked up for the first time, so that heavyweight
+    backends (TensorFlow, gensim, sklearn, ...) are not loaded before a task that needs them is dispatched
+    """
+
+    def __init__(self, entries=None):
+        """
+        :param entries: dictionary, keys are names, values are import paths in the form 'package.module:attribute'
+        """
+        self.entries = dict(entries) if entries else {}
+        self.loaded = {}
+        self.load_times = {}  # seconds spent in importing each loaded entry
+
+    def register(self, name, path):
+        """
+        register an import path under `name`, replacing the previous one if any
+        :param name:
+        :param path: import path in the form 'package.module:attribute'
+        :return:
+        """
+        self.entries[name] = path
+        self.loaded.pop(name, None)
+        self.load_times.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def keys(self):
+        return self.entries.keys()
+
+    def is_loaded(self, name):
+        return name in self.loaded
+
+    def get(self, name):
+        """
+        get the object registered under `name`, importing its module on the first lookup
+        :param name:
+        :return: the object
+        """
+        if name not in self.loaded:
+            module_name, attribute = self.entries[name].split(':')
+            start = time.time()
+            module = importlib.import_module(module_name)
+            self.loaded[name] = getattr(module, attribute)
+            self.load_times[name] = time.time() - start
+        return self.loaded[name]
+
+    def __getitem__(self, name):
+        return self.get(name)
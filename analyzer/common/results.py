@@ -0,0 +1,174 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import threading
+from contextlib import contextmanager
+import numpy as np
+
+# format of the results of the task being performed in each thread
+_local = threading.local()
+
+
+@contextmanager
+def result_format(name):
+    """
+    make the analysis methods performed in the current thread return their results in the given format
+    :param name: 'dict' for dictionaries keyed by node id, or 'arrays' for NumPy arrays aligned with an array of node
+        ids, which skips building a Python object per node
+    """
+    previous = getattr(_local, 'format', 'dict')
+    _local.format = name or 'dict'
+    try:
+        yield
+    finally:
+        _local.format = previous
+
+
+def wants_arrays():
+    """
+    :return: True if the results are to be returned as arrays in the current thread
+    """
+    return getattr(_local, 'format', 'dict') == 'arrays'
+
+
+def node_scores(node_ids, values):
+    """
+    format the scores of nodes, e.g., their centralities
+    :param node_ids: list of node ids
+    :param values: scores of the nodes, aligned with `node_ids`
+    :return: result fields, {'scores': {node id: score}}, or, as arrays,
+        {'node_ids': array of node ids, 'scores': float array}
+    """
+    if wants_arrays():
+        return {'node_ids': np.asarray(node_ids),
+                'scores': np.asarray(values, dtype=np.float64).reshape(len(node_ids))}
+    return {'scores': dict(zip(node_ids, values))}
+
+
+def community_labels(node_ids, members, labels, num_communities):
+    """
+    format communities as arrays of (node, community) pairs, a node appears in as many pairs as communities it belongs
+    to, or in none if it is not in any community
+    :param node_ids: list of node ids
+    :param members: index of the node of each pair in `node_ids`
+    :param labels: community of each pair
+    :param num_communities: number of communities
+    :return: result fields {'node_ids': array of node ids, 'labels': int array, 'confidences': float array,
+        'num_communities': int}
+    """
+    members = np.asarray(members, dtype=np.int64)
+    return {'node_ids': np.asarray(node_ids)[members],
+            'labels': np.asarray(labels, dtype=np.int64),
+            'confidences': np.ones(len(members)),
+            'num_communities': int(num_communities)}
+
+
+def min_max_scale(values, value_range=(0, 1)):
+    """
+    map values to the given range with min-max feature scaling
+    :param values: array of numbers
+    :param value_range: tuple defining the new range of values
+    :return: float array, all at the lower bound of the range if the values are all equal
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return values
+    low, high = values.min(), values.max()
+    if high == low:
+        return np.full(len(values), float(value_range[0]))
+    return value_range[0] + (values - low) * ((value_range[1] - value_range[0]) / (high - low))
+
+
+def equal_width_bins(values, num_bins):
+    """
+    assign values to equal-width bins between their minimum and maximum
+    :param values: array of numbers
+    :param num_bins: number of bins
+    :return: int array of bins, from 0 to `num_bins` - 1
+    """
+    scaled = min_max_scale(values, (0, num_bins))
+    return np.minimum(scaled.astype(np.int64), num_bins - 1)
+
+
+def scale_scores(result, value_range=None, num_bins=None):
+    """
+    add the scaled scores and/or the bins of the scores to a result with 'scores', in the format of the result
+    :param result: result of an analysis method
+    :param value_range: (optional) range to map the scores to, added as 'scaled_scores'
+    :param num_bins: (optional) number of equal-width bins, the bins of scores are added as 'score_bins'
+    :return: the result
+    """
+    scores = result.get('scores')
+    if scores is None:
+        return result
+    as_arrays = isinstance(scores, np.ndarray)
+    if as_arrays:
+        values = scores
+    else:
+        node_ids = list(scores)
+        values = np.fromiter(scores.values(), dtype=np.float64, count=len(node_ids))
+    fields = {}
+    if value_range is not None:
+        fields['scaled_scores'] = min_max_scale(values, value_range)
+    if num_bins:
+        fields['score_bins'] = equal_width_bins(values, num_bins)
+    for key, value in fields.items():
+        result[key] = value if as_arrays else dict(zip(node_ids, value.tolist()))
+    return result
+
+
+def to_dict(result):
+    """
+    convert a result in arrays format to the dictionaries keyed by node id the analysis methods return by default,
+    e.g., at the API boundary
+    :param result: result of an analysis method, in either format
+    :return: the result in dictionaries format
+    """
+    node_ids = result.get('node_ids')
+    if not isinstance(node_ids, np.ndarray):
+        return result
+    converted = dict(result)
+    del converted['node_ids']
+    node_ids = node_ids.tolist()
+    if 'labels' in result:
+        communities = [{} for _ in range(result['num_communities'])]
+        membership = {}
+        for nid, c, m in zip(node_ids, result['labels'].tolist(), result['confidences'].tolist()):
+            communities[c][nid] = m
+            membership.setdefault(nid, {})[c] = m
+        converted['communities'] = communities
+        converted['membership'] = membership
+        for key in ['labels', 'confidences', 'num_communities']:
+            del converted[key]
+    for key in ['scores', 'scaled_scores', 'score_bins']:
+        if key in result:
+            converted[key] = dict(zip(node_ids, result[key].tolist()))
+    return converted
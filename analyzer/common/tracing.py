@@ -0,0 +1,200 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+# tracer of the task being performed in each thread
+_local = threading.local()
+
+
+class Span:
+    """
+    a timed phase of a task, e.g., 'conversion', 'compute' or 'serialisation'
+    """
+    __slots__ = ('name', 'start', 'duration', 'self_duration', 'thread', 'depth', 'args')
+
+    def __init__(self, name, args, depth):
+        self.name = name
+        self.start = time.time()
+        self.duration = 0.0
+        self.self_duration = 0.0  # duration excluding the nested spans
+        self.thread = threading.get_ident()
+        self.depth = depth
+        self.args = args
+
+    def set(self, **args):
+        """
+        attach information to the span, e.g., the number of nodes and edges processed
+        """
+        self.args.update(args)
+
+    def to_dict(self):
+        return {'name': self.name, 'start': self.start, 'duration': self.duration,
+                'self_duration': self.self_duration, 'thread': self.thread, 'depth': self.depth, 'args': self.args}
+
+
+class _NullSpan:
+    """
+    span returned when no tracer is active, ignores everything
+    """
+
+    def set(self, **args):
+        pass
+
+
+_null_span = _NullSpan()
+
+
+class Tracer:
+    """
+    collects the spans of the tasks performed in the current thread while it is active
+    when it is deactivated, the spans are also added to the process-wide `counters`
+    """
+
+    def __init__(self, **labels):
+        """
+        :param labels: labels of the counters of the spans, e.g., task_id='community_detection', method='modularity'
+        """
+        self.labels = labels
+        self.spans = []
+        self._stack = []
+
+    def __enter__(self):
+        self._previous = getattr(_local, 'tracer', None)
+        _local.tracer = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.tracer = self._previous
+        counters.add(self.labels, self.spans)
+        return False
+
+    def get_spans(self):
+        """
+        :return: list of spans as dictionaries, in the order they were started
+        """
+        return [s.to_dict() for s in sorted(self.spans, key=lambda s: s.start)]
+
+
+@contextmanager
+def span(name, **args):
+    """
+    time a phase of the current task, spans can be nested
+    does nothing but yielding a dummy span if no tracer is active in the current thread
+    :param name: name of the phase
+    :param args: information attached to the span
+    :return: the span, whose `set` attaches more information
+    """
+    tracer = getattr(_local, 'tracer', None)
+    if tracer is None:
+        yield _null_span
+        return
+    current = Span(name, args, len(tracer._stack))
+    tracer._stack.append(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.duration = time.perf_counter() - start
+        current.self_duration += current.duration
+        tracer._stack.pop()
+        if tracer._stack:
+            tracer._stack[-1].self_duration -= current.duration
+        tracer.spans.append(current)
+
+
+class Counters:
+    """
+    process-wide counters of the spans of all traced tasks, exported in the Prometheus text format
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def add(self, labels, spans):
+        """
+        add the spans of a task
+        :param labels: dictionary of labels of the task
+        :param spans: list of Span
+        """
+        with self.lock:
+            for s in spans:
+                key = tuple(sorted(labels.items())) + (('phase', s.name),)
+                values = self.values.setdefault(key, {'seconds': 0.0, 'count': 0, 'nodes': 0, 'edges': 0})
+                values['seconds'] += s.self_duration
+                values['count'] += 1
+                values['nodes'] += s.args.get('nodes', 0)
+                values['edges'] += s.args.get('edges', 0)
+
+    def reset(self):
+        with self.lock:
+            self.values = {}
+
+    def to_prometheus(self, prefix='analyzer'):
+        """
+        :param prefix: prefix of the metric names
+        :return: string in the Prometheus text exposition format, the seconds of a phase exclude its nested phases
+        """
+        metrics = [('phase_seconds_total', 'seconds', 'Time spent in the phase, excluding nested phases'),
+                   ('phase_count_total', 'count', 'Number of times the phase was performed'),
+                   ('phase_nodes_total', 'nodes', 'Number of nodes processed in the phase'),
+                   ('phase_edges_total', 'edges', 'Number of edges processed in the phase')]
+        with self.lock:
+            items = sorted(self.values.items())
+        lines = []
+        for name, field, description in metrics:
+            lines.append('# HELP %s_%s %s' % (prefix, name, description))
+            lines.append('# TYPE %s_%s counter' % (prefix, name))
+            for key, values in items:
+                labels = ','.join(['%s="%s"' % (k, str(v).replace('"', '\\"')) for k, v in key])
+                lines.append('%s_%s{%s} %s' % (prefix, name, labels, repr(values[field])))
+        return '\n'.join(lines) + '\n'
+
+
+counters = Counters()
+
+
+def to_chrome_trace(spans, pid=None):
+    """
+    convert spans to the Chrome trace event format, to be viewed in chrome://tracing or Perfetto
+    :param spans: list of spans as dictionaries, e.g., result['trace'] of a traced task
+    :param pid: (optional) process id shown in the trace, the current process by default
+    :return: dictionary, to be dumped as JSON
+    """
+    if pid is None:
+        pid = os.getpid()
+    events = [{'name': s['name'], 'ph': 'X', 'ts': s['start'] * 1e6, 'dur': s['duration'] * 1e6,
+               'pid': pid, 'tid': s['thread'], 'args': s['args']} for s in spans]
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
@@ -34,8 +34,7 @@ import os
 import itertools
 import networkx.algorithms.community as methods
 import networkx
-from sklearn.cluster import SpectralClustering
-from sklearn.cluster import AgglomerativeClustering
+import numpy as np
 
 # find path to root directory of the project so as to import from other packages
 tokens = os.path.abspath(__file__).split('/')
@@ -46,20 +45,36 @@ if path2root not in sys.path:
     sys.path.append(path2root)
 
 import analyzer.common.helpers as helpers
+from analyzer.common.budget import BudgetExceeded, checkpoint
+from analyzer.common import tracing
+from analyzer.common import results
+from analyzer.common.registry import LazyRegistry
+
+# sklearn is imported only when a clustering based method is performed
+backends = LazyRegistry({
+    'SpectralClustering': 'sklearn.cluster:SpectralClustering',
+    'AgglomerativeClustering': 'sklearn.cluster:AgglomerativeClustering'
+})
 
 
 def _generate_communities_and_membership(nx_communities, node_ids):
-    communities = []
-    membership = {}
-    for c in range(len(nx_communities)):
-        for u in nx_communities[c]:
-            nid = node_ids[u]
-            if nid in membership:
-                membership[nid][c] = 1.0
-            else:
-                membership[nid] = {c: 1.0}
-        communities.append(dict([(node_ids[u], 1.0) for u in nx_communities[c]]))
-    return communities, membership
+    with tracing.span('serialisation', nodes=len(node_ids), communities=len(nx_communities)):
+        if results.wants_arrays():
+            nx_communities = [list(c) for c in nx_communities]
+            members = [u for c in nx_communities for u in c]
+            labels = np.repeat(np.arange(len(nx_communities)), [len(c) for c in nx_communities])
+            return results.community_labels(node_ids, members, labels, len(nx_communities))
+        communities = []
+        membership = {}
+        for c in range(len(nx_communities)):
+            for u in nx_communities[c]:
+                nid = node_ids[u]
+                if nid in membership:
+                    membership[nid][c] = 1.0
+                else:
+                    membership[nid] = {c: 1.0}
+            communities.append(dict([(node_ids[u], 1.0) for u in nx_communities[c]]))
+    return {'communities': communities, 'membership': membership}
 
 
 def k_clique_communities(network, params):
@@ -83,10 +98,16 @@ def k_clique_communities(network, params):
             k = params['K']
         except KeyError:
             k = 3
-        nx_comms = list(methods.k_clique_communities(graph, k))
-        communities, membership = _generate_communities_and_membership(nx_comms, node_ids)
-        result = {'success': 1, 'message': 'the task is performed successfully', 'communities': communities,
-                  'membership': membership}
+        nx_comms = []
+        try:
+            for community in methods.k_clique_communities(graph, k):
+                nx_comms.append(community)
+                checkpoint()
+        except BudgetExceeded:
+            # out of budget, the communities found so far are returned
+            pass
+        fields = _generate_communities_and_membership(nx_comms, node_ids)
+        result = {'success': 1, 'message': 'the task is performed successfully', **fields}
         return result
     except Exception as e:
         print(e)
@@ -112,9 +133,8 @@ def greedy_modularity_communities(network, params):
     try:
         graph, node_ids = helpers.convert_to_nx_undirected_graph(network)
         nx_comms = list(methods.greedy_modularity_communities(graph))
-        communities, membership = _generate_communities_and_membership(nx_comms, node_ids)
-        result = {'success': 1, 'message': 'the task is performed successfully', 'communities': communities,
-                  'membership': membership}
+        fields = _generate_communities_and_membership(nx_comms, node_ids)
+        result = {'success': 1, 'message': 'the task is performed successfully', **fields}
         return result
     except Exception as e:
         print(e)
@@ -140,9 +160,8 @@ def asyn_lpa_communities(network, params):
     try:
         graph, node_ids = helpers.convert_to_nx_directed_graph(network)
         nx_comms = list(methods.asyn_lpa_communities(graph))
-        communities, membership = _generate_communities_and_membership(nx_comms, node_ids)
-        result = {'success': 1, 'message': 'the task is performed successfully', 'communities': communities,
-                  'membership': membership}
+        fields = _generate_communities_and_membership(nx_comms, node_ids)
+        result = {'success': 1, 'message': 'the task is performed successfully', **fields}
         return result
     except Exception as e:
         print(e)
@@ -168,9 +187,8 @@ def label_propagation_communities(network, params):
     try:
         graph, node_ids = helpers.convert_to_nx_undirected_graph(network)
         nx_comms = list(methods.label_propagation_communities(graph))
-        communities, membership = _generate_communities_and_membership(nx_comms, node_ids)
-        result = {'success': 1, 'message': 'the task is performed successfully', 'communities': communities,
-                  'membership': membership}
+        fields = _generate_communities_and_membership(nx_comms, node_ids)
+        result = {'success': 1, 'message': 'the task is performed successfully', **fields}
         return result
     except Exception as e:
         print(e)
@@ -196,9 +214,8 @@ def kernighan_lin_bipartition(network, params):
     try:
         graph, node_ids = helpers.convert_to_nx_undirected_graph(network)
         nx_comms = list(methods.kernighan_lin_bisection(graph))
-        communities, membership = _generate_communities_and_membership(nx_comms, node_ids)
-        result = {'success': 1, 'message': 'the task is performed successfully', 'communities': communities,
-                  'membership': membership}
+        fields = _generate_communities_and_membership(nx_comms, node_ids)
+        result = {'success': 1, 'message': 'the task is performed successfully', **fields}
         return result
     except Exception as e:
         print(e)
@@ -231,18 +248,22 @@ def spectral_communities(network, params):
             k = 3
 
         adj_matrix = networkx.adjacency_matrix(graph)
-        clustering = SpectralClustering(n_clusters=k, assign_labels="discretize", random_state=0).fit(adj_matrix)
+        clustering = backends['SpectralClustering'](n_clusters=k, assign_labels="discretize", random_state=0).fit(adj_matrix)
         # print(clustering.labels_)
-        communities = [{}] * k
-        membership = {}
-        for u in range(len(clustering.labels_)):
-            c = clustering.labels_[u]
-            nid = node_ids[u]
-            if nid in membership:
-                membership[nid][c] = 1.0
-            else:
-                membership[nid] = {c: 1.0}
-            communities[c][nid] = 1.0
+        with tracing.span('serialisation', nodes=len(node_ids)):
+            if results.wants_arrays():
+                fields = results.community_labels(node_ids, np.arange(len(clustering.labels_)), clustering.labels_, k)
+                return {'success': 1, 'message': 'the task is performed successfully', **fields}
+            communities = [{}] * k
+            membership = {}
+            for u in range(len(clustering.labels_)):
+                c = clustering.labels_[u]
+                nid = node_ids[u]
+                if nid in membership:
+                    membership[nid][c] = 1.0
+                else:
+                    membership[nid] = {c: 1.0}
+                communities[c][nid] = 1.0
 
         result = {'success': 1, 'message': 'the task is performed successfully', 'communities': communities,
                   'membership': membership}
@@ -278,18 +299,22 @@ def hierarchical_communities(network, params):
         except KeyError:
             k = 3
         adj_matrix = networkx.adjacency_matrix(graph)
-        clustering = AgglomerativeClustering(n_clusters=k).fit(adj_matrix.toarray())
+        clustering = backends['AgglomerativeClustering'](n_clusters=k).fit(adj_matrix.toarray())
         # print(clustering.labels_)
-        communities = [{}] * k
-        membership = {}
-        for u in range(len(clustering.labels_)):
-            c = clustering.labels_[u]
-            nid = node_ids[u]
-            if nid in membership:
-                membership[nid][c] = 1.0
-            else:
-                membership[nid] = {c: 1.0}
-            communities[c][nid] = 1.0
+        with tracing.span('serialisation', nodes=len(node_ids)):
+            if results.wants_arrays():
+                fields = results.community_labels(node_ids, np.arange(len(clustering.labels_)), clustering.labels_, k)
+                return {'success': 1, 'message': 'the task is performed successfully', **fields}
+            communities = [{}] * k
+            membership = {}
+            for u in range(len(clustering.labels_)):
+                c = clustering.labels_[u]
+                nid = node_ids[u]
+                if nid in membership:
+                    membership[nid][c] = 1.0
+                else:
+                    membership[nid] = {c: 1.0}
+                communities[c][nid] = 1.0
 
         result = {'success': 1, 'message': 'the task is performed successfully', 'communities': communities,
                   'membership': membership}
@@ -0,0 +1,229 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import numpy as np
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+vectors_file_name = 'vectors.npy'
+node_ids_file_name = 'node_ids.json'
+meta_file_name = 'meta.json'
+model_file_name = 'w2v.model'
+
+
+def _hash(obj):
+    """
+    stable hash of a json-serializable object
+    :param obj:
+    :return: hex digest as string
+    """
+    dumped = json.dumps(obj, sort_keys=True, default=str)
+    return hashlib.sha1(dumped.encode('utf-8')).hexdigest()
+
+
+def network_version(network):
+    """
+    compute a version of a network in edge list format from its edges, so that the same network always gets the same
+    version regardless of the order of its edges
+    :param network: dictionary having key 'edges', see `analyzer.common.helpers.convert_to_csr_sparse_matrix`, or
+        `analyzer.common.helpers.CSRNetwork`
+    :return: version as string
+    """
+    edges = []
+    if hasattr(network, 'rows'):
+        # network given as arrays, see `analyzer.common.helpers.CSRNetwork`
+        node_ids = network.node_ids
+        for u, v, weight in zip(network.rows.tolist(), network.cols.tolist(), network.weights.tolist()):
+            edges.append('%s\t%s\t%r' % (node_ids[u], node_ids[v], float(weight)))
+    else:
+        for e in network.get('edges'):
+            weight = 1.0
+            if e.get('properties') is not None and 'weight' in e['properties']:
+                weight = e['properties']['weight']
+            edges.append('%s\t%s\t%r' % (e['source'], e['target'], float(weight)))
+    edges.sort()
+    digest = hashlib.sha1()
+    for e in edges:
+        digest.update(e.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class EmbeddingStore:
+    """
+    class for persisting node embedding results, so that they can be reused instead of being trained again
+    the embeddings are kept in `root_dir` in the following layout
+        root_dir/<lineage>/<graph_version>/
+            vectors.npy: float32 matrix, row i is the vector of node_ids[i]
+            node_ids.json: list of node ids
+            meta.json: information about the embedding
+            w2v.model: (optional) the trained Word2Vec model, for warm-start fine-tuning
+    where `lineage` identifies the triple (dataset id, method, parameters)
+    """
+
+    def __init__(self, root_dir):
+        """
+        init a store in `root_dir`, the directory is created if it does not exist
+        :param root_dir:
+        """
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    @staticmethod
+    def make_lineage(dataset_id, method, params):
+        """
+        identify the embeddings of a dataset learned by a method with given parameters, regardless of graph version
+        :param dataset_id:
+        :param method:
+        :param params:
+        :return:
+        """
+        return _hash({'dataset_id': dataset_id, 'method': method, 'params': params})
+
+    def _get_dir(self, dataset_id, graph_version, method, params):
+        lineage = self.make_lineage(dataset_id, method, params)
+        return os.path.join(self.root_dir, lineage, str(graph_version))
+
+    def contains(self, dataset_id, graph_version, method, params):
+        path = self._get_dir(dataset_id, graph_version, method, params)
+        return os.path.isfile(os.path.join(path, meta_file_name))
+
+    def save(self, dataset_id, graph_version, method, params, vectors, model=None):
+        """
+        save an embedding
+        :param dataset_id:
+        :param graph_version:
+        :param method:
+        :param params:
+        :param vectors: dictionary of vectors of nodes, as returned by `NodeEmbedder`
+        :param model: (optional) the trained Word2Vec model
+        :return: directory of the saved embedding
+        """
+        path = self._get_dir(dataset_id, graph_version, method, params)
+        os.makedirs(path, exist_ok=True)
+        node_ids = [u for u in vectors if vectors[u] is not None]
+        if len(node_ids) > 0:
+            matrix = np.vstack([np.asarray(vectors[u], dtype=np.float32) for u in node_ids])
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        np.save(os.path.join(path, vectors_file_name), matrix)
+        with open(os.path.join(path, node_ids_file_name), 'w') as f:
+            json.dump(node_ids, f)
+        if model is not None:
+            model.save(os.path.join(path, model_file_name))
+        meta = {'dataset_id': dataset_id,
+                'graph_version': graph_version,
+                'method': method,
+                'params': params,
+                'num_nodes': matrix.shape[0],
+                'dimension': matrix.shape[1],
+                'has_model': model is not None,
+                'created': time.time()}
+        # meta is written last, an embedding without meta is considered incomplete
+        with open(os.path.join(path, meta_file_name), 'w') as f:
+            json.dump(meta, f, default=str)
+        return path
+
+    def load_matrix(self, dataset_id, graph_version, method, params, mmap=True):
+        """
+        load an embedding as a matrix
+        :return: (node_ids, matrix) or None if the embedding is not in the store
+        """
+        if not self.contains(dataset_id, graph_version, method, params):
+            return None
+        path = self._get_dir(dataset_id, graph_version, method, params)
+        matrix = np.load(os.path.join(path, vectors_file_name), mmap_mode='r' if mmap else None)
+        with open(os.path.join(path, node_ids_file_name), 'r') as f:
+            node_ids = json.load(f)
+        return node_ids, matrix
+
+    def load(self, dataset_id, graph_version, method, params):
+        """
+        load an embedding in the format returned by `NodeEmbedder`
+        :return: dictionary of vectors of nodes, or None if the embedding is not in the store
+        """
+        loaded = self.load_matrix(dataset_id, graph_version, method, params)
+        if loaded is None:
+            return None
+        node_ids, matrix = loaded
+        return dict([(node_ids[i], matrix[i]) for i in range(len(node_ids))])
+
+    def load_latest_model(self, dataset_id, method, params):
+        """
+        load the most recently saved Word2Vec model of the lineage, regardless of graph version
+        :return: (graph_version, model) or (None, None) if there is no saved model
+        """
+        lineage_dir = os.path.join(self.root_dir, self.make_lineage(dataset_id, method, params))
+        if not os.path.isdir(lineage_dir):
+            return None, None
+        latest = None
+        for graph_version in os.listdir(lineage_dir):
+            meta_path = os.path.join(lineage_dir, graph_version, meta_file_name)
+            if not os.path.isfile(meta_path):
+                continue
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            if not meta.get('has_model'):
+                continue
+            if latest is None or meta['created'] > latest['created']:
+                latest = meta
+        if latest is None:
+            return None, None
+        from gensim.models import Word2Vec
+        model_path = os.path.join(lineage_dir, str(latest['graph_version']), model_file_name)
+        return latest['graph_version'], Word2Vec.load(model_path)
+
+
+def get_embedding_store(params):
+    """
+    get the embedding store from the options of a task
+    :param params: dictionary that contain other options for the task, see `InMemoryAnalyzer.perform_analysis`
+    :return: an EmbeddingStore, or None if no store is configured
+    """
+    if params is None:
+        return None
+    store = params.get('embedding_store')
+    if store is None:
+        return None
+    if isinstance(store, EmbeddingStore):
+        return store
+    return EmbeddingStore(store)
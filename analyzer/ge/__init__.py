@@ -29,4 +29,10 @@ ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
 SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 ==============================================================================
 """
-from .models import *
+from . import models
+
+__all__ = models.__all__
+
+
+def __getattr__(name):
+    return getattr(models, name)
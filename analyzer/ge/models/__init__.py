@@ -29,11 +29,21 @@ ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
 SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 ==============================================================================
 """
-from .deepwalk import DeepWalk
-from .node2vec import Node2Vec
-from .line import LINE
-from .sdne import SDNE
-from .struc2vec import Struc2Vec
+import importlib
 
+# models are imported on first access only, LINE and SDNE pull in TensorFlow, the others gensim
+_models = {
+    "DeepWalk": ".deepwalk",
+    "Node2Vec": ".node2vec",
+    "LINE": ".line",
+    "SDNE": ".sdne",
+    "Struc2Vec": ".struc2vec"
+}
 
 __all__ = ["DeepWalk", "Node2Vec", "LINE", "SDNE", "Struc2Vec"]
+
+
+def __getattr__(name):
+    if name not in _models:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    return getattr(importlib.import_module(_models[name], __name__), name)
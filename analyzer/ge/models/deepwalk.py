@@ -65,7 +65,16 @@ class DeepWalk:
         self.sentences = self.walker.simulate_walks(
             num_walks=num_walks, walk_length=walk_length, workers=workers, verbose=1)
 
-    def train(self, embed_size=128, window_size=5, workers=3, iter=5, **kwargs):
+    def train(self, embed_size=128, window_size=5, workers=3, iter=5, init_model=None, **kwargs):
+
+        if init_model is not None:
+            # warm start: continue training a previously trained model on the new walks
+            print("Fine-tuning embedding vectors...")
+            init_model.build_vocab(self.sentences, update=True)
+            init_model.train(self.sentences, total_examples=len(self.sentences), epochs=iter)
+            print("Fine-tuning embedding vectors done!")
+            self.w2v_model = init_model
+            return init_model
 
         kwargs["sentences"] = self.sentences
         kwargs["min_count"] = kwargs.get("min_count", 0)
@@ -44,6 +44,11 @@ if path2root not in sys.path:
     sys.path.append(path2root)
 
 import analyzer.common.helpers as helpers
+from analyzer.common.budget import BudgetExceeded, checkpoint
+from analyzer.common import tracing
+
+# number of source nodes whose candidate links are scored between two budget checks
+scoring_chunk_size = 64
 
 
 def _get_sources(nx_graph, params, node_index):
@@ -81,6 +86,25 @@ def _get_candidates(nx_graph, sources):
     return candidates
 
 
+def _score_candidates(nx_graph, sources, score_function):
+    """
+    score the candidate links of chunks of source nodes in turn, checking the execution budget between chunks
+    :param nx_graph: networkx network
+    :param sources: list of node id
+    :param score_function: networkx' link prediction function, called with the graph and a list of candidate links
+    :return: generator of (u, v, score)
+    """
+    sources = list(sources)
+    for i in range(0, len(sources), scoring_chunk_size):
+        checkpoint()
+        chunk = sources[i:i + scoring_chunk_size]
+        with tracing.span('candidate generation', nodes=len(chunk)) as current:
+            candidates = _get_candidates(nx_graph, chunk)
+            current.set(candidates=len(candidates))
+        for score in score_function(nx_graph, candidates):
+            yield score
+
+
 def _select_top_k(candidates, k=3):
     candidates.sort(key=itemgetter(1), reverse=True)
     return [u[0] for u in candidates[:k]]
@@ -89,15 +113,20 @@ def _select_top_k(candidates, k=3):
 def _generate_link_predictions(scores, params, sources, node_ids):
     preds = dict([(node_ids[u], []) for u in sources])
 
-    for u, v, p in scores:
-        # print('(%d, %d) -> %.8f' % (u, v, p))
-        preds[node_ids[u]].append((node_ids[v], p))
-
-    for u in preds:
-        if 'top_k' in params:
-            preds[u] = _select_top_k(preds[u], params['top_k'])
-        else:
-            preds[u] = _select_top_k(preds[u])
+    try:
+        for u, v, p in scores:
+            # print('(%d, %d) -> %.8f' % (u, v, p))
+            preds[node_ids[u]].append((node_ids[v], p))
+    except BudgetExceeded:
+        # out of budget, the predictions of the sources scored so far are returned
+        pass
+
+    with tracing.span('serialisation', nodes=len(preds)):
+        for u in preds:
+            if 'top_k' in params:
+                preds[u] = _select_top_k(preds[u], params['top_k'])
+            else:
+                preds[u] = _select_top_k(preds[u])
 
     return preds
 
@@ -145,8 +174,7 @@ def resource_allocation_index(network, params):
             params = {}
 
         sources = _get_sources(graph, params, node_index)
-        candidates = _get_candidates(graph, sources)
-        scores = methods.resource_allocation_index(graph, candidates)
+        scores = _score_candidates(graph, sources, methods.resource_allocation_index)
         predictions = _generate_link_predictions(scores, params, sources, node_ids)
         result = {'success': 1, 'message': 'the task is performed successfully', 'predictions': predictions}
         return result
@@ -176,8 +204,7 @@ def jaccard_coefficient(network, params=None):
             params = {}
 
         sources = _get_sources(graph, params, node_index)
-        candidates = _get_candidates(graph, sources)
-        scores = methods.jaccard_coefficient(graph, candidates)
+        scores = _score_candidates(graph, sources, methods.jaccard_coefficient)
         predictions = _generate_link_predictions(scores, params, sources, node_ids)
 
         result = {'success': 1, 'message': 'the task is performed successfully', 'predictions': predictions}
@@ -208,8 +235,7 @@ def adamic_adar_index(network, params):
             params = {}
 
         sources = _get_sources(graph, params, node_index)
-        candidates = _get_candidates(graph, sources)
-        scores = methods.adamic_adar_index(graph, candidates)
+        scores = _score_candidates(graph, sources, methods.adamic_adar_index)
         predictions = _generate_link_predictions(scores, params, sources, node_ids)
 
         result = {'success': 1, 'message': 'the task is performed successfully', 'predictions': predictions}
@@ -241,8 +267,7 @@ def preferential_attachment(network, params):
             params = {}
 
         sources = _get_sources(graph, params, node_index)
-        candidates = _get_candidates(graph, sources)
-        scores = methods.preferential_attachment(graph, candidates)
+        scores = _score_candidates(graph, sources, methods.preferential_attachment)
         predictions = _generate_link_predictions(scores, params, sources, node_ids)
 
         result = {'success': 1, 'message': 'the task is performed successfully', 'predictions': predictions}
@@ -286,7 +311,8 @@ def count_number_soundarajan_hopcroft(network, params):
         else:
             nx_comms = list(nx_comms)
 
-        # initalize community information
+        # initalize community information, on a copy as the converted graph may be shared with other tasks
+        graph = graph.copy()
         for node in graph.nodes():
             graph.nodes[node]['community'] = None
 
@@ -297,8 +323,7 @@ def count_number_soundarajan_hopcroft(network, params):
                     graph.nodes[node]['community'] = i
 
         sources = _get_sources(graph, params, node_index)
-        candidates = _get_candidates(graph, sources)
-        scores = methods.cn_soundarajan_hopcroft(graph, candidates)
+        scores = _score_candidates(graph, sources, methods.cn_soundarajan_hopcroft)
         predictions = _generate_link_predictions(scores, params, sources, node_ids)
 
         result = {'success': 1, 'message': 'the task is performed successfully', 'predictions': predictions}
@@ -342,7 +367,8 @@ def resource_allocation_index_soundarajan_hopcroft(network, params):
         else:
             nx_comms = list(nx_comms)
 
-        # initalize community information
+        # initalize community information, on a copy as the converted graph may be shared with other tasks
+        graph = graph.copy()
         for node in graph.nodes():
             graph.nodes[node]['community'] = None
 
@@ -353,8 +379,7 @@ def resource_allocation_index_soundarajan_hopcroft(network, params):
                     graph.nodes[node]['community'] = i
 
         sources = _get_sources(graph, params, node_index)
-        candidates = _get_candidates(graph, sources)
-        scores = methods.ra_index_soundarajan_hopcroft(graph, candidates)
+        scores = _score_candidates(graph, sources, methods.ra_index_soundarajan_hopcroft)
         predictions = _generate_link_predictions(scores, params, sources, node_ids)
 
         result = {'success': 1, 'message': 'the task is performed successfully', 'predictions': predictions}
@@ -398,7 +423,8 @@ def within_inter_cluster(network, params):
         else:
             nx_comms = list(nx_comms)
 
-        # initalize community information
+        # initalize community information, on a copy as the converted graph may be shared with other tasks
+        graph = graph.copy()
         for node in graph.nodes():
             graph.nodes[node]['community'] = None
 
@@ -409,8 +435,7 @@ def within_inter_cluster(network, params):
                     graph.nodes[node]['community'] = i
 
         sources = _get_sources(graph, params, node_index)
-        candidates = _get_candidates(graph, sources)
-        scores = methods.within_inter_cluster(graph, candidates)
+        scores = _score_candidates(graph, sources, methods.within_inter_cluster)
         predictions = _generate_link_predictions(scores, params, sources, node_ids)
 
         result = {'success': 1, 'message': 'the task is performed successfully', 'predictions': predictions}
@@ -31,9 +31,11 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 import sys
 import os
+import time
+import warnings
+import numpy as np
 import networkx as nx
 from scipy.sparse.linalg import svds
-from sklearn.decomposition import NMF
 
 # find path to root directory of the project so as to import from other packages
 tokens = os.path.abspath(__file__).split('/')
@@ -44,16 +46,60 @@ if path2root not in sys.path:
     sys.path.append(path2root)
 
 import analyzer.common.helpers as helpers
-from analyzer.ge.models.deepwalk import DeepWalk
-from analyzer.ge.models.node2vec import Node2Vec
-from analyzer.ge.models.line import LINE
+from analyzer.common.registry import LazyRegistry
+from analyzer.common import tracing
+from analyzer.embedding_store import network_version
+
+# backends are imported when a method that needs them is performed for the first time
+backends = LazyRegistry({
+    'NMF': 'sklearn.decomposition:NMF',
+    'ConvergenceWarning': 'sklearn.exceptions:ConvergenceWarning',
+    'DeepWalk': 'analyzer.ge.models.deepwalk:DeepWalk',
+    'Node2Vec': 'analyzer.ge.models.node2vec:Node2Vec',
+    'LINE': 'analyzer.ge.models.line:LINE'
+})
+
+# methods whose Word2Vec model can be fine-tuned on walks of a changed network
+warm_start_methods = ('deepwalk', 'node2vec')
+
+# number of NMF iterations between two checks of the time budget
+nmf_round_iter = 10
+
+
+def _randomized_svd(matrix, k, n_oversamples=10, n_iter=4, seed=0):
+    """
+    truncated singular value decomposition by the randomized range finder of Halko et al.
+    only products of `matrix` (and its transpose) with dense blocks of k + n_oversamples columns are computed
+    :param matrix: scipy sparse matrix or LinearOperator
+    :param k: number of singular values and vectors
+    :param n_oversamples: number of extra random vectors for sampling the range of `matrix`
+    :param n_iter: number of power iterations, more iterations give more accurate vectors for slowly decaying spectra
+    :param seed: random seed
+    :return: (u, s, vt), with the singular values in s in descending order
+    """
+    rng = np.random.RandomState(seed)
+    size = min(k + n_oversamples, min(matrix.shape))
+    q, _ = np.linalg.qr(matrix @ rng.normal(size=(matrix.shape[1], size)))
+    for _ in range(n_iter):
+        q, _ = np.linalg.qr(matrix.T @ q)
+        q, _ = np.linalg.qr(matrix @ q)
+    b = np.asarray(matrix.T @ q).T
+    ub, s, vt = np.linalg.svd(b, full_matrices=False)
+    return (q @ ub)[:, :k], s[:k], vt[:k]
 
 
 def svd(network, params):
     """
     perform node embedding by singular value decomposition
     :param network:
-    :param params:
+    :param params: dictionary, in the form
+        {
+            'K': the embedding dimension
+            'solver': (optional) 'arpack' (default) or 'randomized' for the randomized range finder
+            'n_iter': (optional) number of power iterations of the 'randomized' solver, 4 by default
+            'proximity': (optional) 'first' (default) to factorize the adjacency matrix A, or 'second' to factorize
+                A + A^2, which is only applied as an operator and never formed
+        }
     :return: dictionary, in the form
         {
             'success': 1 if success, 0 otherwise
@@ -65,10 +111,15 @@ def svd(network, params):
         matrix, node_ids = helpers.convert_to_csr_sparse_matrix(network, params)
         k = params['K']
         print('shape =', matrix.shape)
-        print(matrix)
-        u, _, _ = svds(matrix, k)
-        vectors = [(node_ids[i], u[i]) for i in range(len(node_ids))]
-        result = {'success': 1, 'message': 'the task is performed successfully', 'vectors': dict(vectors)}
+        if params.get('proximity', 'first') == 'second':
+            matrix = helpers.higher_order_proximity(matrix, as_operator=True)
+        if params.get('solver', 'arpack') == 'randomized':
+            u, _, _ = _randomized_svd(matrix, k, n_iter=params.get('n_iter', 4))
+        else:
+            u, _, _ = svds(matrix, k)
+        with tracing.span('serialisation', nodes=len(node_ids)):
+            vectors = dict([(node_ids[i], u[i]) for i in range(len(node_ids))])
+        result = {'success': 1, 'message': 'the task is performed successfully', 'vectors': vectors}
         return result
     except Exception as e:
         print(e)
@@ -80,7 +131,17 @@ def nmf(network, params):
     """
     perform node embedding by non-negative matrix factorization
     :param network:
-    :param params:
+    :param params: dictionary, in the form
+        {
+            'K': the embedding dimension
+            'init': (optional) initialization of the factors, 'nndsvda' by default
+            'solver': (optional) 'cd' (coordinate descent, default) or 'mu' (multiplicative update)
+            'max_iter': (optional) maximum number of iterations, 200 by default
+            'max_time': (optional) time budget in seconds, the factorization is stopped after the first round of
+                iterations that exceeds it
+            'proximity': (optional) 'first' (default) to factorize the adjacency matrix A, or 'second' to factorize
+                A + A^2, which is kept sparse
+        }
      :return: dictionary, in the form
     {
         'success': 1 if success, 0 otherwise
@@ -91,10 +152,39 @@ def nmf(network, params):
     try:
         matrix, node_ids = helpers.convert_to_csr_sparse_matrix(network, params)
         k = params['K']
-        model = NMF(n_components=k)
-        w = model.fit_transform(matrix)
-        vectors = [(node_ids[i], w[i]) for i in range(len(node_ids))]
-        result = {'success': 1, 'message': 'the task is performed successfully', 'vectors': dict(vectors)}
+        if params.get('proximity', 'first') == 'second':
+            matrix = helpers.higher_order_proximity(matrix)
+        NMF = backends['NMF']
+        solver = params.get('solver', 'cd')
+        max_iter = params.get('max_iter', 200)
+        max_time = params.get('max_time')
+        if max_time is None:
+            model = NMF(n_components=k, init=params.get('init', 'nndsvda'), solver=solver, max_iter=max_iter)
+            w = model.fit_transform(matrix)
+        else:
+            # run the solver in rounds of a few iterations, each round starting from the factors of the previous one,
+            # until it converges, reaches max_iter or runs out of time
+            deadline = time.time() + max_time
+            num_iter = 0
+            w = h = None
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', category=backends['ConvergenceWarning'])
+                while num_iter < max_iter:
+                    round_iter = min(nmf_round_iter, max_iter - num_iter)
+                    if w is None:
+                        model = NMF(n_components=k, init=params.get('init', 'nndsvda'), solver=solver,
+                                    max_iter=round_iter)
+                        w = model.fit_transform(matrix)
+                    else:
+                        model = NMF(n_components=k, init='custom', solver=solver, max_iter=round_iter)
+                        w = model.fit_transform(matrix, W=w, H=h)
+                    h = model.components_
+                    num_iter += model.n_iter_
+                    if model.n_iter_ < round_iter or time.time() > deadline:
+                        break
+        with tracing.span('serialisation', nodes=len(node_ids)):
+            vectors = dict([(node_ids[i], w[i]) for i in range(len(node_ids))])
+        result = {'success': 1, 'message': 'the task is performed successfully', 'vectors': vectors}
         return result
     except Exception as e:
         print(e)
@@ -102,11 +192,26 @@ def nmf(network, params):
         return result
 
 
-def node2vec(network, params):
+def _convert_to_token_graph(network, params):
+    """
+    convert a network into a directed `networkx` graph whose nodes are labelled by the original node ids as strings,
+    so that the tokens of random walks stay the same across versions of the network
+    :param network:
+    :param params:
+    :return: (graph, node_ids)
+    """
+    graph, node_ids = helpers.convert_to_nx_directed_graph(network, params)
+    graph = nx.relabel_nodes(graph, dict([(i, str(node_ids[i])) for i in range(len(node_ids))]))
+    return graph, node_ids
+
+
+def node2vec(network, params, init_model=None, return_model=False):
     """
     perform node embedding by node2vec
     :param network:
     :param params:
+    :param init_model: (optional) a trained Word2Vec model to be fine-tuned on walks of the network
+    :param return_model: True to include the trained Word2Vec model in the result under key 'model'
      :return: dictionary, in the form
     {
         'success': 1 if success, 0 otherwise
@@ -115,17 +220,20 @@ def node2vec(network, params):
     }
     """
     try:
-        graph, node_ids = helpers.convert_to_nx_directed_graph(network, params, node_is_str=True)
+        graph, node_ids = _convert_to_token_graph(network, params)
         k = params['K']
         print(nx.info(graph))
 
-        model = Node2Vec(graph, walk_length=40, num_walks=80,
+        model = backends['Node2Vec'](graph, walk_length=40, num_walks=80,
                          p=0.25, q=4, workers=8, use_rejection_sampling=0)
-        model.train(embed_size=k, window_size=5, workers=8, iter=10)
+        w2v_model = model.train(embed_size=k, window_size=5, workers=8, iter=10, init_model=init_model)
         embeddings = model.get_embeddings()
 
-        vectors = [(node_ids[i], embeddings.get(str(i))) for i in range(len(node_ids))]
-        result = {'success': 1, 'message': 'the task is performed successfully', 'vectors': dict(vectors)}
+        with tracing.span('serialisation', nodes=len(node_ids)):
+            vectors = dict([(node_ids[i], embeddings.get(str(node_ids[i]))) for i in range(len(node_ids))])
+        result = {'success': 1, 'message': 'the task is performed successfully', 'vectors': vectors}
+        if return_model:
+            result['model'] = w2v_model
         return result
     except Exception as e:
         print(e)
@@ -133,11 +241,13 @@ def node2vec(network, params):
         return result
 
 
-def deepwalk(network, params):
+def deepwalk(network, params, init_model=None, return_model=False):
     """
     perform node embedding by DeepWalk
     :param network:
     :param params:
+    :param init_model: (optional) a trained Word2Vec model to be fine-tuned on walks of the network
+    :param return_model: True to include the trained Word2Vec model in the result under key 'model'
      :return: dictionary, in the form
     {
         'success': 1 if success, 0 otherwise
@@ -146,16 +256,19 @@ def deepwalk(network, params):
     }
     """
     try:
-        graph, node_ids = helpers.convert_to_nx_directed_graph(network, params, node_is_str=True)
+        graph, node_ids = _convert_to_token_graph(network, params)
         k = params['K']
         print(nx.info(graph))
 
-        model = DeepWalk(graph, walk_length=40, num_walks=80, workers=8)
-        model.train(embed_size=k, window_size=5, workers=8, iter=10)
+        model = backends['DeepWalk'](graph, walk_length=40, num_walks=80, workers=8)
+        w2v_model = model.train(embed_size=k, window_size=5, workers=8, iter=10, init_model=init_model)
         embeddings = model.get_embeddings()
 
-        vectors = [(node_ids[i], embeddings.get(str(i))) for i in range(len(node_ids))]
-        result = {'success': 1, 'message': 'the task is performed successfully', 'vectors': dict(vectors)}
+        with tracing.span('serialisation', nodes=len(node_ids)):
+            vectors = dict([(node_ids[i], embeddings.get(str(node_ids[i]))) for i in range(len(node_ids))])
+        result = {'success': 1, 'message': 'the task is performed successfully', 'vectors': vectors}
+        if return_model:
+            result['model'] = w2v_model
         return result
     except Exception as e:
         print(e)
@@ -176,16 +289,17 @@ def line(network, params):
     }
     """
     try:
-        graph, node_ids = helpers.convert_to_nx_directed_graph(network, params, node_is_str=True)
+        graph, node_ids = _convert_to_token_graph(network, params)
         k = params['K']
         print(nx.info(graph))
 
-        model = LINE(graph, embedding_size=k, order='second')
+        model = backends['LINE'](graph, embedding_size=k, order='second')
         model.train(batch_size=1024, epochs=100, verbose=2)
         embeddings = model.get_embeddings()
 
-        vectors = [(node_ids[i], embeddings.get(str(i))) for i in range(len(node_ids))]
-        result = {'success': 1, 'message': 'the task is performed successfully', 'vectors': dict(vectors)}
+        with tracing.span('serialisation', nodes=len(node_ids)):
+            vectors = dict([(node_ids[i], embeddings.get(str(node_ids[i]))) for i in range(len(node_ids))])
+        result = {'success': 1, 'message': 'the task is performed successfully', 'vectors': vectors}
         return result
     except Exception as e:
         print(e)
@@ -241,6 +355,16 @@ def get_info():
                         'K': {
                             'description': 'The embedding dimension',
                             'options': {'Integer': 'Integer'}
+                        },
+                        'solver': {
+                            'description': 'The SVD solver',
+                            'options': {'arpack': 'ARPACK',
+                                        'randomized': 'Randomized SVD'}
+                        },
+                        'proximity': {
+                            'description': 'The factorized proximity matrix',
+                            'options': {'first': 'First-order proximity (A)',
+                                        'second': 'Second-order proximity (A + A^2)'}
                         }
                     }
                 },
@@ -250,6 +374,20 @@ def get_info():
                         'K': {
                             'description': 'The embedding dimension',
                             'options': {'Integer': 'Integer'}
+                        },
+                        'solver': {
+                            'description': 'The NMF solver',
+                            'options': {'cd': 'Coordinate Descent',
+                                        'mu': 'Multiplicative Update'}
+                        },
+                        'max_time': {
+                            'description': 'Time budget in seconds',
+                            'options': {'Integer': 'Integer'}
+                        },
+                        'proximity': {
+                            'description': 'The factorized proximity matrix',
+                            'options': {'first': 'First-order proximity (A)',
+                                        'second': 'Second-order proximity (A + A^2)'}
                         }
                     }
                 }
@@ -289,11 +427,37 @@ class NodeEmbedder:
             # TODO: to add more methods for attributed networks and knowledge networks
         }
 
-    def perform(self, network, params):
+    def perform(self, network, params, store=None, dataset_id=None, graph_version=None, warm_start=False):
         """
-        performing
+        performing, reusing the embeddings persisted in `store` if any
         :param network:
         :param params:
+        :param store: (optional) EmbeddingStore to load the embedding from and save the embedding to
+        :param dataset_id: (optional) id of the dataset the network comes from, required for using `store`
+        :param graph_version: (optional) version of the network, computed from its edges if not given
+        :param warm_start: True to fine-tune the latest Word2Vec model of the dataset instead of training from scratch,
+                only for methods in `warm_start_methods`
         :return:
         """
-        return self.methods[self.algorithm](network, params)
+        if store is None or dataset_id is None:
+            return self.methods[self.algorithm](network, params)
+
+        if graph_version is None:
+            graph_version = network_version(network)
+        vectors = store.load(dataset_id, graph_version, self.algorithm, params)
+        if vectors is not None:
+            return {'success': 1, 'message': 'the embedding is loaded from the store', 'vectors': vectors}
+
+        if self.algorithm in warm_start_methods:
+            init_model = None
+            if warm_start:
+                _, init_model = store.load_latest_model(dataset_id, self.algorithm, params)
+            result = self.methods[self.algorithm](network, params, init_model=init_model, return_model=True)
+            model = result.pop('model', None)
+        else:
+            result = self.methods[self.algorithm](network, params)
+            model = None
+
+        if result['success'] == 1:
+            store.save(dataset_id, graph_version, self.algorithm, params, result['vectors'], model=model)
+        return result
@@ -31,6 +31,8 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # find path to root directory of the project so as to import from other packages
 tokens = os.path.abspath(__file__).split('/')
@@ -41,15 +43,28 @@ if path2root not in sys.path:
     sys.path.append(path2root)
 
 from framework.interfaces import AnalysisRequester
-from analyzer.community_detection import CommunityDetector
-from analyzer.social_influence_analysis import SocialInfluenceAnalyzer
-from analyzer.link_prediction import LinkPredictor
-from analyzer.node_embedding import NodeEmbedder
+from analyzer.common.registry import LazyRegistry
+from analyzer.common.helpers import SharedConversions, CSRNetwork
+from analyzer.common.budget import BudgetExceeded, get_budget
+from analyzer.common import tracing
+from analyzer.common.results import result_format, scale_scores
+from analyzer.embedding_store import get_embedding_store
 
-from analyzer import community_detection
-from analyzer import link_prediction
-from analyzer import social_influence_analysis
-from analyzer import node_embedding
+# the module of a task is imported when the task is dispatched or its information is requested
+analyzers = LazyRegistry({
+    'community_detection': 'analyzer.community_detection:CommunityDetector',
+    'social_influence_analysis': 'analyzer.social_influence_analysis:SocialInfluenceAnalyzer',
+    'link_prediction': 'analyzer.link_prediction:LinkPredictor',
+    'node_embedding': 'analyzer.node_embedding:NodeEmbedder',
+    'similarity_search': 'analyzer.similarity_search:SimilaritySearcher'
+})
+task_info = LazyRegistry({
+    'community_detection': 'analyzer.community_detection:get_info',
+    'link_prediction': 'analyzer.link_prediction:get_info',
+    'social_influence_analysis': 'analyzer.social_influence_analysis:get_info',
+    'node_embedding': 'analyzer.node_embedding:get_info',
+    'similarity_search': 'analyzer.similarity_search:get_info'
+})
 
 
 def get_info():
@@ -78,23 +93,22 @@ def get_info():
                     }
                 }
     """
-    info = {'community_detection': community_detection.get_info(),
-            'link_prediction': link_prediction.get_info(),
-            'social_influence_analysis': social_influence_analysis.get_info(),
-            'node_embedding': node_embedding.get_info()
-            }
+    info = dict([(task_id, task_info[task_id]()) for task_id in task_info.keys()])
     return info
 
 
 class InMemoryAnalyzer(AnalysisRequester):
-    def __init__(self):
+    def __init__(self, data_manager=None):
         """
         #TODO: more to be added
+        :param data_manager: (optional) DataManager to resolve in-database networks against
         """
+        self.data_manager = data_manager
         self.community_detector = None
         self.social_influence_analyzer = None
         self.link_predictor = None
         self.node_embedder = None
+        self.similarity_searcher = None
 
     def perform_analysis(self, task, params):
         """
@@ -105,7 +119,8 @@ class InMemoryAnalyzer(AnalysisRequester):
                         "community_detection",
                         "social_influence_analysis"
                         "link_prediction",
-                        "node_embedding"
+                        "node_embedding",
+                        "similarity_search"
                         # TODO: more to be added
                 "network": either: a string to identify the in-database network to perform the task on, or
                            a network in format of edge list, i.e., a list of dictionaries, each contains information
@@ -124,6 +139,10 @@ class InMemoryAnalyzer(AnalysisRequester):
                                             }
                                 ...
                             }
+                "node_ids": (optional) for an in-database network, the nodes whose ego-network is analyzed, the whole
+                    network if not given
+                "network_params": (optional) for an in-database network, criteria to select its edges, as `params` of
+                    `DataManager.get_network`
                 "options:" dictionary that contains algorithm/method selection and its parameters to perform the task,
                     in the following format
                     {
@@ -141,15 +160,74 @@ class InMemoryAnalyzer(AnalysisRequester):
                 "save_db": database manager that can be utilized for saving the task result
                 "output_directory": (optional) directory to save the task result to files
                 "compressed": (optional) to compress the output files or not
+                "embedding_store": (optional) directory or EmbeddingStore to reuse node embeddings (and, for
+                    "similarity_search", the nearest neighbor index) from
+                "dataset_id": (optional) id of the dataset the network comes from, required for "embedding_store"
+                "graph_version": (optional) version of the network, computed from its edges if not given
+                "warm_start": (optional) True to fine-tune the latest embedding of the dataset after graph changes
+                "budget": (optional) ExecutionBudget to perform the task under, e.g., to cancel it from another thread
+                "timeout": (optional) wall-clock time limit in seconds, if "budget" is not given
+                "max_memory": (optional) limit of the resident memory in MB, if "budget" is not given
+                "trace": (optional) True to attach the spans of the task to the result under key 'trace'
+                "data_manager": (optional) DataManager to resolve an in-database network against, instead of the one
+                    the analyzer is constructed with
+                "result_format": (optional) 'dict' (default) for results keyed by node id, or 'arrays' for the
+                    results of "social_influence_analysis" and "community_detection" as NumPy arrays aligned with
+                    an array 'node_ids', see `analyzer.common.results`
+                "scale": (optional) (min, max) range to min-max scale the scores of "social_influence_analysis" to,
+                    added to the result as 'scaled_scores'
+                "bins": (optional) number of equal-width bins to assign the scores to, added as 'score_bins'
             }
         :return: 1 if the task is performed successfully, or 0 otherwise
+            a task that exceeds its budget is stopped, if its method returns a partial result then the result has
+            'partial' set to True, otherwise the task fails
+            the phases of the task ('conversion', 'compute', 'serialisation', ...) are always added to
+            `tracing.counters`, and returned as a list of spans if "trace" is set
+        """
+        tracer = tracing.Tracer(task_id=task['task_id'], method=task.get('options', {}).get('method'))
+        with tracer, tracing.span('compute'), result_format(params.get('result_format') if params else None):
+            result = self._perform_under_budget(task, params)
+            if result is not None and result.get('success') == 1 and params:
+                if params.get('scale') or params.get('bins'):
+                    with tracing.span('scaling'):
+                        scale_scores(result, params.get('scale'), params.get('bins'))
+        if result is not None and params and params.get('trace'):
+            result['trace'] = tracer.get_spans()
+        return result
+
+    def _perform_under_budget(self, task, params):
+        """
+        perform an analysis task under the execution budget given in `params`, if any
+        """
+        budget = get_budget(params)
+        if budget is None:
+            return self._perform(task, params)
+        watch = budget.watch()
+        try:
+            with watch:
+                result = self._perform(task, params)
+        except BudgetExceeded as e:
+            reason = watch.stopped or e.reason
+            print('task %s is stopped: %s' % (task['task_id'], reason))
+            return {'success': 0, 'message': 'the task is stopped: %s' % reason}
+        if watch.stopped is not None and result is not None and result.get('success') == 1:
+            result['partial'] = True
+            result['message'] = 'the task is stopped (%s), the result is partial' % watch.stopped
+        return result
+
+    def _perform(self, task, params):
+        """
+        perform an analysis task, see `perform_analysis`
         """
         network = task['network']
+        dataset_id = params.get('dataset_id') if params else None
         if type(network) == str:
-            # TODO: retrieve network from database
-            print('in-database network is not supported')
-            # TODO: what should be returned?
-            return None
+            if dataset_id is None:
+                dataset_id = network
+            network = self.resolve_network(network, task.get('node_ids'), task.get('network_params'), params)
+            if network is None:
+                # TODO: what should be returned?
+                return None
         algorithm = task['options']['method']
         algorithm_params = task['options']['parameters']
         # print('algorithm_params = ', algorithm_params)
@@ -158,18 +236,120 @@ class InMemoryAnalyzer(AnalysisRequester):
         if task['task_id'] == 'community_detection':
             # print('task: community detection\n\tmethod = ', algorithm)
             # print('\tparams = ', cd_params)
-            self.community_detector = CommunityDetector(algorithm)
+            self.community_detector = analyzers['community_detection'](algorithm)
             return self.community_detector.perform(network, algorithm_params)
         elif task['task_id'] == 'social_influence_analysis':
-            self.social_influence_analyzer = SocialInfluenceAnalyzer(algorithm)
+            self.social_influence_analyzer = analyzers['social_influence_analysis'](algorithm)
             return self.social_influence_analyzer.perform(network, algorithm_params)
         elif task['task_id'] == 'link_prediction':
-            self.link_predictor = LinkPredictor(algorithm)
+            self.link_predictor = analyzers['link_prediction'](algorithm)
             return self.link_predictor.perform(network, algorithm_params)
         elif task['task_id'] == 'node_embedding':
-            self.node_embedder = NodeEmbedder(algorithm)
-            return self.node_embedder.perform(network, algorithm_params)
+            self.node_embedder = analyzers['node_embedding'](algorithm)
+            store = get_embedding_store(params)
+            if store is None:
+                return self.node_embedder.perform(network, algorithm_params)
+            return self.node_embedder.perform(network, algorithm_params, store=store,
+                                              dataset_id=dataset_id,
+                                              graph_version=params.get('graph_version'),
+                                              warm_start=params.get('warm_start', False))
+        elif task['task_id'] == 'similarity_search':
+            self.similarity_searcher = analyzers['similarity_search'](algorithm)
+            return self.similarity_searcher.perform(network, algorithm_params, store=get_embedding_store(params),
+                                                    dataset_id=dataset_id,
+                                                    graph_version=params.get('graph_version'))
         else:
             # TODO: what should be return?
             print('task %s is not defined' % task['task_id'])
             return None
+
+    def resolve_network(self, network, node_ids=None, network_params=None, params=None):
+        """
+        resolve an in-database network against the data manager, pulling only the arrays of its edges if the data
+        manager provides them, or its edge list otherwise
+        :param network: a string to identify the network in the data manager
+        :param node_ids: (optional) the nodes whose ego-network is resolved, the whole network if None
+        :param network_params: (optional) criteria to select the edges, as `params` of `DataManager.get_network`
+        :param params: (optional) params of `perform_analysis`, whose "data_manager" overrides the analyzer's one
+        :return: CSRNetwork, network in edge list format, or None if there is no data manager
+        """
+        data_manager = params.get('data_manager') if params else None
+        if data_manager is None:
+            data_manager = self.data_manager
+        if data_manager is None:
+            print('no data manager to retrieve in-database network %s from' % network)
+            return None
+        with tracing.span('resolution', network=network) as current:
+            view = data_manager.get_csr_view(network, node_ids=node_ids, params=network_params)
+            if view is not None:
+                resolved = CSRNetwork.from_view(view)
+                current.set(nodes=len(resolved.node_ids), edges=len(resolved.rows))
+            else:
+                resolved = data_manager.get_network(network, node_ids=node_ids, params=network_params)
+                current.set(edges=len(resolved['edges']))
+        return resolved
+
+    def perform_batch(self, network, tasks, workers=None):
+        """
+        request to perform several analysis tasks on the same network
+        the network is converted once for all tasks, and the tasks, which are independent of each other, are performed
+        by a pool of worker threads
+        :param network: network in edge list format, or a string to identify an in-database network, which is resolved
+            once for all tasks, as "network" in `perform_analysis`
+        :param tasks: list of (task, params), each as the arguments of `perform_analysis`, "network" in task is ignored
+        :param workers: (optional) number of worker threads, by default one per task up to the number of CPUs
+        :return: dictionary, in the form
+            {
+                'success': 1 if all tasks are performed successfully, 0 otherwise
+                'message': a string
+                'results': list of results, results[i] is the result of tasks[i] as returned by `perform_analysis`, None
+                    if it is not defined, all None if the in-database network cannot be resolved
+                'timings': list of seconds, timings[i] is the time spent in performing tasks[i]
+                'conversion': dictionary of the number of computed and reused network conversions and their time
+                'total_time': seconds spent in performing the whole batch
+            }
+        """
+        if workers is None:
+            workers = min(len(tasks), os.cpu_count() or 1)
+        start = time.time()
+        dataset_id = None
+        if type(network) == str:
+            dataset_id = network
+            network = self.resolve_network(network)
+            if network is None:
+                return {'success': 0, 'message': 'in-database network %s cannot be resolved' % dataset_id,
+                        'results': [None] * len(tasks), 'timings': [0.0] * len(tasks), 'conversion': None,
+                        'total_time': time.time() - start}
+
+        def perform(task, params):
+            task_start = time.time()
+            try:
+                task = dict(task)
+                task['network'] = network
+                if dataset_id is not None:
+                    params = dict(params or {})
+                    params.setdefault('dataset_id', dataset_id)
+                result = InMemoryAnalyzer(self.data_manager).perform_analysis(task, params)
+            except Exception as e:
+                print(e)
+                result = {'success': 0, 'message': str(e)}
+            return result, time.time() - task_start
+
+        with SharedConversions(network) as shared:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                futures = [executor.submit(perform, task, params) for task, params in tasks]
+                performed = [future.result() for future in futures]
+            conversion = shared.get_stats()
+
+        results = [result for result, _ in performed]
+        num_failed = len([result for result in results if result is None or result.get('success') != 1])
+        if num_failed == 0:
+            message = 'all tasks are performed successfully'
+        else:
+            message = '%d of %d tasks failed' % (num_failed, len(tasks))
+        return {'success': 1 if num_failed == 0 else 0,
+                'message': message,
+                'results': results,
+                'timings': [elapsed for _, elapsed in performed],
+                'conversion': conversion,
+                'total_time': time.time() - start}
@@ -0,0 +1,337 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import sys
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from analyzer.node_embedding import NodeEmbedder
+from analyzer.embedding_store import EmbeddingStore, network_version
+from analyzer.common import tracing
+
+# in-process indexes, keyed by (store directory, lineage, number of lists), each value is (graph_version, index), the
+# least recently used ones are dropped past `max_num_indexes`, the tasks of a batch may run in threads, see
+# `InMemoryAnalyzer.perform_batch`, so the cache is only accessed under `_indexes_lock`
+max_num_indexes = 16
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class NearestNeighborIndex:
+    """
+    inverted file (IVF) index for approximate cosine-similarity search over node embeddings
+    the vectors are clustered by k-means into `num_lists` inverted lists, a query only scans the vectors in the
+    `nprobe` lists whose centroids are the most similar to the query vector
+    """
+
+    def __init__(self, num_lists=None, num_iterations=10, seed=0):
+        """
+        :param num_lists: number of inverted lists, about sqrt(number of nodes) if None, 1 means exact search
+        :param num_iterations: number of k-means iterations for training the centroids
+        :param seed: random seed for initializing the centroids
+        """
+        self.num_lists = num_lists
+        self.num_iterations = num_iterations
+        self.seed = seed
+        self.node_ids = []
+        self.node_index = {}
+        self.vectors = None  # normalized vectors, row i is the vector of node_ids[i]
+        self.centroids = None
+        self.assignment = None  # assignment[i] is the list of row i
+        self.lists = []  # lists[c] is the list of rows assigned to centroid c
+        self._list_arrays = {}  # cache of lists as numpy arrays
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def _assign(self, vectors):
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def build(self, node_ids, matrix):
+        """
+        build the index from scratch
+        :param node_ids: list of node ids
+        :param matrix: matrix of vectors, row i is the vector of node_ids[i]
+        :return: the index
+        """
+        vectors = _normalize(matrix)
+        num_nodes = vectors.shape[0]
+        num_lists = self.num_lists
+        if num_lists is None:
+            num_lists = int(np.sqrt(num_nodes))
+        num_lists = max(1, min(num_lists, num_nodes))
+
+        rng = np.random.RandomState(self.seed)
+        self.centroids = vectors[rng.choice(num_nodes, num_lists, replace=False)]
+        for _ in range(self.num_iterations if num_lists > 1 else 0):
+            assignment = self._assign(vectors)
+            for c in range(num_lists):
+                members = vectors[assignment == c]
+                if len(members) > 0:
+                    self.centroids[c] = members.mean(axis=0)
+            self.centroids = _normalize(self.centroids)
+
+        self.node_ids = list(node_ids)
+        self.node_index = dict([(self.node_ids[i], i) for i in range(num_nodes)])
+        self.vectors = vectors
+        self.assignment = self._assign(vectors)
+        self.lists = [[] for _ in range(num_lists)]
+        for i in range(num_nodes):
+            self.lists[self.assignment[i]].append(i)
+        self._list_arrays = {}
+        return self
+
+    def _get_list_array(self, c):
+        if c not in self._list_arrays:
+            self._list_arrays[c] = np.asarray(self.lists[c], dtype=np.int64)
+        return self._list_arrays[c]
+
+    def query(self, vector, top_k=10, nprobe=1, exclude=None):
+        """
+        find the most similar nodes to a vector
+        :param vector:
+        :param top_k: number of returned nodes
+        :param nprobe: number of inverted lists to scan
+        :param exclude: (optional) a node id to exclude from the result
+        :return: list of (node id, cosine similarity), most similar first
+        """
+        if len(self.node_ids) == 0:
+            return []
+        query = _normalize(vector)[0]
+        nprobe = max(1, min(nprobe, len(self.lists)))
+        centroid_scores = self.centroids @ query
+        probed = np.argsort(-centroid_scores)[:nprobe]
+        candidates = np.concatenate([self._get_list_array(c) for c in probed])
+        if len(candidates) == 0:
+            return []
+        scores = self.vectors[candidates] @ query
+        if exclude is not None and exclude in self.node_index:
+            scores[candidates == self.node_index[exclude]] = -np.inf
+        k = min(top_k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.node_ids[candidates[i]], float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    def query_nodes(self, node_ids, top_k=10, nprobe=1):
+        """
+        find the most similar nodes to each node in `node_ids`
+        :return: dictionary, keys are node ids in the index, values are lists as returned by `query`
+        """
+        neighbors = {}
+        for u in node_ids:
+            if u not in self.node_index:
+                continue
+            vector = self.vectors[self.node_index[u]]
+            neighbors[u] = self.query(vector, top_k=top_k, nprobe=nprobe, exclude=u)
+        return neighbors
+
+
+def _embed(network, embedding_method, embedding_params, store, dataset_id, graph_version):
+    embedder = NodeEmbedder(embedding_method)
+    result = embedder.perform(network, embedding_params, store=store, dataset_id=dataset_id,
+                              graph_version=graph_version)
+    if result['success'] == 0:
+        return None
+    node_ids = [u for u in result['vectors'] if result['vectors'][u] is not None]
+    matrix = np.vstack([np.asarray(result['vectors'][u], dtype=np.float32) for u in node_ids])
+    return node_ids, matrix
+
+
+def get_index(network, embedding_method, embedding_params, num_lists=None, store=None, dataset_id=None,
+              graph_version=None):
+    """
+    get the index over the embedding of a network
+    if a store and a dataset id are given, the index is kept in memory and reused for later requests on the same
+    version of the dataset, a new version of the network is embedded again, in another basis and maybe without some
+    nodes, so its index is built again, the embedding itself is reused from the store if the version was embedded before
+    an index is never changed once built, so it can be queried while another thread builds the index of a new version
+    :return: NearestNeighborIndex, or None if the network cannot be embedded
+    """
+    if store is None or dataset_id is None:
+        embedding = _embed(network, embedding_method, embedding_params, None, None, None)
+        if embedding is None:
+            return None
+        return NearestNeighborIndex(num_lists=num_lists).build(*embedding)
+
+    if graph_version is None:
+        graph_version = network_version(network)
+    key = (store.root_dir, EmbeddingStore.make_lineage(dataset_id, embedding_method, embedding_params), num_lists)
+    with _indexes_lock:
+        if key in _indexes and _indexes[key][0] == graph_version:
+            _indexes.move_to_end(key)
+            return _indexes[key][1]
+    embedding = _embed(network, embedding_method, embedding_params, store, dataset_id, graph_version)
+    if embedding is None:
+        return None
+    index = NearestNeighborIndex(num_lists=num_lists).build(*embedding)
+    with _indexes_lock:
+        _indexes[key] = (graph_version, index)
+        _indexes.move_to_end(key)
+        while len(_indexes) > max_num_indexes:
+            _indexes.popitem(last=False)
+    return index
+
+
+def get_info():
+    """
+    get information about methods provided in this class
+    :return: dictionary: Provides the name of the analysis task, available methods and information
+                         about an methods parameter. Also provides full names of tasks, methods and parameter.
+                         Information is provided in the following format:
+
+                        {
+                            'name': Full analysis task name as string
+                            'methods': {
+                                key: Internal method name (eg. 'asyn_lpa')
+                                value: {
+                                    'name': Full method name as string
+                                    'parameter': {
+                                        key: Parameter name
+                                        value: {
+                                            'description': Description of the parameter
+                                            'options': {
+                                                key: Accepted parameter value
+                                                value: Full parameter value name as string
+                                                !! If accepted values are integers key and value is 'Integer'. !!
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        }
+    """
+    parameter = {
+        'embedding_method': {
+            'description': 'Node embedding method',
+            'options': {'svd': 'Singular Value Decomposition',
+                        'nmf': 'Non-negative Matrix Factorization'}
+        },
+        'K': {
+            'description': 'The embedding dimension',
+            'options': {'Integer': 'Integer'}
+        },
+        'top_k': {
+            'description': 'Number of similar nodes',
+            'options': {'Integer': 'Integer'}
+        }
+    }
+    info = {'name': 'Similarity Search',
+            'methods': {
+                'ivf': {
+                    'name': 'Approximate Nearest Neighbors (Inverted File Index)',
+                    'parameter': parameter
+                },
+                'exact': {
+                    'name': 'Exact Nearest Neighbors',
+                    'parameter': parameter
+                }
+            }
+            }
+    return info
+
+
+class SimilaritySearcher:
+    """
+    class for finding the most similar nodes in the embedding space
+    """
+
+    def __init__(self, algorithm):
+        """
+        init a similarity searcher using the given `algorithm`
+        :param algorithm:
+        """
+        self.algorithm = algorithm
+        # number of inverted lists of the index, None for the default
+        self.methods = {
+            'ivf': None,
+            'exact': 1
+        }
+
+    def perform(self, network, params, store=None, dataset_id=None, graph_version=None):
+        """
+        performing
+        :param network:
+        :param params: dictionary, in the form
+            {
+                'nodes': list of ids of nodes to find similar nodes for
+                'top_k': (optional) number of similar nodes, 10 by default
+                'nprobe': (optional) number of inverted lists to scan, for 'ivf' only
+                'embedding_method': (optional) node embedding method, 'svd' by default
+                'K': (optional) embedding dimension, 16 by default
+            }
+        :param store: (optional) EmbeddingStore to reuse the embedding and the index from
+        :param dataset_id: (optional) id of the dataset the network comes from, required for using `store`
+        :param graph_version: (optional) version of the network, computed from its edges if not given
+        :return: dictionary, in the form
+            {
+                'success': 1 if success, 0 otherwise
+                'message': a string
+                'neighbors': dictionary, neighbors[u] is a list of [node id, similarity], most similar first
+            }
+        """
+        try:
+            embedding_method = params.get('embedding_method', 'svd')
+            embedding_params = {'K': params.get('K', 16)}
+            num_lists = self.methods[self.algorithm]
+            index = get_index(network, embedding_method, embedding_params, num_lists=num_lists, store=store,
+                              dataset_id=dataset_id, graph_version=graph_version)
+            if index is None:
+                return {'success': 0, 'message': 'this algorithm is not suitable for the input network',
+                        'neighbors': None}
+            nprobe = params.get('nprobe', 4) if num_lists is None else 1
+            with tracing.span('search', nodes=len(params.get('nodes', []))):
+                neighbors = index.query_nodes(params.get('nodes', []), top_k=params.get('top_k', 10), nprobe=nprobe)
+            with tracing.span('serialisation', nodes=len(neighbors)):
+                neighbors = dict([(u, [[v, s] for v, s in neighbors[u]]) for u in neighbors])
+            return {'success': 1, 'message': 'the task is performed successfully', 'neighbors': neighbors}
+        except Exception as e:
+            print(e)
+            return {'success': 0, 'message': 'this algorithm is not suitable for the input network',
+                    'neighbors': None}
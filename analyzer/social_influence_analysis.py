@@ -31,6 +31,7 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 import sys
 import os
+import random
 import networkx as nx
 
 # find path to root directory of the project so as to import from other packages
@@ -42,6 +43,12 @@ if path2root not in sys.path:
     sys.path.append(path2root)
 
 import analyzer.common.helpers as helpers
+from analyzer.common.budget import BudgetExceeded, checkpoint
+from analyzer.common import tracing
+from analyzer.common import results
+
+# number of source nodes whose shortest paths are accumulated between two budget checks in `betweenness`
+betweenness_chunk_size = 64
 
 
 def pagerank(network, params):
@@ -62,10 +69,9 @@ def pagerank(network, params):
         # print(graph)
         # print(node_ids)
         pr = nx.pagerank(graph)
-        scores = [(node_ids[i], pr[i]) for i in range(len(node_ids))]
-        # print(scores)
-        scores = dict(scores)
-        result = {'success': 1, 'message': 'the task is performed successfully', 'scores': scores}
+        with tracing.span('serialisation', nodes=len(node_ids)):
+            fields = results.node_scores(node_ids, [pr[i] for i in range(len(node_ids))])
+        result = {'success': 1, 'message': 'the task is performed successfully', **fields}
         return result
     except Exception as e:
         print(e)
@@ -90,10 +96,9 @@ def authority(network, params):
         # print(graph)
         # print(node_ids)
         _, a = nx.hits(graph)
-        scores = [(node_ids[i], a[i]) for i in range(len(node_ids))]
-        # print(scores)
-        scores = dict(scores)
-        result = {'success': 1, 'message': 'the task is performed successfully', 'scores': scores}
+        with tracing.span('serialisation', nodes=len(node_ids)):
+            fields = results.node_scores(node_ids, [a[i] for i in range(len(node_ids))])
+        result = {'success': 1, 'message': 'the task is performed successfully', **fields}
         return result
     except Exception as e:
         print(e)
@@ -118,11 +123,31 @@ def betweenness(network, params):
         graph, node_ids = helpers.convert_to_nx_undirected_graph(network)  # TODO: to be refactor
         # print(graph)
         # print(node_ids)
-        centralities = nx.betweenness_centrality(graph)
-        scores = [(node_ids[i], centralities[i]) for i in range(len(node_ids))]
-        # print(scores)
-        scores = dict(scores)
-        result = {'success': 1, 'message': 'the task is performed successfully', 'scores': scores}
+        # accumulate the dependencies of chunks of source nodes in random order, so that if the budget runs out the
+        # centralities can be estimated from the sources processed so far, as in source sampling
+        sources = list(graph.nodes())
+        random.Random(0).shuffle(sources)
+        targets = list(graph.nodes())
+        centralities = dict.fromkeys(targets, 0.0)
+        num_processed = 0
+        try:
+            for i in range(0, len(sources), betweenness_chunk_size):
+                checkpoint()
+                chunk = sources[i:i + betweenness_chunk_size]
+                dependencies = nx.betweenness_centrality_subset(graph, chunk, targets, normalized=False)
+                for u in dependencies:
+                    centralities[u] += dependencies[u]
+                num_processed += len(chunk)
+        except BudgetExceeded:
+            pass
+        n = len(sources)
+        scale = 2.0 / ((n - 1) * (n - 2)) if n > 2 else 1.0
+        if 0 < num_processed < n:
+            scale *= n / num_processed
+        centralities = dict([(u, centralities[u] * scale) for u in centralities])
+        with tracing.span('serialisation', nodes=len(node_ids)):
+            fields = results.node_scores(node_ids, [centralities[i] for i in range(len(node_ids))])
+        result = {'success': 1, 'message': 'the task is performed successfully', **fields}
         return result
     except Exception as e:
         print(e)
@@ -148,10 +173,9 @@ def katz_centrality(network, params):
         # print(graph)
         # print(node_ids)
         centralities = nx.katz_centrality(graph)
-        scores = [(node_ids[i], centralities[i]) for i in range(len(node_ids))]
-        # print(scores)
-        scores = dict(scores)
-        result = {'success': 1, 'message': 'the task is performed successfully', 'scores': scores}
+        with tracing.span('serialisation', nodes=len(node_ids)):
+            fields = results.node_scores(node_ids, [centralities[i] for i in range(len(node_ids))])
+        result = {'success': 1, 'message': 'the task is performed successfully', **fields}
         return result
     except Exception as e:
         print(e)
@@ -177,10 +201,9 @@ def closeness_centrality(network, params):
         # print(graph)
         # print(node_ids)
         centralities = nx.katz_centrality(graph)
-        scores = [(node_ids[i], centralities[i]) for i in range(len(node_ids))]
-        # print(scores)
-        scores = dict(scores)
-        result = {'success': 1, 'message': 'the task is performed successfully', 'scores': scores}
+        with tracing.span('serialisation', nodes=len(node_ids)):
+            fields = results.node_scores(node_ids, [centralities[i] for i in range(len(node_ids))])
+        result = {'success': 1, 'message': 'the task is performed successfully', **fields}
         return result
     except Exception as e:
         print(e)
@@ -220,13 +220,7 @@ class User(object):
         """ Set new username for user """
         if self.dataset.nodes.get(username):
             raise AlreadyExistsError(f"User by the name {username} already exists!", "User")
-        del self.dataset.nodes[self.get_username()]
-        temp_adj = self.dataset.adj_list[self.get_username()]
-        del self.dataset.adj_list[self.get_username()]
-        self.dataset.adj_list[username] = temp_adj
-        for edge in temp_adj:
-            self.dataset.edges[edge]["source"] = username
-        self.dataset.nodes[username] = self._vertex
+        self.dataset.rename_node(self.get_username(), username)
         return self
 
     def set_password(self, password):
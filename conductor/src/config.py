@@ -46,3 +46,6 @@ except FileNotFoundError:
 
 if not config.get("temp_file_folder"):
     config["temp_file_folder"] = current_dir.parent.parent / "serve/temp/"
+
+if not config.get("embedding_store"):
+    config["embedding_store"] = Path(config["temp_file_folder"]) / "embeddings"
@@ -40,6 +40,7 @@ from .resources.files import FilesResource
 from .resources.roles import RolesResource
 from .resources.datasets_collection import DatasetsCollectionResource
 from .resources.datasets import DatasetsResource
+from .resources.similar_nodes import SimilarNodesResource
 from .resources.tasks_collection import TasksCollectonResource
 from .resources.tasks import TaskResource
 from .resources.network_construction_tasks import NetworkConstructionTasksResource
@@ -54,6 +55,7 @@ files_resource = FilesResource()
 roles_resource = RolesResource()
 datasets_collection_resource = DatasetsCollectionResource()
 dataset_resource = DatasetsResource()
+similar_nodes_resource = SimilarNodesResource()
 tasks_collection_resource = TasksCollectonResource()
 task_resource = TaskResource()
 operations_resource = OperationsResource()
@@ -68,6 +70,7 @@ api.add_route("/files", files_collection_resource)
 api.add_route("/files/{filename}", files_resource)
 api.add_route("/datasets", datasets_collection_resource)
 api.add_route("/datasets/{dataset_name}", dataset_resource)
+api.add_route("/datasets/{dataset_name}/similar_nodes", similar_nodes_resource)
 api.add_route("/tasks", tasks_collection_resource)
 api.add_route("/tasks/network_construction/{task_name}", network_construction_task)
 api.add_route("/tasks/{task_name}", task_resource)
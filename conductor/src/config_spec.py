@@ -46,6 +46,7 @@ from conductor.src.schemas.roles_collection_schemas import create_schema as role
 from conductor.src.schemas.tasks_collection_schemas import list_algorithms_schema
 from conductor.src.schemas.users_collection_schemas import create_schema as users_create, list_users_schema
 from conductor.src.schemas.datasets_schemas import post_input, data_dto, delete_input, error_output
+from conductor.src.schemas.similar_nodes_schemas import post_input as similar_nodes_input, neighbors_output
 from conductor.src.schemas.files_collection_schemas import files_list
 from conductor.src.schemas.operations_schemas import get_response
 from conductor.src.schemas.roles_schemas import role_info, role_create
@@ -206,6 +207,9 @@ spec.components.schema("DatasetNodeIds", post_input)
 spec.components.schema("DatasetNetwork", data_dto)
 spec.components.schema("DatasetErrors", error_output)
 spec.components.schema("DatasetDeleteContents", delete_input)
+# SimilarNodesResource schemas
+spec.components.schema("SimilarNodesRequest", similar_nodes_input)
+spec.components.schema("SimilarNodes", neighbors_output)
 # FilesCollectionResource schemas
 spec.components.schema("FileList", files_list)
 # LoginResource schemas
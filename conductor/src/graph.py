@@ -37,8 +37,9 @@ from .config import config
 
 main_dir = Path(os.path.abspath(__file__)).parents[2]
 
-data_manager = BuiltinDatasetsManager(None, None)
+data_manager = BuiltinDatasetsManager(None, None, memory_budget=config.get("datasets_memory_budget"))
 
 if config.get("datasets"):
     for dataset in config["datasets"]:
-        data_manager.add_dataset(dataset["id"], dataset["name"], main_dir / dataset["path"])
+        data_manager.add_dataset(dataset["id"], dataset["name"], main_dir / dataset["path"], settings=dataset,
+                                 snapshot=True, lazy=True)
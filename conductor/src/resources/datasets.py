@@ -110,7 +110,10 @@ class DatasetsResource(object):
                     weight: 1
         """
         dataset = req.context.user.get_dataset(dataset_name)
-        network = dataset.get_network(req.media["nodes"], req.media.get("params", None))
+        network = dataset.get_network(req.media["nodes"], req.media.get("params", None),
+                                      num_hops=req.media.get("hops", 1), max_fan_out=req.media.get("max_fan_out"),
+                                      time_range=req.media.get("time_range"),
+                                      time_key=req.media.get("time_key", "timestamp"))
         resp.media = {
             "network": split_to_network(network["nodes"], network["edges"])
         }
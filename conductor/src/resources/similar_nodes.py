@@ -0,0 +1,131 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+==============================================================================
+
+ Similar nodes resource handler """
+from falcon import Request, Response, before, HTTP_200
+from ..config import config
+from ..exceptions import TaskError
+from ..hooks.secure_resource import Secure
+from ..helpers.validate_schema import validate_schema
+from ..schemas.similar_nodes_schemas import post_input, neighbors_output
+from ..helpers.log_helpers import log_event
+from ..graph import data_manager
+from analyzer.request_taker import InMemoryAnalyzer
+
+
+@before(Secure("User"))
+class SimilarNodesResource(object):
+    """
+    summary: Similar Nodes Resource
+    description: Finds the nodes of a dataset that are the most similar in the node embedding space
+    """
+
+    @validate_schema(post_input, neighbors_output)
+    def on_post_v1_0(self, req: Request, resp: Response, dataset_name):
+        """
+        summary: Get the most similar nodes
+        parameters:
+            -   in: path
+                name: dataset_name
+                required: true
+                schema:
+                    type: string
+                description: Dataset ID
+        requestBody:
+            description: Node IDs and the similarity search options
+            content:
+                application/json:
+                    schema: SimilarNodesRequest
+                    examples: SimilarNodesPostRequestExample
+                application/msgpack:
+                    schema: SimilarNodesRequest
+                    examples: SimilarNodesPostRequestExample
+        responses:
+            200:
+                description: The most similar nodes of each requested node, most similar first
+                content:
+                    application/json:
+                        schema: SimilarNodes
+                        examples: SimilarNodesPostResponseExample
+                    application/msgpack:
+                        schema: SimilarNodes
+                        examples: SimilarNodesPostResponseExample
+        security:
+            - jwt:
+                - User
+        errors:
+            - name: DatasetDoesNotExistError
+              message: "Couldn't find dataset by name ..."
+              target: dataset name
+            - name: TaskError
+              message: "this algorithm is not suitable for the input network"
+              target: Task
+        examples:
+            - ex_name: SimilarNodesPostRequestExample
+              nodes:
+                - Majed_Moqed
+              top_k: 2
+              options:
+                method: ivf
+                parameters:
+                    embedding_method: svd
+                    K: 16
+            - ex_name: SimilarNodesPostResponseExample
+              neighbors:
+                Majed_Moqed:
+                    - id: Nawaf_Alhazmi
+                      similarity: 0.98
+                    - id: Khalid_Al-Mihdhar
+                      similarity: 0.95
+        """
+        dataset_id = req.context.user.get_username() + dataset_name
+        req.context.user.get_dataset(dataset_name)  # raises if the user has no such dataset
+        options = req.media.get("options", {})
+        parameters = dict(options.get("parameters", {}))
+        parameters["nodes"] = req.media["nodes"]
+        parameters["top_k"] = req.media.get("top_k", 10)
+        analyzer = InMemoryAnalyzer(data_manager)
+        result = analyzer.perform_analysis({
+            "task_id": "similarity_search",
+            "network": dataset_id,
+            "options": {"method": options.get("method", "ivf"), "parameters": parameters}
+        }, params={"embedding_store": str(config["embedding_store"]), "dataset_id": dataset_id})
+        if not result["success"]:
+            raise TaskError(result["message"], "Task")
+        resp.media = {
+            "neighbors": {
+                str(u): [{"id": str(v), "similarity": s} for v, s in result["neighbors"][u]]
+                for u in result["neighbors"]
+            }
+        }
+        resp.status = HTTP_200
+        log_event(req.context.request_id, "Similar nodes returned", dataset=dataset_name)
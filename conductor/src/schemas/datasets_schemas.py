@@ -41,7 +41,26 @@ post_input = {
                 "type": "string"
             }
         },
-        "params": {}
+        "params": {},
+        "hops": {
+            "type": "integer",
+            "minimum": 0
+        },
+        "max_fan_out": {
+            "type": "integer",
+            "minimum": 1
+        },
+        "time_range": {
+            "type": "array",
+            "items": {
+                "type": ["string", "number", "null"]
+            },
+            "minItems": 2,
+            "maxItems": 2
+        },
+        "time_key": {
+            "type": "string"
+        }
     },
     "required": ["nodes"]
 }
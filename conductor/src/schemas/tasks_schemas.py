@@ -48,7 +48,13 @@ post_input = {
             },
             "required": ["method", "parameters"]
         },
-        "parameters": {"type": "object"}
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "timeout": {"type": "number"},
+                "max_memory": {"type": "number"}
+            }
+        }
     }
 }
 
@@ -250,6 +250,24 @@ class DataManager:
         """
         pass
 
+    def get_csr_view(self, network, node_ids=None, params=None):
+        """
+        get the edges of a network or sub-network as arrays, i.e., the view needed to build its sparse adjacency matrix,
+        without exporting the edges with their properties
+        :param network: a string to identify a unique network
+        :param node_ids: list of the nodes' id, if `None` then the whole network, see `get_network`
+        :param params: dictionary that contains criteria to select edges, see `get_network`
+        :return: dictionary in the following format, or None if the network is not found
+                {
+                    "rows": numpy array, rows[i] is the index of the source node of edge i
+                    "cols": numpy array, cols[i] is the index of the target node of edge i
+                    "weights": numpy array, weights[i] is the weight of edge i, 1.0 if not given
+                    "node_ids": list, node_ids[j] is the id of the node of index j, in the order of first appearance
+                        in the edges
+                }
+        """
+        pass
+
     def dump_network(self, network, output_dir, params=None):
         """
         dump the whole network to a specified directory
@@ -317,13 +335,15 @@ class DataManager:
         """
         pass
 
-    def search_nodes(self, node_ids, network, params=None):
+    def search_nodes(self, node_ids, network, params=None, text=None, prefix=False):
         """
         get information about a list of nodes from a network
         :param node_ids: list of node ids
         :param network: a string to identify a unique network
         :param params: list of properties associated with the nodes, e.g., "name", "type", "community",
             "centrality", "embedding", etc.
+        :param text: (optional) text to find, case insensitively, in the ids or names of the nodes
+        :param prefix: True if the id or name of a node should start with `text`, otherwise contain it
         :return: dictionary that contains in the following format
                 {
                     "found": list of dictionaries, each for a found node, in the following format
@@ -29,17 +29,24 @@ ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
 SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 ==============================================================================
 """
+from bisect import insort
 import base64
 import sys
 import os
 import json
 import networkx as nx
+import numpy as np
 import io
 import random
 import copy
 import ast
+import time
+import threading
+import itertools
+from collections import OrderedDict
 from copy import deepcopy
 from pathlib import Path
+from array import array
 
 # find path to root directory of the project so as to import from other packages
 # to be refactored
@@ -54,23 +61,60 @@ if path2root not in sys.path:
 
 from framework.interfaces import DataManager
 from storage import helpers
+from storage import json_lines
+from storage import snapshot as snapshot_io
+from storage.json_lines import JsonLinesWriter, LoadStats, StringPool, iter_json_lines, iter_json_lines_content
+from storage.edge_index import EdgeIndex, get_edge_type
+from storage.node_index import NodeIndex
+from storage.change_journal import ChangeJournal, MISSING, apply_diff, get_diff
+from storage.csr_graph import CSRGraph
+from storage.degree_index import DegreeIndex, get_edge_weight
+from storage.filters import EdgeFilter, compile_filter
+from storage.temporal_index import TemporalIndex, default_time_key
+from storage.weight_stats import WeightStats, get_weight
 from analyzer.request_taker import InMemoryAnalyzer
 import visualizer.io_utils as converter
 
 node_update_action = 'update_node'
 node_add_action = 'add_node'
 node_delete_action = 'delete_node'
+node_rename_action = 'rename_node'
 
 edge_update_action = 'update_edge'
 edge_add_action = 'add_edge'
 edge_delete_action = 'delete_edge'
 
-max_num_recent_changes = 20
+bulk_action = 'bulk'  # compound action of a bulk change, its 'changes' are the actions above
+
+max_num_recent_changes = 1000
+max_recent_changes_bytes = 64 * 1024 * 1024  # memory budget of the change journal of a dataset
 max_num_recent_interactions = 20
 
 
+class Revision:
+    """
+    number of changes of the nodes and edges, shared by the datasets sharing them, see `BuiltinDataset.share_data`
+    """
+
+    def __init__(self):
+        self.value = 0
+
+
 class BuiltinDataset:
-    def __init__(self, path_2_data, uploaded=False, from_file=True):
+    def __init__(self, path_2_data, uploaded=False, from_file=True, snapshot=False, indexes=None):
+        """
+        :param path_2_data: path to data file, or its content if uploaded
+        :param uploaded: True if path_2_data is the content of an uploaded file
+        :param from_file: True if to read from path_2_data
+        :param snapshot: True to open the binary snapshot of the file instead of parsing it, the snapshot is written
+            next to the file, and written again whenever the content of the file changes, see `storage.snapshot`
+        :param indexes: (optional) dictionary declaring the node indexes used by `search_nodes`, in the following
+            format
+                {
+                    "keys": list of node property keys to index by value, `type` is always indexed
+                    "text_keys": list of node property keys to index for text search, ["name"] if not given
+                }
+        """
         # dataset info
         self.name = None
         self.nodes = {}
@@ -79,179 +123,393 @@ class BuiltinDataset:
         self.in_adj_list = {}
         self.node_types = {}
         self.edge_types = {}
-        self.recent_changes = []
+        # undo/redo journal of the changes, see `undo`, `redo` and `rollback`
+        self.journal = ChangeJournal(max_num_recent_changes, max_recent_changes_bytes)
         self.meta_info = {}
+        self.edge_index = EdgeIndex()  # built on the first lookup of an edge
+        self.node_index = NodeIndex(**(indexes or {}))  # built on the first indexed search
+        self.csr_graph = None  # built on the first ego-network extraction, see `get_csr_graph`
+        self.degree_index = DegreeIndex(self)  # see `get_degree_index`
+        self.weight_stats = WeightStats(self)  # see `get_weight_range`
+        self.temporal_indexes = {}  # time key -> TemporalIndex, built on the first time range, see `get_temporal_index`
+        # the indexes above are of the nodes and edges at revision self.synced_revision, see `_sync_indexes`
+        self.revision = Revision()
+        self.synced_revision = 0
+        self.num_deleted_edges = 0  # number of deleted edges left as None in self.edges, see `compact`
+        self.compaction_ratio = None  # ratio of deleted edges over which deletes compact the edges, never if None
+        self.load_stats = None  # throughput of loading the dataset, see `json_lines.LoadStats.to_dict`
+        self.dump_stats = None  # throughput of the last dump of the dataset, see `json_lines.DumpStats.to_dict`
         if from_file:
+            stats = LoadStats()
+            snapshot_path = snapshot_io.get_snapshot_path(path_2_data) if snapshot and not uploaded else None
             if uploaded:
-                file = path_2_data
-                for line in file.splitlines():
-                    line = line.strip()
-                    if len(line) == 0:
-                        continue
-                    if line.startswith('#'):  # ignore the comments
-                        continue
-                    line_object = json.loads(line)
-                    if line_object['type'] == 'node':
-                        node = line_object['properties']
-                        if 'community' in line_object:
-                            node['community'] = line_object['community']
-                            node['community_confidence'] = line_object['community_confidence']
-                        if 'social_influence_score' in line_object:
-                            node['social_influence_score'] = line_object['social_influence_score']
-                            node['normalized_social_influence'] = line_object['normalized_social_influence']
-                        self.nodes[line_object['id']] = node
-                        if 'type' in node:
-                            node_type = node['type']
-                            if node_type in self.node_types:
-                                self.node_types[node_type] += 1
-                            else:
-                                self.node_types[node_type] = 1
-
-                    elif line_object['type'] == 'edge':
-                        edge = {'source': line_object['source'], 'target': line_object['target'],
-                                'observed': True, 'properties': line_object['properties']}
-                        if 'observed' in line_object:
-                            if line_object['observed'] == 'false':
-                                edge['observed'] = 'false'
-                        self.edges.append(edge)
-                        e_index = len(self.edges) - 1
-                        source = edge['source']
-                        if source in self.adj_list:
-                            self.adj_list[source].append(e_index)
-                        else:
-                            self.adj_list[source] = [e_index]
-                        target = edge['target']
-                        if target in self.in_adj_list:
-                            self.in_adj_list[target].append(e_index)
-                        else:
-                            self.in_adj_list[target] = [e_index]
-
-                        if 'type' in line_object['properties']:
-                            edge_type = line_object['properties']['type']
-                            if edge_type in self.edge_types:
-                                self.edge_types[edge_type] += 1
-                            else:
-                                self.edge_types[edge_type] = 1
+                self._load_records(iter_json_lines_content(path_2_data, stats), uploaded=True)
+            elif not (snapshot_path is not None and snapshot_io.is_up_to_date(path_2_data, snapshot_path) and
+                      self._read_snapshot(path_2_data, snapshot_path, stats)):
+                with json_lines.open_json_lines(path_2_data) as file:
+                    if file.peek(2)[:2] == b'{\n':
+                        decoded = file.read()
+                        stats.num_bytes += len(decoded)
+                        in_data = json_lines.loads(decoded)
+                        data_list = converter.new_to_old(in_data)
+                        stats.num_records += len(data_list)
+                        try:
+                            self.meta_info['directed'] = in_data['directed']
+                            self.meta_info['multigraph'] = in_data['multigraph']
+                            self.meta_info['graph'] = in_data['graph']
+                        except KeyError:
+                            print(
+                                'Input JOSN must have directed, multigraph and graph fields. See specification for information.')
+                        self._load_records(data_list)
                     else:
-                        continue
-            else:
-                file = open(path_2_data, 'r')
-                decoded = file.read()
-                if decoded.startswith("{\n"):
-                    in_data = json.loads(decoded)
-                    data_list = converter.new_to_old(in_data)
+                        self._load_records(iter_json_lines(file, stats))
+                if snapshot_path is not None:
                     try:
-                        self.meta_info['directed'] = in_data['directed']
-                        self.meta_info['multigraph'] = in_data['multigraph']
-                        self.meta_info['graph'] = in_data['graph']
-                    except KeyError:
-                        print(
-                            'Input JOSN must have directed, multigraph and graph fields. See specification for information.')
-                else:
-                    # a = json.loads(decoded)
-                    data_list = [json.loads(line.strip()) for line in decoded.split('\n') if
-                                 len(line) != 0 and not line.startswith('#')]
-
-                # print('decoded = ', decoded)
-                for line_object in data_list:
-                    if line_object['type'] == 'node':
-                        node = line_object['properties']
-                        node['id'] = line_object['id']
-                        self.nodes[line_object['id']] = node
-                        if 'type' in node:
-                            node_type = node['type']
-                            if node_type in self.node_types:
-                                self.node_types[node_type] += 1
-                            else:
-                                self.node_types[node_type] = 1
-                    elif line_object['type'] == 'edge':
-                        edge = {'source': line_object['source'], 'target': line_object['target'],
-                                'observed': True, 'properties': line_object['properties']}
-                        self.edges.append(edge)
-                        e_index = len(self.edges) - 1
-                        source = edge['source']
-                        if source in self.adj_list:
-                            self.adj_list[source].append(e_index)
-                        else:
-                            self.adj_list[source] = [e_index]
-                        target = edge['target']
-                        if target in self.in_adj_list:
-                            self.in_adj_list[target].append(e_index)
-                        else:
-                            self.in_adj_list[target] = [e_index]
-                        if 'type' in line_object['properties']:
-                            edge_type = line_object['properties']['type']
-                            if edge_type in self.edge_types:
-                                self.edge_types[edge_type] += 1
-                            else:
-                                self.edge_types[edge_type] = 1
-                    else:
-                        continue
-                file.close()
-
+                        with helpers.gc_paused():
+                            snapshot_io.write_snapshot(self, path_2_data, snapshot_path)
+                    except OSError as e:
+                        print('cannot write the snapshot of %s: %s' % (path_2_data, e))
+            stats.stop()
+            self.load_stats = stats.to_dict()
         else:
             # create network on-the-fly
             # TODO: supposed to be refactored
             pass
 
-    def _generate_edges_nodes_and_node_ids_for_analyzing(self, network_edges, params):
-        nx_nodes = {}
-        nx_edges = []
-        nx_node_ids = []
+    def _read_snapshot(self, path_2_data, snapshot_path, stats):
+        """
+        load the dataset from the snapshot of its file, see `storage.snapshot.read_snapshot`
+        :param path_2_data: path to the data file
+        :param snapshot_path: directory of the snapshot
+        :param stats: LoadStats
+        :return: True if loaded, False if the snapshot was replaced by another process while it was read, the dataset
+            is left empty then, to be parsed from the file
+        """
+        try:
+            with helpers.gc_paused():
+                snapshot_io.read_snapshot(self, snapshot_path)
+        except OSError as e:
+            print('cannot read the snapshot of %s: %s' % (path_2_data, e))
+            self.nodes = {}
+            self.edges = []
+            self.adj_list = {}
+            self.in_adj_list = {}
+            self.node_types = {}
+            self.edge_types = {}
+            self.meta_info = {}
+            return False
+        stats.parser = 'snapshot'
+        stats.num_bytes = os.path.getsize(path_2_data)
+        stats.num_records = len(self.nodes) + len(self.edges)
+        return True
 
-        for e in network_edges:
-            if e is None:
-                continue
-            if helpers.is_valid_edge(e, params):
-                source = e['source']
-                target = e['target']
-                if source not in nx_nodes:
-                    source_index = len(nx_node_ids)
-                    nx_nodes[source] = source_index
-                    nx_node_ids.append(source)
+    def _load_records(self, records, uploaded=False):
+        """
+        add the nodes and edges of parsed records
+        repeated strings are pooled, and the edges are grouped into the adjacency lists from arrays of node codes once
+        all records are read, instead of looking up the lists of both end nodes for every edge
+        :param records: iterable of records, each is a node or an edge
+        :param uploaded: True if the records come from an uploaded file, whose nodes may carry analysis results
+        """
+        with helpers.gc_paused():
+            self._add_records(records, uploaded)
+
+    def _add_records(self, records, uploaded):
+        pool = StringPool()
+        node_codes = {}  # node id -> code, codes are assigned in order of appearance
+        code_node_ids = []
+        sources = array('q')
+        targets = array('q')
+        first_edge = len(self.edges)
+        for line_object in records:
+            if line_object['type'] == 'node':
+                node = pool.get_properties(line_object['properties'])
+                node_id = pool.get(line_object['id'])
+                if uploaded:
+                    if 'community' in line_object:
+                        node['community'] = line_object['community']
+                        node['community_confidence'] = line_object['community_confidence']
+                    if 'social_influence_score' in line_object:
+                        node['social_influence_score'] = line_object['social_influence_score']
+                        node['normalized_social_influence'] = line_object['normalized_social_influence']
                 else:
-                    source_index = nx_nodes[source]
+                    node['id'] = node_id
+                self.nodes[node_id] = node
+                if 'type' in node:
+                    node_type = node['type']
+                    self.node_types[node_type] = self.node_types.get(node_type, 0) + 1
+
+            elif line_object['type'] == 'edge':
+                end_nodes = []
+                for u, codes in ((line_object['source'], sources), (line_object['target'], targets)):
+                    code = node_codes.get(u)
+                    if code is None:
+                        code = len(code_node_ids)
+                        u = pool.get(u)
+                        node_codes[u] = code
+                        code_node_ids.append(u)
+                    codes.append(code)
+                    end_nodes.append(code_node_ids[code])
+                properties = pool.get_properties(line_object['properties'])
+                edge = {'source': end_nodes[0], 'target': end_nodes[1], 'observed': True, 'properties': properties}
+                if uploaded and 'observed' in line_object:
+                    if line_object['observed'] == 'false':
+                        edge['observed'] = 'false'
+                self.edges.append(edge)
+                if 'type' in properties:
+                    edge_type = properties['type']
+                    self.edge_types[edge_type] = self.edge_types.get(edge_type, 0) + 1
+            else:
+                continue
 
-                if target not in nx_nodes:
-                    target_index = len(nx_node_ids)
-                    nx_nodes[target] = target_index
-                    nx_node_ids.append(target)
+        for codes, adj_list in ((sources, self.adj_list), (targets, self.in_adj_list)):
+            if len(codes) == 0:
+                continue
+            codes = np.frombuffer(codes, dtype=np.int64)
+            order = np.argsort(codes, kind='stable')
+            sorted_codes = codes[order]
+            bounds = np.flatnonzero(sorted_codes[1:] != sorted_codes[:-1]) + 1
+            starts = np.concatenate(([0], bounds)).tolist()
+            ends = np.concatenate((bounds, [len(codes)])).tolist()
+            edge_indexes = (order + first_edge).tolist()
+            for code, start, end in zip(sorted_codes[starts].tolist(), starts, ends):
+                u = code_node_ids[code]
+                if u in adj_list:
+                    adj_list[u].extend(edge_indexes[start:end])
                 else:
-                    target_index = nx_nodes[target]
+                    adj_list[u] = edge_indexes[start:end]
 
-                nx_edges.append((source_index, target_index))
+    def share_data(self, dataset):
+        """
+        use the nodes and edges of another dataset, the changes made through either dataset are seen by the other, the
+        indexes of one are dropped after a change made through the other, see `_sync_indexes`
+        :param dataset: BuiltinDataset
+        """
+        self.nodes = dataset.nodes
+        self.edges = dataset.edges
+        self.adj_list = dataset.adj_list
+        self.in_adj_list = dataset.in_adj_list
+        self.node_types = dataset.node_types
+        self.edge_types = dataset.edge_types
+        self.revision = dataset.revision
+        self._clear_indexes()
 
-        return nx_edges, nx_nodes, nx_node_ids
+    def _clear_indexes(self):
+        """
+        drop the indexes of the nodes and edges, they are built again on their next use
+        """
+        self.edge_index.clear()
+        self.node_index.clear()
+        self.csr_graph = None
+        self.degree_index.clear()
+        self.weight_stats.clear()
+        self.temporal_indexes.clear()
+        self.synced_revision = self.revision.value
 
-    def get_network(self, node_ids=None, params=None, return_edge_index=False):
+    def _sync_indexes(self):
+        """
+        drop the indexes if the nodes or edges were changed through another dataset sharing them, the indexes are kept
+        up to date by the changes made through this dataset, see `_count_change`
+        """
+        if self.synced_revision != self.revision.value:
+            self._clear_indexes()
+
+    def _count_change(self):
+        """
+        count a change of the nodes or edges made through this dataset, before its indexes are updated with it
+        """
+        self._sync_indexes()
+        self.revision.value += 1
+        self.synced_revision = self.revision.value
+
+    def get_out_edge_indexes(self, node, edge_types=None):
+        """
+        :param node: id of the node
+        :param edge_types: (optional) list of edge types to select, all types if None
+        :return: list of indexes of the out-going edges of the node, in increasing order
+        """
+        if edge_types is None:
+            return self.adj_list.get(node, [])
+        self._sync_indexes()
+        return self.edge_index.find_out_edges(self.edges, node, edge_types)
+
+    @staticmethod
+    def _split_edge_types(params):
+        """
+        :param params: dictionary of criteria to select edges, may contain "edge_types": list of edge types to select
+        :return: the edge types, None if not given, and the other criteria
+        """
+        if params is None or 'edge_types' not in params:
+            return None, params
+        params = dict(params)
+        edge_types = params.pop('edge_types')
+        return edge_types, (params if len(params) > 0 else None)
+
+    def _get_next_edges(self, node, edge_filter, edge_types=None):
+        """
+        find the first edge from the node to each of its neighbors
+        :param node: id of the node
+        :param edge_filter: EdgeFilter of the other criteria to select edges, see `storage.filters.EdgeFilter`
+        :param edge_types: (optional) list of edge types to select
+        :return: dictionary of neighbor id -> edge, in the order of the edges
+        """
+        next_edges = {}
+        is_valid = edge_filter.is_valid
+        for e_index in self.get_out_edge_indexes(node, edge_types):
+            edge = self.edges[e_index]
+            if edge is None or edge['target'] in next_edges:
+                continue
+            if is_valid(edge):
+                next_edges[edge['target']] = edge
+        return next_edges
+
+    def get_csr_graph(self):
+        """
+        :return: the CSR view of the dataset, built again if the dataset changed, see `storage.csr_graph.CSRGraph`
+        """
+        self._sync_indexes()
+        if self.csr_graph is None or self.csr_graph.is_stale(self.nodes, self.edges, self.adj_list):
+            self.csr_graph = CSRGraph(self.nodes, self.edges, self.adj_list)
+        return self.csr_graph
+
+    def get_temporal_index(self, time_key=default_time_key):
+        """
+        :param time_key: property of the edges holding their time
+        :return: the edges sorted by time, built again if the dataset changed, see
+            `storage.temporal_index.TemporalIndex`
+        """
+        self._sync_indexes()
+        temporal_index = self.temporal_indexes.get(time_key)
+        if temporal_index is None or temporal_index.is_stale(self.edges):
+            temporal_index = self.temporal_indexes[time_key] = TemporalIndex(self.edges, time_key)
+        return temporal_index
+
+    def _get_ego_network(self, node_ids, params, num_hops, max_fan_out, time_range=None, time_key=default_time_key):
+        csr_graph = self.get_csr_graph()
+        if node_ids is None:
+            seeds = np.arange(csr_graph.num_nodes)
+        else:
+            seeds = csr_graph.get_codes(node_ids)
+        mask = EdgeFilter(params).get_mask(csr_graph, self.edges)
+        if time_range is not None:
+            time_mask = self.get_temporal_index(time_key).get_mask(*time_range)
+            mask = time_mask if mask is None else mask & time_mask
+        edge_indexes, node_codes = csr_graph.get_ego_network(seeds, num_hops, max_fan_out, mask)
+        node_codes = node_codes[node_codes < csr_graph.num_nodes]
+        return edge_indexes, [csr_graph.node_ids[code] for code in node_codes.tolist()]
+
+    def _get_time_slice(self, params, time_range, time_key):
+        """
+        :return: array of the indexes of the selected edges in the time range, in increasing time, and the ids of their
+            end nodes, in order of first appearance
+        """
+        edge_indexes = self.get_temporal_index(time_key).get_edge_indexes(*time_range)
+        if params:
+            edges = self.edges
+            is_valid = EdgeFilter(params).is_valid
+            selected = np.fromiter((edges[e] is not None and is_valid(edges[e]) for e in edge_indexes.tolist()),
+                                   dtype=bool, count=len(edge_indexes))
+            edge_indexes = edge_indexes[selected]
+        csr_graph = self.get_csr_graph()
+        ends = np.column_stack((csr_graph.sources[edge_indexes], csr_graph.targets[edge_indexes])).ravel()
+        _, first = np.unique(ends, return_index=True)
+        node_codes = ends[np.sort(first)]
+        node_codes = node_codes[(node_codes >= 0) & (node_codes < csr_graph.num_nodes)]
+        return edge_indexes, [csr_graph.node_ids[code] for code in node_codes.tolist()]
+
+    def _select_network(self, node_ids, params, num_hops, max_fan_out, time_range, time_key):
+        if time_range is not None and node_ids is None:
+            return self._get_time_slice(params, time_range, time_key)
+        return self._get_ego_network(node_ids, params, num_hops, max_fan_out, time_range, time_key)
+
+    def get_network(self, node_ids=None, params=None, return_edge_index=False, num_hops=1, max_fan_out=None,
+                    as_arrays=False, time_range=None, time_key=default_time_key):
         """
         mimic the get_network function of DataManager, i.e., getting ego-network surrounding node_ids
+        the ego-network is extracted from the CSR view of the dataset, see `storage.csr_graph.CSRGraph.get_ego_network`
+        :param node_ids: the whole network if None or empty
+        :param params: dictionary of criteria to select the edges, "edge_types", "min_weight" and "min_confidence" are
+            selected on the columns of the CSR view, the others are checked edge by edge
+        :param return_edge_index: True to return the indexes of the edges instead of the edges
+        :param num_hops: number of hops from node_ids
+        :param max_fan_out: (optional) maximum number of edges followed from a node
+        :param as_arrays: True to return the indexes of the edges as an array, and the ids of the nodes
+        :param time_range: (optional) (start, end) to only select the edges whose time is in [start, end), either may
+            be None, the times are numbers, ISO 8601 strings or datetimes, see `storage.temporal_index.to_time`
+            the whole network in the range is a slice of the temporal index, its edges are in increasing time and its
+            nodes are the end nodes of the edges
+        :param time_key: property of the edges holding their time
+        :return: dictionary {'edges': list of edges, 'nodes': list of {'id', 'properties'}}, or
+            {'edges': array of edge indexes, 'nodes': list of node ids} if as_arrays is True
+        """
+        if node_ids is not None:
+            node_ids = list(node_ids)
+            if len(node_ids) == 0:
+                node_ids = None
+        edge_indexes, nodes = self._select_network(node_ids, params, num_hops, max_fan_out, time_range, time_key)
+        edge_list = edge_indexes.tolist()
+        if any([self.edges[e] is None for e in edge_list]):
+            # the edges were deleted through another dataset sharing them, e.g., an active network
+            self.csr_graph = None
+            self.temporal_indexes.clear()
+            edge_indexes, nodes = self._select_network(node_ids, params, num_hops, max_fan_out, time_range, time_key)
+            edge_list = edge_indexes.tolist()
+        if as_arrays:
+            return {'edges': edge_indexes, 'nodes': nodes}
+        nodes = [{'id': u, 'properties': self.nodes[u]} for u in nodes]
+        if not return_edge_index:
+            edge_list = [self.edges[e] for e in edge_list]
+        return {'edges': edge_list, 'nodes': nodes}
+
+    def iter_time_windows(self, width, step=None, start=None, end=None, node_ids=None, params=None,
+                          return_edge_index=False, num_hops=1, max_fan_out=None, as_arrays=False,
+                          time_key=default_time_key):
+        """
+        get the network of each window sliding over the times of the edges, the dataset is loaded once for all the
+        windows, and the whole network of a window is a slice of the temporal index
+        :param width: length of a window, in seconds or as a timedelta
+        :param step: (optional) shift between windows, the width if None
+        :param start: (optional) start of the first window, the first time of the edges if None
+        :param end: (optional) no window starts at or after end, the last time of the edges if None
+        :param node_ids: see `get_network`
+        :param params: see `get_network`
+        :param return_edge_index: see `get_network`
+        :param num_hops: see `get_network`
+        :param max_fan_out: see `get_network`
+        :param as_arrays: see `get_network`
+        :param time_key: property of the edges holding their time
+        :return: generator of (window start, window end, network of the window, see `get_network`), the ends of the
+            windows are in seconds since the epoch, see `storage.temporal_index.TemporalIndex.iter_windows`
+        """
+        for window_start, window_end, _ in self.get_temporal_index(time_key).iter_windows(width, step, start, end):
+            network = self.get_network(node_ids, params, return_edge_index=return_edge_index, num_hops=num_hops,
+                                       max_fan_out=max_fan_out, as_arrays=as_arrays,
+                                       time_range=(window_start, window_end), time_key=time_key)
+            yield window_start, window_end, network
+
+    def get_csr_view(self, node_ids=None, params=None):
+        """
+        mimic the get_csr_view function of DataManager, i.e., getting the edges of the ego-network surrounding
+        node_ids as arrays
         :param node_ids:
         :param params:
         :return:
         """
-        if node_ids is None:
-            node_ids = list(self.nodes.keys())
-        else:
-            if len(list(node_ids)) == 0:
-                node_ids = list(self.nodes.keys())
-        edges = []
-        for u in node_ids:
-            if u in self.adj_list:
-                edges.extend(self.adj_list[u])
-        edges = [e for e in edges if helpers.is_valid_edge(self.edges[e], params)]
-        involved_nodes = set([self.edges[e]['target'] for e in edges])
-        node_ids = set(node_ids)
-        involved_nodes = involved_nodes.union(node_ids)
-        for v in involved_nodes:
-            if v in self.adj_list:
-                if v not in node_ids:
-                    edges.extend([e for e in self.adj_list[v] if self.edges[e]['target'] in involved_nodes and
-                                  helpers.is_valid_edge(self.edges[e]['target'], params)])
-        nodes = [{'id': u, 'properties': self.nodes[u]} for u in involved_nodes if u in self.nodes]
-        if not return_edge_index:
-            edges = [self.edges[e] for e in edges]
-        return {'edges': edges, 'nodes': nodes}
+        edge_indexes = self.get_network(node_ids, params, as_arrays=True)['edges']
+        csr_graph = self.csr_graph
+        # the nodes are numbered in the order of their first appearance in the edges, source before target
+        ends = np.empty(2 * len(edge_indexes), dtype=np.int64)
+        ends[0::2] = csr_graph.sources[edge_indexes]
+        ends[1::2] = csr_graph.targets[edge_indexes]
+        codes, first, inverse = np.unique(ends, return_index=True, return_inverse=True)
+        order = np.argsort(first)
+        ranks = np.empty(len(codes), dtype=np.int64)
+        ranks[order] = np.arange(len(codes))
+        view_codes = ranks[inverse.reshape(-1)]
+        weights = csr_graph.get_column('weight')[edge_indexes]
+        weights[np.isnan(weights)] = 1.0
+        return {'rows': view_codes[0::2], 'cols': view_codes[1::2], 'weights': weights,
+                'node_ids': [csr_graph.node_ids[code] for code in codes[order].tolist()]}
 
     def get_edges(self, node_ids=None, params=None):
         """
@@ -264,25 +522,20 @@ class BuiltinDataset:
         if node_ids is None:
             node_ids = list(self.nodes.keys())
 
-        nx_edges, nx_nodes, _ = self._generate_edges_nodes_and_node_ids_for_analyzing(self.edges, params)
-        nx_graph = nx.DiGraph()
-        nx_graph.add_edges_from(nx_edges)
-
-        nx_found_next_edges = []
-        nx_not_found_next_edges = []
+        edge_types, params = self._split_edge_types(params)
+        is_valid_node = compile_filter(params)
+        edge_filter = EdgeFilter(params)
+        found_next_edges = []
+        not_found_next_edges = []
         for checking_node in node_ids:
             if checking_node in self.adj_list:
-                if helpers.is_valid_node(checking_node, params):
-                    nx_checking_node_id = nx_nodes.get(checking_node)
-                    nx_next_edges = []
-                    for edge in nx_graph.edges(nx_checking_node_id):
-                        temp_edge = self.edges[nx_edges.index(edge)]
-                        nx_next_edges.append(temp_edge)
-                    nx_found_next_edges.append({'id': checking_node, 'edges': nx_next_edges})
+                if is_valid_node(checking_node):
+                    next_edges = self._get_next_edges(checking_node, edge_filter, edge_types)
+                    found_next_edges.append({'id': checking_node, 'edges': list(next_edges.values())})
             else:
-                nx_not_found_next_edges.append(checking_node)
+                not_found_next_edges.append(checking_node)
 
-        return {'found': nx_found_next_edges, 'not_found': nx_not_found_next_edges}
+        return {'found': found_next_edges, 'not_found': not_found_next_edges}
 
     def get_neighbors(self, node_ids=None, params=None):
         """
@@ -294,78 +547,366 @@ class BuiltinDataset:
         if node_ids is None:
             node_ids = list(self.nodes.keys())
 
-        nx_edges, nx_nodes, nx_node_ids = self._generate_edges_nodes_and_node_ids_for_analyzing(self.edges, params)
-        nx_graph = nx.DiGraph()
-        nx_graph.add_edges_from(nx_edges)
-
-        nx_found_neighbors = []
-        nx_not_found_neighbors = []
+        edge_types, params = self._split_edge_types(params)
+        is_valid_node = compile_filter(params)
+        edge_filter = EdgeFilter(params)
+        found_neighbors = []
+        not_found_neighbors = []
 
         for checking_node in node_ids:
             if checking_node in self.adj_list:
-                if helpers.is_valid_node(checking_node, params):
-                    nx_checking_node_id = nx_nodes.get(checking_node)
-                    nx_neighbors = []
-                    for nx_neighbor_node_id in nx_graph.neighbors(nx_checking_node_id):
-                        neighbor_node_id = nx_node_ids[nx_neighbor_node_id]
-                        temp_nx_edge = (nx_checking_node_id, nx_neighbor_node_id)
-                        temp_edge_properties = self.edges[nx_edges.index(temp_nx_edge)].get('properties')
-
+                if is_valid_node(checking_node):
+                    neighbors = []
+                    for neighbor_node_id, edge in self._get_next_edges(checking_node, edge_filter, edge_types).items():
                         neighbor = {'neighbor_id': neighbor_node_id,
                                     'properties': self.nodes[neighbor_node_id],
-                                    'edges_properties': temp_edge_properties}
-                        nx_neighbors.append(neighbor)
-                    nx_found_neighbors.append({'id': checking_node, 'neighbors': nx_neighbors})
+                                    'edges_properties': edge.get('properties')}
+                        neighbors.append(neighbor)
+                    found_neighbors.append({'id': checking_node, 'neighbors': neighbors})
             else:
-                nx_not_found_neighbors.append(checking_node)
-
-        # for u in node_ids:
-        #     if u in self.adj_list:
-        #         edges = [e for e in self.adj_list[u] if helpers.is_valid_edge(self.edges[e], params)]             
-        #         edges = [e for e in edges if helpers.is_valid_node(self.nodes[self.edges[e]['target']], params)]
-
-        #         if len(edges) > 0:
-        #             groups = {}
-        #             for e in edges:
-        #                 v = self.edges[e]['target']
-        #                 if v in groups:
-        #                     groups[v].append(e)
-        #                 else:
-        #                     groups[v] = [e]
-        #             neighbors = []
-        #             for v in groups:
-        #                 v_edges = groups[v]
-        #                 v_edges = [self.edges[e]['properties'] for e in v_edges]
-        #                 neighbor = {'neighbor_id': v, 'properties': self.nodes[v], 'edges': v_edges}
-        #                 neighbors.append(neighbor)
-        #             found.append({'id': u, 'neighbors': neighbors})
-        #     else:
-        #         not_found.append(u)
-
-        return {'found': nx_found_neighbors, 'not_found': nx_not_found_neighbors}
-
-    def search_nodes(self, node_ids=None, params=None):
+                not_found_neighbors.append(checking_node)
+
+        return {'found': found_neighbors, 'not_found': not_found_neighbors}
+
+    def search_nodes(self, node_ids=None, params=None, text=None, prefix=False):
         """
         mimic the search_nodes function of DataManager
+        the nodes of the whole dataset are searched with the node index when params has an indexed key, or text is
+        given, see `storage.node_index.NodeIndex`
         :param node_ids:
-        :param params:
+        :param params: dictionary of property values the nodes should have
+        :param text: (optional) text to find, case insensitively, in the node ids or the values of the text keys
+        :param prefix: True if the node id or a text value should start with text, else contain it
         :return:
         """
         if node_ids is None:
-            node_ids = list(self.nodes.keys())
+            self._sync_indexes()
+            node_ids = self.node_index.select(self.nodes, params, text, prefix)
+            if node_ids is None:
+                node_ids = list(self.nodes.keys())
+            text = None
         found = []
         not_found = []
+        is_valid = compile_filter(params)
         for u in node_ids:
             if u in self.nodes:
-                if helpers.is_valid_node(self.nodes[u], params):
+                if is_valid(self.nodes[u]) and \
+                        (text is None or self._match_text(u, text, prefix)):
                     found.append({'id': u, 'properties': self.nodes[u]})
             else:
                 not_found.append(u)
         return {'found': found, 'not_found': not_found}
 
-    def forget_changes(self):
-        if len(self.recent_changes) > max_num_recent_changes:
-            self.recent_changes = self.recent_changes[-max_num_recent_changes:]
+    def _match_text(self, node, text, prefix):
+        text = text.lower()
+        properties = self.nodes[node] or {}
+        for value in [node] + [properties.get(key) for key in self.node_index.text_keys]:
+            if isinstance(value, str) and (value.lower().startswith(text) if prefix else text in value.lower()):
+                return True
+        return False
+
+    @property
+    def recent_changes(self):
+        """
+        list of the applied changes, the oldest first, see `journal`
+        """
+        return self.journal.get_records()
+
+    @recent_changes.setter
+    def recent_changes(self, changes):
+        self.journal.clear()
+        for change in changes:
+            self.journal.record(change)
+
+    def remember_changes(self, changes):
+        """
+        remember the actions of a bulk change as a single compound action
+        :param changes: list of actions
+        """
+        if len(changes) == 0:
+            return
+        if len(changes) == 1:
+            self.journal.record(changes[0])
+        else:
+            self.journal.record({'action': bulk_action, 'changes': changes})
+
+    def _keep_node_image(self, node):
+        """
+        keep the state of a node for the last checkpoint before changing it, see `ChangeJournal`
+        """
+        if self.journal.needs_image('nodes', node):
+            if node in self.nodes:
+                properties = self.nodes[node]
+                image = dict(properties) if properties is not None else None
+            else:
+                image = MISSING
+            self.journal.keep_image('nodes', node, image)
+
+    def _keep_edge_image(self, e_index):
+        """
+        keep the state of an edge for the last checkpoint before changing it, see `ChangeJournal`
+        """
+        if self.journal.needs_image('edges', e_index):
+            edge = self.edges[e_index] if e_index < len(self.edges) else None
+            if edge is None:
+                image = MISSING
+            else:
+                image = dict(edge)
+                if edge['properties'] is not None:
+                    image['properties'] = dict(edge['properties'])
+            self.journal.keep_image('edges', e_index, image, edge)
+
+    def _insert_node(self, node, properties):
+        self._count_change()
+        self._keep_node_image(node)
+        self.csr_graph = None
+        self.nodes[node] = properties
+        self.node_index.add(node, properties)
+        self._change_type_count(self.node_types, None, (properties or {}).get('type'))
+
+    def _remove_node(self, node):
+        """
+        remove a node whose edges are deleted
+        :return: properties of the node
+        """
+        self._count_change()
+        self._keep_node_image(node)
+        self.csr_graph = None
+        properties = self.nodes.pop(node)
+        self.adj_list.pop(node, None)
+        self.in_adj_list.pop(node, None)
+        self.node_index.remove(node, properties)
+        self._change_type_count(self.node_types, (properties or {}).get('type'), None)
+        return properties
+
+    def _set_node_properties(self, node, properties):
+        """
+        replace the properties of an existing node, in place
+        :return: field level differences of the properties, see `change_journal.get_diff`
+        """
+        self._count_change()
+        self._keep_node_image(node)
+        node_properties = self.nodes[node]
+        pre_properties = dict(node_properties) if node_properties is not None else None
+        if node_properties is None or properties is None:
+            self.nodes[node] = properties
+        elif properties is not node_properties:
+            node_properties.clear()
+            node_properties.update(properties)
+        self.node_index.update(node, pre_properties, self.nodes[node])
+        self._change_type_count(self.node_types, (pre_properties or {}).get('type'), (properties or {}).get('type'))
+        return get_diff(pre_properties, self.nodes[node])
+
+    def _rename_node(self, node, new_node):
+        self._count_change()
+        self._keep_node_image(node)
+        self._keep_node_image(new_node)
+        self.csr_graph = None
+        # the edges of the node are counted again under the new id
+        e_indexes = sorted(set(self.adj_list.get(node, [])).union(self.in_adj_list.get(node, [])))
+        for e_index in e_indexes:
+            self.degree_index.remove(self.edges[e_index])
+        properties = self.nodes.pop(node)
+        self.node_index.remove(node, properties)
+        self.nodes[new_node] = properties
+        self.node_index.add(new_node, properties)
+        for adj_list, end in ((self.adj_list, 'source'), (self.in_adj_list, 'target')):
+            if node in adj_list:
+                adj_list[new_node] = adj_list.pop(node)
+                for e_index in adj_list[new_node]:
+                    self._keep_edge_image(e_index)
+                    edge = self.edges[e_index]
+                    self.edge_index.remove(e_index, edge)
+                    edge[end] = new_node
+                    self.edge_index.insert(e_index, edge)
+        for e_index in e_indexes:
+            self.degree_index.add(e_index, self.edges[e_index])
+
+    def _link_edge(self, e_index, edge):
+        """
+        put an edge at the end of the edge list, or back at the place it was deleted from
+        """
+        self._count_change()
+        self._keep_edge_image(e_index)
+        self.csr_graph = None
+        self.temporal_indexes.clear()
+        source, target = edge['source'], edge['target']
+        if e_index == len(self.edges):
+            self.edges.append(edge)
+            self.adj_list.setdefault(source, []).append(e_index)
+            self.in_adj_list.setdefault(target, []).append(e_index)
+            self.edge_index.add(e_index, edge)
+        else:
+            self.edges[e_index] = edge
+            self.num_deleted_edges -= 1
+            insort(self.adj_list.setdefault(source, []), e_index)
+            insort(self.in_adj_list.setdefault(target, []), e_index)
+            self.edge_index.insert(e_index, edge)
+        self.degree_index.add(e_index, edge)
+        self.weight_stats.add(e_index, edge)
+        self._change_type_count(self.edge_types, None, get_edge_type(edge))
+
+    def _unlink_edge(self, e_index, removed=None):
+        """
+        delete an existing edge, None is left at its place
+        :param removed: see `_delete_edge`
+        :return: the deleted edge
+        """
+        self._count_change()
+        self._keep_edge_image(e_index)
+        self.csr_graph = None
+        self.temporal_indexes.clear()
+        edge = self.edges[e_index]
+        # remove from adj lists
+        for node, direction, adj_list in ((edge['source'], 'out', self.adj_list),
+                                          (edge['target'], 'in', self.in_adj_list)):
+            if node in self.nodes:
+                if removed is None:
+                    adj_list[node].remove(e_index)
+                else:
+                    removed.setdefault((direction, node), set()).add(e_index)
+        self._change_type_count(self.edge_types, get_edge_type(edge), None)
+        self.edge_index.remove(e_index, edge)
+        self.degree_index.remove(edge)
+        self.weight_stats.remove(edge)
+        # remove the edge
+        self.edges[e_index] = None  # TODO ask?????
+        self.num_deleted_edges += 1
+        return edge
+
+    def _set_edge_properties(self, e_index, properties, merge=False):
+        """
+        replace the properties of an existing edge, in place
+        :param merge: True to only add or replace the given properties
+        :return: field level differences of the properties, see `change_journal.get_diff`
+        """
+        self._count_change()
+        self._keep_edge_image(e_index)
+        self.csr_graph = None
+        self.temporal_indexes.clear()
+        edge = self.edges[e_index]
+        edge_properties = edge['properties']
+        pre_properties = dict(edge_properties) if edge_properties is not None else None
+        pre_type = get_edge_type(edge)
+        pre_weight = get_edge_weight(edge)
+        pre_stats_weight = get_weight(edge)
+        if edge_properties is None or properties is None:
+            edge['properties'] = properties
+        elif merge:
+            edge_properties.update(properties)
+        elif properties is not edge_properties:
+            edge_properties.clear()
+            edge_properties.update(properties)
+        new_type = get_edge_type(edge)
+        self._change_type_count(self.edge_types, pre_type, new_type)
+        self.edge_index.retype(e_index, edge['source'], edge['target'], pre_type, new_type)
+        self.degree_index.update(edge, pre_type, pre_weight)
+        self.weight_stats.update(edge, pre_stats_weight)
+        return get_diff(pre_properties, edge['properties'])
+
+    def _apply_change(self, action, undo):
+        """
+        undo or redo a recorded action
+        """
+        if action['action'] == bulk_action:
+            for change in (reversed(action['changes']) if undo else action['changes']):
+                self._apply_change(change, undo)
+        elif action['action'] == node_update_action:
+            node = action['node']
+            properties = apply_diff(dict(self.nodes[node] or {}), action['diff'], undo)
+            self._set_node_properties(node, properties)
+        elif action['action'] in (node_add_action, node_delete_action):
+            if (action['action'] == node_add_action) == undo:
+                self._remove_node(action['node'])
+            else:
+                self._insert_node(action['node'], action['properties'])
+        elif action['action'] == node_rename_action:
+            if undo:
+                self._rename_node(action['new_node'], action['node'])
+            else:
+                self._rename_node(action['node'], action['new_node'])
+        elif action['action'] == edge_update_action:
+            e_index = action['edge']['e_index']
+            properties = apply_diff(dict(self.edges[e_index]['properties'] or {}), action['diff'], undo)
+            self._set_edge_properties(e_index, properties)
+        elif action['action'] in (edge_add_action, edge_delete_action):
+            if (action['action'] == edge_add_action) == undo:
+                self._unlink_edge(action['edge']['e_index'])
+            else:
+                self._link_edge(action['edge']['e_index'], action['item'])
+
+    def undo(self):
+        """
+        undo the last change
+        :return:
+        """
+        action = self.journal.undo()
+        if action is None:
+            return {'success': 0, 'message': 'nothing to undo!'}
+        self._apply_change(action, undo=True)
+        return {'success': 1, 'message': 'change undone successfully!'}
+
+    def redo(self):
+        """
+        redo the last undone change
+        :return:
+        """
+        action = self.journal.redo()
+        if action is None:
+            return {'success': 0, 'message': 'nothing to redo!'}
+        self._apply_change(action, undo=False)
+        return {'success': 1, 'message': 'change redone successfully!'}
+
+    def checkpoint(self):
+        """
+        start a checkpoint of the current state, see `rollback`
+        the nodes and edges are copied on their first change after the checkpoint
+        """
+        self.journal.checkpoint()
+
+    def rollback(self):
+        """
+        restore the state of the last checkpoint, in one step for each node and edge changed since, the checkpoint and
+        the changes after it are forgotten
+        :return:
+        """
+        checkpoint = self.journal.pop_checkpoint()
+        if checkpoint is None:
+            return {'success': 0, 'message': 'no checkpoint to roll back to!'}
+        # the older checkpoints need no image of the restored nodes and edges, they are back in their state
+        checkpoints, self.journal.checkpoints = self.journal.checkpoints, []
+        try:
+            for node, image in checkpoint['nodes'].items():
+                if image is not MISSING:
+                    properties = dict(image) if image is not None else None
+                    if node in self.nodes:
+                        self._set_node_properties(node, properties)
+                    else:
+                        self._insert_node(node, properties)
+            for e_index, image in checkpoint['edges'].items():
+                current = self.edges[e_index] if e_index < len(self.edges) else None
+                if image is MISSING:
+                    if current is not None:
+                        self._unlink_edge(e_index)
+                    continue
+                # the edge is restored in place, the records before the checkpoint hold it
+                edge, image = image
+                properties = dict(image['properties']) if image['properties'] is not None else None
+                if current is edge and edge['source'] == image['source'] and edge['target'] == image['target']:
+                    self._set_edge_properties(e_index, properties)
+                else:
+                    if current is not None:
+                        self._unlink_edge(e_index)
+                    edge.clear()
+                    edge.update(image)
+                    edge['properties'] = properties
+                    self._link_edge(e_index, edge)
+            for node, image in checkpoint['nodes'].items():
+                if image is MISSING and node in self.nodes:
+                    self._remove_node(node)
+        finally:
+            self.journal.checkpoints = checkpoints
+        return {'success': 1, 'message': 'rolled back successfully!'}
 
     def update_a_node(self, node, properties):
         """
@@ -377,42 +918,11 @@ class BuiltinDataset:
         # print('node = ', node, ' properties = ', properties)
         if node not in self.nodes:
             return {'success': 0, 'message': 'node not found!'}
+        elif properties is None:
+            return {'success': 0, 'message': 'nothing to update!'}
         else:
-            node_properties = self.nodes[node]
-            pre_properties = copy.deepcopy(node_properties)
-            if node_properties is None:
-                self.nodes[node] = properties
-                if 'type' in properties:
-                    node_type = properties['type']
-                    if node_type in self.node_types:
-                        self.node_types[node_type] += 1
-                    else:
-                        self.node_types[node_type] = 1
-            else:
-                type_change = False
-                if 'type' in properties:
-                    if 'type' in node_properties:
-                        if properties['type'] != node_properties['type']:
-                            type_change = True
-                            node_type = node_properties['type']
-                            # print('self.node_types =', self.node_types)
-                            self.node_types[node_type] -= 1
-                            if self.node_types[node_type] == 0:
-                                del self.node_types[node_type]
-
-                node_properties.clear()
-                for p, value in properties.items():
-                    node_properties[p] = value
-
-                if type_change:
-                    node_type = properties['type']
-                    if node_type in self.node_types:
-                        self.node_types[node_type] += 1
-                    else:
-                        self.node_types[node_type] = 1
-            action = {'action': node_update_action, 'node': node, 'pre_properties': pre_properties}
-            self.recent_changes.append(action)
-            self.forget_changes()
+            diff = self._set_node_properties(node, properties)
+            self.journal.record({'action': node_update_action, 'node': node, 'diff': diff})
 
             print('after update: node = ', node, 'properties = ', self.nodes[node])
 
@@ -428,49 +938,58 @@ class BuiltinDataset:
         if node in self.nodes:
             return {'success': 0, 'message': 'node already exists!'}
         else:
-            self.nodes[node] = properties
-            if 'type' in properties:
-                node_type = properties['type']
-                if node_type in self.node_types:
-                    self.node_types[node_type] += 1
-                else:
-                    self.node_types[node_type] = 1
-            action = {'action': node_add_action, 'node': node, 'properties': copy.deepcopy(properties)}
-            self.recent_changes.append(action)
-            self.forget_changes()
+            self._insert_node(node, properties)
+            self.journal.record({'action': node_add_action, 'node': node, 'properties': properties})
             return {'success': 1, 'message': 'node added successfully!'}
 
+    def rename_node(self, node, new_node):
+        """
+        change the id of a node, its edges are moved to the new id
+        :param node: id of the node
+        :param new_node: new id of the node
+        :return:
+        """
+        if node not in self.nodes:
+            return {'success': 0, 'message': 'node not found!'}
+        if new_node in self.nodes:
+            return {'success': 0, 'message': 'node already exists!'}
+        self._rename_node(node, new_node)
+        self.journal.record({'action': node_rename_action, 'node': node, 'new_node': new_node})
+        return {'success': 1, 'message': 'node renamed successfully!'}
+
     def find_edge_index(self, source, target):
         """
 
         :param source:
         :param target:
-        :return:
+        :return: index of the first edge from source to target, -1 if there is none
         """
         if source not in self.nodes:
             return -1
         if target not in self.nodes:
             return -1
-        if source not in self.adj_list:
-            return -1
-        if target not in self.in_adj_list:
-            return -1
-        out_edges = self.adj_list[source]
-        in_edges = self.in_adj_list[target]
-        if len(out_edges) < len(in_edges):
-            for e_index in out_edges:
-                if self.edges[e_index]['target'] == target:
-                    return e_index
-            return -1
-        else:
-            for e_index in in_edges:
-                if self.edges[e_index]['source'] == source:
-                    return e_index
+        self._sync_indexes()
+        found = self.edge_index.find(self.edges, source, target)
+        if len(found) == 0:
             return -1
+        return found[0]
 
-    def update_an_edge(self, e_index=None, source=None, target=None, is_index=True, properties=None):
+    def find_edge_indexes(self, source, target, edge_types=None):
+        """
+        find the edges from source to target, using the edge index
+        :param source:
+        :param target:
+        :param edge_types: (optional) collection of the edge types to find, None stands for edges without a type,
+            all types if not given
+        :return: list of edge indexes in increasing order
         """
+        self._sync_indexes()
+        return self.edge_index.find(self.edges, source, target, edge_types)
 
+    def update_an_edge(self, e_index=None, source=None, target=None, is_index=True, properties=None):
+        """
+        replace the properties of the edge of index e_index, or add to the properties of the first edge from source
+        to target
         :param e_index:
         :param source:
         :param target:
@@ -483,87 +1002,23 @@ class BuiltinDataset:
         if is_index:
             if e_index is None:
                 return {'success': 0, 'message': 'is_index is True but e_index is None!'}
-            edge_properties = self.edges[e_index]['properties']
-            pre_properties = copy.deepcopy(edge_properties)
-            if edge_properties is None:
-                self.edges[e_index]['properties'] = properties
-                if 'type' in properties:
-                    edge_type = properties['type']
-                    if edge_type in self.edge_types:
-                        self.edge_types[edge_type] += 1
-                    else:
-                        self.edge_types[edge_type] = 1
-            else:
-                type_change = False
-                if 'type' in properties:
-                    if 'type' in edge_properties:
-                        if properties['type'] != edge_properties['type']:
-                            type_change = True
-                            edge_type = edge_properties['type']
-                            self.edge_types[edge_type] -= 1
-                            if self.edge_types[edge_type] == 0:
-                                del self.edge_types[edge_type]
-                edge_properties.clear()
-                for p, value in properties.items():
-                    edge_properties[p] = value
-
-                if type_change:
-                    edge_type = properties['type']
-                    if edge_type in self.edge_types:
-                        self.edge_types[edge_type] += 1
-                    else:
-                        self.edge_types[edge_type] = 1
-            action = {'action': edge_update_action,
-                      'edge': {'e_index': e_index,
-                               'source': self.edges[e_index]['source'],
-                               'target': self.edges[e_index]['target']},
-                      'pre_properties': pre_properties}
-            self.recent_changes.append(action)
-            self.forget_changes()
-            return {'success': 1, 'message': 'edge updated successfully!'}
+            if self.edges[e_index] is None:
+                return {'success': 0, 'message': 'edge not found!'}
+            diff = self._set_edge_properties(e_index, properties)
         else:
             if source is None or target is None:
                 return {'success': 0, 'message': 'source or target is None!'}
             e_index = self.find_edge_index(source, target)
             if e_index < 0:
                 return {'success': 0, 'message': 'edge not found!'}
-            edge_properties = self.edges[e_index]['properties']
-            pre_properties = copy.deepcopy(edge_properties)
-            if edge_properties is None:
-                self.edges[e_index]['properties'] = properties
-                if 'type' in properties:
-                    edge_type = properties['type']
-                    if edge_type in self.edge_types:
-                        self.edge_types[edge_type] += 1
-                    else:
-                        self.edge_types[edge_type] = 1
-            else:
-                type_change = False
-                if 'type' in properties:
-                    if 'type' in edge_properties:
-                        if properties['type'] != edge_properties['type']:
-                            type_change = True
-                            edge_type = edge_properties['type']
-                            self.edge_types[edge_type] -= 1
-                            if self.edge_types[edge_type] == 0:
-                                del self.edge_types[edge_type]
-
-                for p, value in properties.items():
-                    edge_properties[p] = value
-
-                if type_change:
-                    edge_type = properties['type']
-                    if edge_type in self.edge_types:
-                        self.edge_types[edge_type] += 1
-                    else:
-                        self.edge_types[edge_type] = 1
-            # remember the action
-            action = {'action': edge_update_action,
-                      'edge': {'e_index': e_index, 'source': source, 'target': target},
-                      'pre_properties': pre_properties}
-            self.recent_changes.append(action)
-            self.forget_changes()
-            return {'success': 1, 'message': 'edge updated successfully!'}
+            diff = self._set_edge_properties(e_index, properties, merge=True)
+        # remember the action
+        edge = self.edges[e_index]
+        action = {'action': edge_update_action,
+                  'edge': {'e_index': e_index, 'source': edge['source'], 'target': edge['target']},
+                  'diff': diff}
+        self.journal.record(action)
+        return {'success': 1, 'message': 'edge updated successfully!'}
 
     def add_an_edge(self, source, target, properties=None):
         """
@@ -582,30 +1037,44 @@ class BuiltinDataset:
             if helpers.compare_edge_type(self.edges[e_index]['properties'], properties):
                 return {'success': 0, 'message': 'edge already exists!'}
         e_index = len(self.edges)
-        if source in self.adj_list:
-            self.adj_list[source].append(e_index)
-        else:
-            self.adj_list[source] = [e_index]
-        if target in self.in_adj_list:
-            self.in_adj_list[target].append(e_index)
-        else:
-            self.in_adj_list[target] = [e_index]
         edge = {'source': source, 'target': target, 'properties': properties}
-        self.edges.append(edge)
-        if 'type' in properties:
-            edge_type = properties['type']
-            if edge_type in self.edge_types:
-                self.edge_types[edge_type] += 1
-            else:
-                self.edge_types[edge_type] = 1
+        self._link_edge(e_index, edge)
         # remember the action
         action = {'action': edge_add_action,
                   'edge': {'e_index': e_index, 'source': source, 'target': target},
-                  'properties': copy.deepcopy(properties)}
-        self.recent_changes.append(action)
-        self.forget_changes()
+                  'item': edge}
+        self.journal.record(action)
         return {'success': 1, 'message': 'edge added successfully!'}
 
+    def _delete_edge(self, e_index, removed=None, changes=None):
+        """
+        delete an existing edge and remember the action
+        :param e_index: index of the edge
+        :param removed: (optional) dictionary to collect the edges to remove from the adjacency lists in, so that a
+            bulk delete filters each list once, see `_remove_from_adjacency`, the edge is removed from the lists at
+            once if None
+        :param changes: (optional) list to collect the action in, for a bulk change, the action is remembered at once
+            if None
+        """
+        edge = self._unlink_edge(e_index, removed)
+        # the deleted edge is kept as it is to be put back by undo
+        action = {'action': edge_delete_action,
+                  'edge': {'e_index': e_index, 'source': edge['source'], 'target': edge['target']},
+                  'item': edge}
+        if changes is None:
+            self.journal.record(action)
+        else:
+            changes.append(action)
+
+    def _remove_from_adjacency(self, removed):
+        """
+        remove the edges collected by `_delete_edge` from the adjacency lists, each list is filtered once
+        """
+        for (direction, node), e_indexes in removed.items():
+            adj_list = self.adj_list if direction == 'out' else self.in_adj_list
+            if node in adj_list:
+                adj_list[node][:] = [e for e in adj_list[node] if e not in e_indexes]
+
     def delete_an_edge(self, e_index=None, source=None, target=None, is_index=True):
         """
 
@@ -619,58 +1088,18 @@ class BuiltinDataset:
         if is_index:
             if e_index is None:
                 return {'success': 0, 'message': 'is_index is True but e_index is None!'}
-            edge = self.edges[e_index]
-            properties = copy.deepcopy(self.edges[e_index]['properties'])
-            source, target = edge['source'], edge['target']
-            # print('deleting e = {} source = {} target = {}'.format(e_index, source, target))
-            # remove from adj lists
-            # print('source: ', source)
-            # print('self.adj_list: ', self.adj_list)
-            if source in self.nodes:
-                self.adj_list[source].remove(e_index)
-
-            # print('target: ', target)
-            # print('self.in_adj_list', self.in_adj_list)
-            if target in self.nodes:
-                self.in_adj_list[target].remove(e_index)
-            # change edge types
-            edge_type = edge['properties']['type']
-            self.edge_types[edge_type] -= 1
-            if self.edge_types[edge_type] == 0:
-                del self.edge_types[edge_type]
-            # remove the edge
-            self.edges[e_index] = None  # TODO ask?????
-            # remember the action
-            action = {'action': edge_delete_action,
-                      'edge': {'e_index': e_index, 'source': source, 'target': target},
-                      'properties': properties}
-            self.recent_changes.append(action)
-            self.forget_changes()
+            if self.edges[e_index] is None:
+                return {'success': 0, 'message': 'edge does not exist!'}
+            self._delete_edge(e_index)
+            self.compact_if_needed()
             return {'success': 1, 'message': 'edge deleted successfully!'}
         else:
             if source is None or target is None:
                 return {'success': 0, 'message': 'source or target is None!'}
             e_index = self.find_edge_index(source, target)
             if e_index >= 0:
-                properties = copy.deepcopy(self.edges[e_index]['properties'])
-                # remove from adj lists
-                if source in self.nodes:
-                    self.adj_list[source].remove(e_index)
-                if target in self.nodes:
-                    self.in_adj_list[target].remove(e_index)
-                # change edge types
-                edge_type = self.edges[e_index]['properties']['type']
-                self.edge_types[edge_type] -= 1
-                if self.edge_types[edge_type] == 0:
-                    del self.edge_types[edge_type]
-                # remove the edge
-                self.edges[e_index] = None
-                # remember action
-                action = {'action': edge_delete_action,
-                          'edge': {'e_index': e_index, 'source': source, 'target': target},
-                          'properties': properties}
-                self.recent_changes.append(action)
-                self.forget_changes()
+                self._delete_edge(e_index)
+                self.compact_if_needed()
                 return {'success': 1, 'message': 'edge deleted successfully!'}
             else:
                 return {'success': 0, 'message': 'edge does not exist!'}
@@ -678,121 +1107,301 @@ class BuiltinDataset:
     def delete_edges(self, deleted_edges, is_indexes=True):
         """
         delete a list of edges from a network
-        :param deleted_edges:
+        the edges are found with the edge index, and each adjacency list is filtered once for all its deleted edges
+        the deletes are remembered as a single action
+        :param deleted_edges: list of edge indexes, or of (source, target) if is_indexes is False
         :param is_indexes:
         :return: List of errors
         """
         errors = []
-        result_temp = None
+        removed = {}
+        changes = []
         if is_indexes:
             for e_index in deleted_edges:
-                result_temp = self.delete_an_edge(e_index=e_index, is_index=True)
-                if not result_temp["success"]:
-                    result_temp["e_index"] = e_index
-                    errors.append(result_temp)
+                if self.edges[e_index] is None:
+                    errors.append({'success': 0, 'message': 'edge does not exist!', 'e_index': e_index})
+                    continue
+                self._delete_edge(e_index, removed, changes)
         else:
             for edge in deleted_edges:
                 source, target = edge
-                result_temp = self.delete_an_edge(source=source, target=target, is_index=False)
-                if not result_temp["success"]:
-                    result_temp["edge"] = edge
-                    errors.append(result_temp)
+                if source is None or target is None:
+                    errors.append({'success': 0, 'message': 'source or target is None!', 'edge': edge})
+                    continue
+                e_index = self.find_edge_index(source, target)
+                if e_index < 0:
+                    errors.append({'success': 0, 'message': 'edge does not exist!', 'edge': edge})
+                    continue
+                self._delete_edge(e_index, removed, changes)
+        self._remove_from_adjacency(removed)
+        self.remember_changes(changes)
+        self.compact_if_needed()
         return errors
 
+    def _delete_node(self, node, removed, changes):
+        """
+        delete an existing node and its edges, see `_delete_edge`
+        """
+        for adj_list in (self.adj_list, self.in_adj_list):
+            for e_index in list(adj_list.get(node, [])):
+                # a self loop is in both lists
+                if self.edges[e_index] is not None:
+                    self._delete_edge(e_index, removed, changes)
+        properties = self._remove_node(node)
+        changes.append({'action': node_delete_action, 'node': node, 'properties': properties})
+
     def delete_a_node(self, node):
         """
-        delete the node by node id
+        delete the node by node id, with its edges, the deletes are remembered as a single action
         :param node:
         :return:
         """
         # print('delete_a_node: ', node)
         if node not in self.nodes:
             return {'success': 0, 'message': 'node not found!'}
-        # delete out-going edges
-        if node in self.adj_list:
-            self.delete_edges(copy.deepcopy(self.adj_list[node]), is_indexes=True)
-            del self.adj_list[node]
-        # delete in-coming edges
-        if node in self.in_adj_list:
-            self.delete_edges(copy.deepcopy(self.in_adj_list[node]), is_indexes=True)
-            del self.in_adj_list[node]
-        # change the types
-        if 'type' in self.nodes[node]['type']:
-            node_type = self.nodes[node]['type']
-            self.node_types[node_type] -= 1
-            if self.node_types[node_type] == 0:
-                del self.node_types[node_type]
-        # remember the action
-        properties = copy.deepcopy(self.nodes[node])
-        action = {'action': node_delete_action, 'node': node, 'properties': properties}
-        self.recent_changes.append(action)
-        self.forget_changes()
-        # delete the node
-        del self.nodes[node]
-
+        removed = {}
+        changes = []
+        self._delete_node(node, removed, changes)
+        self._remove_from_adjacency(removed)
+        self.remember_changes(changes)
+        self.compact_if_needed()
         return {'success': 1, 'message': 'node deleted successfully!'}
 
     def delete_nodes(self, nodes):
         """
         delete a list of nodes and their adjacent edges from a network
+        each adjacency list is filtered once for all the deleted edges, and the deletes are remembered as a single
+        action
         :param nodes:
         :return: List of errors
         """
         errors = []
-        result_temp = None
+        removed = {}
+        changes = []
         for node in nodes:
-            result_temp = self.delete_a_node(node)
-            if not result_temp["success"]:
-                result_temp["node"] = node
-                errors.append(result_temp)
+            if node not in self.nodes:
+                errors.append({'success': 0, 'message': 'node not found!', 'node': node})
+                continue
+            self._delete_node(node, removed, changes)
+        self._remove_from_adjacency(removed)
+        self.remember_changes(changes)
+        self.compact_if_needed()
         return errors
-        # print('after delete ', node)
-        # self.print_dataset()
-        # print('*******************')
+
+    def compact(self):
+        """
+        remove the deleted edges, i.e., the None left in self.edges, so that the edges are indexed from 0 without gaps
+        the adjacency lists are translated to the new indexes, the edge index is built again on the next lookup, and
+        the change journal is cleared, changes before a compaction cannot be undone
+        :return: a dictionary, in the following format
+            {
+                'success': 1
+                'message': a string
+                'num_removed': number of removed deleted edges
+                'reclaimed_mb': estimated memory released by the adjacency and edge lists, in MB
+                'translation': list, translation[i] is the new index of the edge of index i, -1 if it is deleted
+            }
+        """
+        pre_size = self._get_index_size()
+        translation = [-1] * len(self.edges)
+        edges = []
+        for e_index, edge in enumerate(self.edges):
+            if edge is not None:
+                translation[e_index] = len(edges)
+                edges.append(edge)
+        num_removed = len(self.edges) - len(edges)
+        # new containers, the previous ones stay consistent for whoever still holds them, e.g., an active network
+        # loaded from the dataset
+        self.edges = edges
+        self.adj_list = self._translate_adjacency(self.adj_list, translation)
+        self.in_adj_list = self._translate_adjacency(self.in_adj_list, translation)
+        self.edge_index.clear()
+        self.csr_graph = None
+        self.degree_index.clear()
+        self.weight_stats.clear()
+        self.temporal_indexes.clear()
+        self.journal.clear()
+        self.num_deleted_edges = 0
+        reclaimed_mb = max(pre_size - self._get_index_size(), 0) / (1024 * 1024)
+        return {'success': 1, 'message': 'edges compacted successfully!', 'num_removed': num_removed,
+                'reclaimed_mb': reclaimed_mb, 'translation': translation}
+
+    @staticmethod
+    def _translate_adjacency(adj_list, translation):
+        translated = {}
+        for node, e_indexes in adj_list.items():
+            translated[node] = [translation[e] for e in e_indexes if translation[e] >= 0]
+        return translated
+
+    def _get_index_size(self):
+        """
+        :return: size in bytes of the edge list and the adjacency lists, without the edges themselves
+        """
+        size = sys.getsizeof(self.edges)
+        for adj_list in (self.adj_list, self.in_adj_list):
+            size += sys.getsizeof(adj_list)
+            for e_indexes in adj_list.values():
+                size += sys.getsizeof(e_indexes)
+        return size
+
+    def compact_if_needed(self):
+        """
+        compact the edges if the ratio of deleted edges is over self.compaction_ratio, see `compact`
+        :return: the result of `compact`, or None if the edges are not compacted
+        """
+        if self.compaction_ratio is None or len(self.edges) == 0:
+            return None
+        if self.num_deleted_edges <= self.compaction_ratio * len(self.edges):
+            return None
+        # the edges may have been changed directly, count them before compacting
+        self.num_deleted_edges = self.edges.count(None)
+        if self.num_deleted_edges <= self.compaction_ratio * len(self.edges):
+            return None
+        return self.compact()
+
+    @staticmethod
+    def _change_type_count(type_counts, pre_type, new_type):
+        if pre_type == new_type:
+            return
+        if pre_type is not None and pre_type in type_counts:
+            type_counts[pre_type] -= 1
+            if type_counts[pre_type] == 0:
+                del type_counts[pre_type]
+        if new_type is not None:
+            type_counts[new_type] = type_counts.get(new_type, 0) + 1
 
     def save_nodes(self, nodes, params=None):
         """
         add or update information for a list of nodes in a network
+        the properties of an existing node are replaced, and the changes are remembered as a single action
         :param nodes: dictionary of node_id: properties
         :param params:
         :return:
         """
         errors = []
-        result_temp = None
+        changes = []
         for node, properties in nodes.items():
+            if properties is None:
+                errors.append({'success': 0, 'message': 'nothing to save!', 'node': node})
+                continue
             if node in self.nodes:
-                result_temp = self.update_a_node(node, properties=properties)
+                diff = self._set_node_properties(node, properties)
+                changes.append({'action': node_update_action, 'node': node, 'diff': diff})
             else:
-                result_temp = self.add_a_node(node, properties=properties)
-            if not result_temp["success"]:
-                result_temp["node"] = node
-                errors.append(result_temp)
+                self._insert_node(node, properties)
+                changes.append({'action': node_add_action, 'node': node, 'properties': properties})
+        self.remember_changes(changes)
         return errors
 
     def save_edges(self, edges, params=None):
         """
         create or update information for a list of edges in a network
+        the properties of the first edge from the source to the target are replaced if there is one, else an edge is
+        added, the adjacency lists are extended once per node, and the changes are remembered as a single action
         :param edges: list of edge object with 'source', 'target' and 'properties' fields
         :param params:
         :return:
         """
         errors = []
-        result_temp = None
-        for edge in edges:
-            source, target, properties = edge['source'], edge['target'], edge['properties']
-            e_index = self.find_edge_index(source, target)
-            if e_index < 0:
-                result_temp = self.add_an_edge(source, target, properties=properties)
-            else:
-                result_temp = self.update_an_edge(e_index=e_index, is_index=True, properties=properties)
-            if not result_temp["success"]:
-                result_temp["edge"] = {"source": source, "target": target}
-                errors.append(result_temp)
+        changes = []
+        added = {'out': {}, 'in': {}}
+        self._sync_indexes()
+        with helpers.gc_paused():
+            for edge in edges:
+                source, target, properties = edge['source'], edge['target'], edge['properties']
+                found = self.edge_index.find(self.edges, source, target)
+                if len(found) == 0:
+                    if source not in self.nodes:
+                        errors.append({'success': 0, 'message': 'source not found!',
+                                       'edge': {'source': source, 'target': target}})
+                        continue
+                    if target not in self.nodes:
+                        errors.append({'success': 0, 'message': 'target not found!',
+                                       'edge': {'source': source, 'target': target}})
+                        continue
+                    e_index = len(self.edges)
+                    new_edge = {'source': source, 'target': target, 'properties': properties}
+                    self._count_change()
+                    self._keep_edge_image(e_index)
+                    self.edges.append(new_edge)
+                    self.edge_index.add(e_index, new_edge)
+                    self.degree_index.add(e_index, new_edge)
+                    self.weight_stats.add(e_index, new_edge)
+                    added['out'].setdefault(source, []).append(e_index)
+                    added['in'].setdefault(target, []).append(e_index)
+                    self._change_type_count(self.edge_types, None, get_edge_type(new_edge))
+                    changes.append({'action': edge_add_action,
+                                    'edge': {'e_index': e_index, 'source': source, 'target': target},
+                                    'item': new_edge})
+                else:
+                    if properties is None:
+                        errors.append({'success': 0, 'message': 'nothing to update!',
+                                       'edge': {'source': source, 'target': target}})
+                        continue
+                    e_index = found[0]
+                    diff = self._set_edge_properties(e_index, properties)
+                    changes.append({'action': edge_update_action,
+                                    'edge': {'e_index': e_index, 'source': source, 'target': target},
+                                    'diff': diff})
+        # the added edges have the largest indexes, the adjacency lists stay in increasing order
+        for direction, adj_list in (('out', self.adj_list), ('in', self.in_adj_list)):
+            for node, e_indexes in added[direction].items():
+                if node in adj_list:
+                    adj_list[node].extend(e_indexes)
+                else:
+                    adj_list[node] = e_indexes
+        self.remember_changes(changes)
         return errors
 
+    def _dump_records(self, records, output_path, mode, params):
+        """
+        write records to a JSON-lines file as they are generated, see `json_lines.JsonLinesWriter`, the throughput is
+        kept in self.dump_stats
+        :param records: iterable of records
+        :param output_path: the file
+        :param mode: 'x' to fail if the file exists, 'w' to overwrite it
+        :param params: dictionary, in the form
+            {
+                "compressed": optional, True or 'gzip' for gzip, 'zstd' for zstd, not compressed if None or False
+                "compression_level": optional, compression level
+                "num_threads": optional, number of compression threads, 1 by default
+            }
+        """
+        compression = params.get("compressed") or None
+        if compression is True:
+            compression = 'gzip'
+        with open(output_path, mode + 'b') as output_file:
+            writer = JsonLinesWriter(output_file, compression=compression, level=params.get("compression_level"),
+                                     num_threads=params.get("num_threads", 1))
+            with writer:
+                for record in records:
+                    writer.write(record)
+        self.dump_stats = writer.stats.to_dict()
+
+    def _iter_dump_records(self, params):
+        for node, properties in self.nodes.items():
+            yield {"id": node, "type": "node", "properties": properties}
+        edge_types = params.get("edge_types")
+        min_weight = params.get("min_weight")
+        min_confidence = params.get("min_confidence")
+        for edge in self.edges:  # type weight confidence
+            if edge is None:
+                continue
+            e_props = edge["properties"]
+            if edge_types and not (e_props.get("type") in edge_types):
+                continue
+            if min_weight and e_props.get("weight", 0) < min_weight:
+                continue
+            if min_confidence and e_props.get("confidence", 0) < min_confidence:
+                continue
+            record = dict(edge)
+            record["type"] = "edge"
+            yield record
+
     def dump_network(self, network, output_dir, params=None):
         """
-        dump the whole network to a specified directory
+        dump the whole network to a specified directory, the nodes and edges are written as they are serialized, and
+        compressed if asked, see `_dump_records`
         will fail if file already exists
         """
         if not params:
@@ -800,46 +1409,57 @@ class BuiltinDataset:
         try:
             if not params.get("output_format") == "json":
                 raise NotImplementedError()
-            if params.get("compressed"):
-                raise NotImplementedError()
             output_path = Path(output_dir) / network
-            with open(output_path, "x") as output_file:
-                for node in self.nodes:
-                    temp = {
-                        "id": node,
-                        "type": "node",
-                        "properties": self.nodes[node].copy()
-                    }
-                    json.dump(temp, output_file)
-                    output_file.write("\n")
-                for edge in self.edges:  # type weight confidence
-                    e_props = edge["properties"]
-                    if params.get("edge_types") and not (e_props.get("type") in params["edge_types"]):
-                        continue
-                    if params.get("min_weight") and e_props.get("weight", 0) < params["min_weight"]:
-                        continue
-                    if params.get("min_confidence") and e_props.get("confidence", 0) < params["min_confidence"]:
-                        continue
-                    temp = edge.copy()
-                    temp["type"] = "edge"
-                    json.dump(temp, output_file)
-                    output_file.write("\n")
+            self._dump_records(self._iter_dump_records(params), output_path, "x", params)
             return 1
         except Exception:
             return 0
 
+    def get_degree_index(self):
+        """
+        :return: the degree index of the dataset, see `storage.degree_index.DegreeIndex`
+        """
+        self._sync_indexes()
+        self.degree_index.sync()
+        return self.degree_index
+
+    def get_degree(self, node, direction='out', edge_type=None, weighted=False):
+        """
+        :param node: id of the node
+        :param direction: 'out', 'in' or 'all'
+        :param edge_type: (optional) type of the edges to count, all types if None
+        :param weighted: True to sum the weights of the edges, 1 for an edge without weight
+        :return: the degree of the node
+        """
+        return self.get_degree_index().get_degree(node, direction, edge_type, weighted)
+
+    def get_top_degree_nodes(self, k, direction='out', edge_type=None, weighted=False, nodes=None):
+        """
+        :param k: number of nodes
+        :param direction: see `get_degree`
+        :param edge_type: see `get_degree`
+        :param weighted: see `get_degree`
+        :param nodes: (optional) the nodes to choose from, all the nodes if None
+        :return: list of (node, degree) of the k nodes of largest degree, the largest first
+        """
+        return self.get_degree_index().get_top_nodes(k, direction, edge_type, weighted, nodes)
+
     def get_neighbor_counts(self, nodes):
-        neighbor_counts = {}
-        if nodes is not None:
-            for node in nodes:
-                if node in self.adj_list:
-                    for e_index in self.adj_list[node]:
-                        target = self.edges[e_index]['target']
-                        if target in neighbor_counts:
-                            neighbor_counts[target] += 1
-                        else:
-                            neighbor_counts[target] = 1
-        return neighbor_counts
+        """
+        :param nodes: list of node ids
+        :return: dictionary of target: number of edges from the nodes to the target
+        """
+        if nodes is None:
+            return {}
+        return self.get_degree_index().get_neighbor_counts(nodes)
+
+    def get_weight_range(self):
+        """
+        :return: (smallest weight, largest weight) of the edges, None if no edge has a weight, see
+            `storage.weight_stats.WeightStats`
+        """
+        self._sync_indexes()
+        return self.weight_stats.get_range()
 
     def to_nxgraph(self):
         """
@@ -858,6 +1478,38 @@ class BuiltinDataset:
 
         return graph
 
+    def estimate_memory(self, sample_size=1000):
+        """
+        estimate the memory taken by the nodes, edges and adjacency lists, from the sizes of a sample of them
+        :param sample_size: number of nodes and of edges to measure
+        :return: estimated memory in MB
+        """
+
+        def get_size(value):
+            size = sys.getsizeof(value)
+            if isinstance(value, dict):
+                for v in value.values():
+                    size += get_size(v)
+            elif isinstance(value, (list, tuple)):
+                for v in value:
+                    size += get_size(v)
+            return size
+
+        def estimate(values):
+            values = list(values)
+            if len(values) == 0:
+                return 0
+            sample = random.Random(0).sample(values, min(sample_size, len(values)))
+            return sum([get_size(v) for v in sample]) * len(values) / len(sample)
+
+        size = sys.getsizeof(self.nodes) + sys.getsizeof(self.edges)
+        size += estimate(self.nodes.values()) + estimate(self.edges)
+        for adj_list in (self.adj_list, self.in_adj_list):
+            # the edge indexes in the lists, 8 bytes of the list slot and 28 of the int object each
+            num_indexes = sum([len(indexes) for indexes in adj_list.values()])
+            size += sys.getsizeof(adj_list) + len(adj_list) * sys.getsizeof([]) + num_indexes * 36
+        return size / (1024 * 1024)
+
     def print_dataset(self):
         print('nodes: ', self.nodes)
         print('edges: ', self.edges)
@@ -896,7 +1548,7 @@ class ActiveNetwork(BuiltinDataset):
     """
 
     def __init__(self, path_2_data, uploaded=False, from_file=True, selected_nodes=None, initialize=False,
-                 params=dict()):
+                 params=dict(), snapshot=False):
         """
 
         :param path_2_data: path to data file
@@ -905,8 +1557,9 @@ class ActiveNetwork(BuiltinDataset):
         :param selected_nodes: list of selected nodes to initilize the active network
         :param initialize: True if to initialize the active network
         :param params: ditionary
+        :param snapshot: True to open the binary snapshot of the data file, see `BuiltinDataset`
         """
-        BuiltinDataset.__init__(self, path_2_data, uploaded, from_file)
+        BuiltinDataset.__init__(self, path_2_data, uploaded, from_file, snapshot)
         self.active_nodes = {}  # dictionary of active nodes:{node_id: {'expandable':True/False,
         # 'element_index': index of
         # the corresponding element in self.elements}}
@@ -916,6 +1569,8 @@ class ActiveNetwork(BuiltinDataset):
         # the corresponding element in self.elements}}
 
         self.elements = []
+        # weight range the normalized weights of the edge elements are relative to, see `rescale_edge_weights`
+        self.weight_range = None
         #
         self.network_name = None
         self.node_label_field = None
@@ -936,9 +1591,16 @@ class ActiveNetwork(BuiltinDataset):
         self.recent_interactions = []
 
     def truncate(self, core_nodes, max_num=5000):
+        """
+        keep the core nodes and the max_num active nodes of largest degree, with the active edges between them
+        :param core_nodes: list of node ids, None if there is none
+        :param max_num: maximum number of active nodes kept besides the core nodes
+        """
         if len(self.active_nodes) < max_num:
             return
-        sampled_nodes = random.sample(list(self.active_nodes.keys()), max_num)
+        degree_index = self.get_degree_index()
+        sampled_nodes = [node for node, degree in
+                         degree_index.get_top_nodes(max_num, direction='all', nodes=list(self.active_nodes))]
         sampled_nodes = set(sampled_nodes)
         if core_nodes is not None:
             sampled_nodes = sampled_nodes.union(set(core_nodes))
@@ -955,6 +1617,7 @@ class ActiveNetwork(BuiltinDataset):
         self.active_nodes = {}
         self.active_edges = {}
         self.elements = []
+        self.weight_range = self.get_weight_range()
         self.predicted_edges = {}  # dictionary {source:[]}
         self.last_analysis = None  # info about last analysis
 
@@ -1028,16 +1691,6 @@ class ActiveNetwork(BuiltinDataset):
             self.elements.append(element)
             self.active_nodes[node] = {'expandable': expandable, 'element_index': len(self.elements) - 1}
 
-        if 'weight' in self.edges[0]['properties']:
-            min_weight = float('inf')
-            max_weight = 0
-            for edge in self.edges:
-                if 'weight' in edge['properties']:
-                    if edge['properties']['weight'] < min_weight:
-                        min_weight = edge['properties']['weight']
-                    elif edge['properties']['weight'] > max_weight:
-                        max_weight = edge['properties']['weight']
-
         for e_index in self.active_edges:
             edge_info = self.edges[e_index]
             edge_data = {'element_type': 'edge',
@@ -1057,8 +1710,7 @@ class ActiveNetwork(BuiltinDataset):
                 edge_data['type'] = edge_info['properties']['type']
             if 'probability' in edge_info['properties']:
                 edge_data['probability'] = edge_info['properties']['probability']
-            if 'weight' in edge_info['properties'] and max_weight > min_weight:
-                edge_data['normalized_weight'] = (edge_info['properties']['weight'] - min_weight) / (max_weight - min_weight)
+            self._set_normalized_weight(edge_data)
             # add edge label
             if self.edge_label_field is not None:
                 if self.edge_label_field in edge_info:
@@ -1070,6 +1722,32 @@ class ActiveNetwork(BuiltinDataset):
             self.elements.append(element)
             self.active_edges[e_index] = {'element_index': len(self.elements) - 1}
 
+    def _set_normalized_weight(self, edge_data):
+        """
+        set the weight of an edge element relative to self.weight_range, in [0, 1], for the width of the edge
+        :param edge_data: data of the edge element, its 'info' are the properties of the edge
+        """
+        weight = get_weight({'properties': edge_data['info']})
+        if weight is not None and self.weight_range is not None and self.weight_range[1] > self.weight_range[0]:
+            min_weight, max_weight = self.weight_range
+            edge_data['normalized_weight'] = (weight - min_weight) / (max_weight - min_weight)
+        else:
+            edge_data.pop('normalized_weight', None)
+
+    def rescale_edge_weights(self):
+        """
+        make the normalized weights of the edge elements relative to the current weight range of the edges, see
+        `BuiltinDataset.get_weight_range`, the elements are only rewritten if the range changed
+        :return: number of rewritten edge elements
+        """
+        weight_range = self.get_weight_range()
+        if weight_range == self.weight_range:
+            return 0
+        self.weight_range = weight_range
+        for info in self.active_edges.values():
+            self._set_normalized_weight(self.elements[info['element_index']]['data'])
+        return len(self.active_edges)
+
     def get_active_node_types(self):
         """
         get types of active nodes
@@ -1400,16 +2078,8 @@ class ActiveNetwork(BuiltinDataset):
         sub_network = self.get_network(node_ids, return_edge_index=True)
         added_edges = set([e_index for e_index in sub_network['edges'] if e_index not in self.active_edges])
         added_nodes = set([node['id'] for node in sub_network['nodes'] if node['id'] not in self.active_nodes])
-
-        if 'weight' in self.edges[0]['properties']:
-            min_weight = float('inf')
-            max_weight = 0
-            for edge in self.edges:
-                if 'weight' in edge['properties']:
-                    if edge['properties']['weight'] < min_weight:
-                        min_weight = edge['properties']['weight']
-                    elif edge['properties']['weight'] > max_weight:
-                        max_weight = edge['properties']['weight']
+        # the existing edge elements are only rescaled if the weight range changed
+        self.rescale_edge_weights()
 
         if get_change:
             # check expandability of existing nodes
@@ -1495,9 +2165,7 @@ class ActiveNetwork(BuiltinDataset):
                     edge_data['probability'] = edge_info['properties']['probability']
 
                 # add weight
-                if 'weight' in edge_info['properties'] and max_weight > min_weight:
-                    edge_data['normalized_weight'] = (edge_info['properties']['weight'] - min_weight) / (
-                                max_weight - min_weight)
+                self._set_normalized_weight(edge_data)
 
                 # add label
                 if self.edge_label_field is not None:
@@ -1618,11 +2286,8 @@ class ActiveNetwork(BuiltinDataset):
                     if self.edge_label_field in edge_info:
                         edge_data['label'] = edge_info[self.edge_label_field]
 
-                if 'weight' in edge_info['properties'] and max_weight > min_weight:
-                    edge_data['normalized_weight'] = (edge_info['properties']['weight'] - min_weight) / (
-                                max_weight - min_weight)
-
-                else:
+                self._set_normalized_weight(edge_data)
+                if 'normalized_weight' not in edge_data:
                     edge_data['label'] = ''  # blank label
                 element = {'group': 'edges', 'data': edge_data}
 
@@ -1653,17 +2318,52 @@ class ActiveNetwork(BuiltinDataset):
             result = {'success': 1, 'message': 'Successful'}
             return result
 
+    def compact(self):
+        """
+        remove the deleted edges from the underlying network, see `BuiltinDataset.compact`, and translate the ids of
+        the active edges, of their elements and of the edges in the recent interactions
+        :return: see `BuiltinDataset.compact`
+        """
+        result = BuiltinDataset.compact(self)
+        translation = result['translation']
+        self.active_edges = dict([(translation[e], info) for e, info in self.active_edges.items()
+                                  if translation[e] >= 0])
+        self.selected_edges = set([translation[e] for e in self.selected_edges if translation[e] >= 0])
+        for element in self.elements:
+            data = element['data']
+            if data.get('element_type') == 'edge' and isinstance(data['id'], int):
+                data['id'] = translation[data['id']]
+        for interaction in self.recent_interactions:
+            if 'edge' in interaction and isinstance(interaction['edge'].get('e_index'), int):
+                e_index = interaction['edge']['e_index']
+                interaction['edge']['e_index'] = translation[e_index] if e_index < len(translation) else -1
+        return result
+
+    def _move_element(self, element_index, new_index):
+        """
+        move the element at position element_index to new_index, and update its element_index in the active nodes,
+        active edges or predicted edges
+        """
+        element = self.elements[element_index]
+        self.elements[new_index] = element
+        if element['data']['element_type'] == 'node':
+            self.active_nodes[element['data']['id']]['element_index'] = new_index
+        elif not element['data']['predicted']:
+            self.active_edges[element['data']['id']]['element_index'] = new_index
+        else:
+            predicted_edges = self.predicted_edges[element['data']['source']]
+            predicted_edges[predicted_edges.index(element_index)] = new_index
+
     def remove_element(self, element_indexes):
         """
         remove the elements at position element_indexes from element list
-        :param element_indexes:
+        the place of a removed element is taken by the last element, so removing k elements costs O(k) whatever the
+        number of elements, the elements do not stay in the order they were added
+        :param element_indexes: list of positions of the elements in self.elements
         :return:
         """
-        # print('element_indexes = ', element_indexes)
-        element_indexes.sort(reverse=True)  # to save computation when left shifting the elements
-        # print('element_indexes = ', element_indexes)
-        for element_index in element_indexes:
-            # print('\t', element_index, '\t', len(self.elements), '\t', element_indexes)
+        # from the last position, so that the last element is never one to remove
+        for element_index in sorted(set(element_indexes), reverse=True):
             element = self.elements[element_index]
             if element['data']['element_type'] == 'node':
                 # remove an active node
@@ -1676,27 +2376,8 @@ class ActiveNetwork(BuiltinDataset):
                 else:
                     source = element['data']['source']
                     self.predicted_edges[source].remove(element_index)
-
             if element_index < len(self.elements) - 1:  # not the last element
-                # then shift the subsequent elements to the left
-                for i in range(element_index, len(self.elements) - 1, 1):
-                    self.elements[i] = self.elements[i + 1]
-                    # update the element_index in active nodes and active edges
-                    if self.elements[i]['data']['element_type'] == 'node':
-                        node_id = self.elements[i]['data']['id']
-                        self.active_nodes[node_id]['element_index'] = i
-                    else:
-                        if not self.elements[i]['data']['predicted']:
-                            e_index = self.elements[i]['data']['id']
-                            self.active_edges[e_index]['element_index'] = i
-                        else:
-                            source = self.elements[i]['data']['source']
-                            self.predicted_edges[source].remove(i + 1)
-                            self.predicted_edges[source].append(i)
-                            pass
-            else:
-                # TODO: check this
-                pass
+                self._move_element(len(self.elements) - 1, element_index)
             del self.elements[-1]
 
     def deactivate_nodes(self, node_ids, get_change=False):
@@ -1705,11 +2386,12 @@ class ActiveNetwork(BuiltinDataset):
         :param node_ids:
         :return:
         """
-        sub_network = self.get_network(node_ids, return_edge_index=True)
         node_ids = set(node_ids)
-        removed_edges = set([e_index for e_index in sub_network['edges'] if
-                             (self.edges[e_index]['source'] in node_ids or
-                              self.edges[e_index]['target'] in node_ids) and e_index in self.active_edges])
+        # the active edges out-going from and in-coming to the nodes
+        removed_edges = set([e_index for node in node_ids
+                             for e_index in itertools.chain(self.adj_list.get(node, ()), self.in_adj_list.get(node, ()))
+                             if e_index in self.active_edges and
+                             (self.edges[e_index]['source'] in node_ids or self.edges[e_index]['target'] in node_ids)])
 
         if get_change:
             # check expandability of existing nodes
@@ -2042,7 +2724,8 @@ class ActiveNetwork(BuiltinDataset):
 
         if self.compare_tasks(task):
             pass
-        result = self.analyzer.perform_analysis(task=task, params=None)
+        # scores and labels are attached from arrays, without building a dictionary per node first
+        result = self.analyzer.perform_analysis(task=task, params={'result_format': 'arrays'})
         if result['success'] == 0:
             # print(result['message'])
             return
@@ -2053,20 +2736,17 @@ class ActiveNetwork(BuiltinDataset):
             self.erase_previous_analysis_result(task_id='social_influence_analysis')
             self.erase_previous_analysis_result(task_id='community_detection')
             scores = result['scores']
-            score_values = [score for _, score in scores.items()]
-            min_score = min(score_values)
-            max_score = max(score_values)
+            if len(scores) == 0:
+                return
+            visualisation_scores = helpers.min_max_scaling(scores, scores.min(), scores.max(), (0.2, 0.99))
             # update the new result
-            for node in scores:
+            for node, score, visualisation_score in zip(result['node_ids'].tolist(), scores.tolist(),
+                                                        visualisation_scores.tolist()):
                 if node in self.active_nodes:
                     element_index = self.active_nodes[node]['element_index']
                     element = self.elements[element_index]
-                    score = scores[node]
                     element['data']['social_influence_score'] = score
-                    element['data']['visualisation_social_influence_score'] = helpers.min_max_scaling(score,
-                                                                                                      min_score,
-                                                                                                      max_score,
-                                                                                                      (0.2, 0.99))
+                    element['data']['visualisation_social_influence_score'] = visualisation_score
 
         #################################
         elif task_id == 'community_detection':
@@ -2074,12 +2754,14 @@ class ActiveNetwork(BuiltinDataset):
             self.erase_previous_analysis_result(task_id='social_influence_analysis')
             self.erase_previous_analysis_result(task_id='community_detection')
             # update the new result
-            membership = result['membership']
-            for node in membership:
-                if node in self.active_nodes:
+            updated = set()
+            for node, c, m in zip(result['node_ids'].tolist(), result['labels'].tolist(),
+                                  result['confidences'].tolist()):
+                # a node in several communities is shown in the first one
+                if node in self.active_nodes and node not in updated:
+                    updated.add(node)
                     element_index = self.active_nodes[node]['element_index']
                     element = self.elements[element_index]
-                    c, m = list(membership[node].items())[0]
                     element['data']['community'] = c
                     element['data']['community_confidence'] = m
 
@@ -2117,80 +2799,52 @@ class ActiveNetwork(BuiltinDataset):
         else:
             pass
 
-    def dump_network(self, filename, output_dir):
+    def _iter_network_records(self):
+        ##############################
+        # all the nodes
+        for node in self.nodes:
+            yield {'id': node, 'type': 'node', 'properties': self.nodes[node]}
+        ##############################
+        # all the edges, a deleted edge keeps its place so that the indexes of the active edges stay valid
+        for edge in self.edges:  # type weight confidence
+            if edge is None:
+                yield {'type': 'deleted_edge'}
+                continue
+            edge_info = dict(edge)
+            edge_info['type'] = 'edge'
+            yield edge_info
+        ##############################
+        # all the active nodes
+        for node in self.active_nodes:
+            yield {'id': node, 'type': 'active_node', 'properties': self.active_nodes[node]}
+        ##############################
+        # all the active edges:
+        for edge in self.active_edges:
+            yield {'id': edge, 'type': 'active_edge', 'properties': self.active_edges[edge]}
+        ##############################
+        # all predicted edges
+        for node in self.predicted_edges:
+            yield {'id': node, 'type': 'predicted_edge', 'edges': self.predicted_edges[node]}
+        ##############################
+        # all the elements
+        for element in self.elements:
+            yield {'type': 'active_element', 'properties': element}
+        ##############################
+        # last analysis
+        yield {'type': 'last_analysis', 'properties': self.last_analysis}
+
+    def dump_network(self, filename, output_dir, params=None):
         """
-        dump the whole network to a specified directory
-        will fail if file already exists
+        dump the whole network to a specified directory, the records are written as they are serialized, and
+        compressed if asked, see `BuiltinDataset._dump_records`
+        will overwrite the file if it already exists
+        :param filename:
+        :param output_dir:
+        :param params: (optional) dictionary with the "compressed", "compression_level" and "num_threads" options
         """
         try:
             output_path = Path(output_dir) / filename
-            # with open(output_path, "x") as output_file:
-            with open(output_path, "w") as output_file:
-                ##############################
-                # all the nodes
-                for node in self.nodes:
-                    node_info = {
-                        'id': node,
-                        'type': 'node',
-                        'properties': self.nodes[node]
-                    }
-                    json.dump(node_info, output_file)
-                    output_file.write('\n')
-                ##############################
-                # all the edges
-                for edge in self.edges:  # type weight confidence
-                    edge_info = edge.copy()
-                    edge_info['type'] = 'edge'
-                    json.dump(edge_info, output_file)
-                    output_file.write('\n')
-                ##############################
-                # all the active nodes
-                for node in self.active_nodes:
-                    node_info = {
-                        'id': node,
-                        'type': 'active_node',
-                        'properties': self.active_nodes[node]
-                    }
-                    json.dump(node_info, output_file)
-                    output_file.write('\n')
-                ##############################
-                # all the active edges:
-                for edge in self.active_edges:
-                    edge_info = {
-                        'id': edge,
-                        'type': 'active_edge',
-                        'properties': self.active_edges[edge]
-                    }
-                    json.dump(edge_info, output_file)
-                    output_file.write('\n')
-                ##############################
-                # all predicted edges
-                for node in self.predicted_edges:
-                    node_info = {
-                        'id': node,
-                        'type': 'predicted_edge',
-                        'edges': self.predicted_edges[node]
-                    }
-                    json.dump(node_info, output_file)
-                    output_file.write('\n')
-                ##############################
-                # all the elements
-                for element in self.elements:
-                    elment_info = {
-                        'type': 'active_element',
-                        'properties': element
-                    }
-                    json.dump(elment_info, output_file)
-                    output_file.write('\n')
-                ##############################
-                # last analysis
-                analysis_info = {
-                    'type': 'last_analysis',
-                    'properties': self.last_analysis
-                }
-                json.dump(analysis_info, output_file)
-                output_file.write('\n')
-                ##############################
+            self._dump_records(self._iter_network_records(), output_path, 'w', params or {})
             return 1
         except Exception as e:
             return e
@@ -2323,7 +2977,12 @@ class ActiveNetwork(BuiltinDataset):
             # reset the current containers
             self.nodes = {}
             self.edges = []
+            # no longer shared with the dataset the network may be loaded from, see `share_data`
+            self.revision = Revision()
+            self._clear_indexes()
+            self.num_deleted_edges = 0
             self.adj_list = {}
+            self.in_adj_list = {}
             self.node_types = set()
             self.edge_types = set()
 
@@ -2331,6 +2990,7 @@ class ActiveNetwork(BuiltinDataset):
             self.active_edges = {}
 
             self.elements = []
+            self.weight_range = None
             #
             self.network_name = None
             self.node_label_field = None
@@ -2344,11 +3004,8 @@ class ActiveNetwork(BuiltinDataset):
 
             # load from file
 
-            file = open(path_2_data, 'r')
-            for line in file:
-                if line.startswith('#'):  # ignore the comments
-                    continue
-                line_object = json.loads(line.strip())
+            file = json_lines.open_json_lines(path_2_data)
+            for line_object in iter_json_lines(file, LoadStats()):
                 #####################################
                 # nodes
                 if line_object['type'] == 'node':
@@ -2363,13 +3020,20 @@ class ActiveNetwork(BuiltinDataset):
                             'observed': True, 'properties': line_object['properties']}
                     self.edges.append(edge)
                     e_index = len(self.edges) - 1
-                    source = edge['source']
+                    source, target = edge['source'], edge['target']
                     if source in self.adj_list:
                         self.adj_list[source].append(e_index)
                     else:
                         self.adj_list[source] = [e_index]
+                    if target in self.in_adj_list:
+                        self.in_adj_list[target].append(e_index)
+                    else:
+                        self.in_adj_list[target] = [e_index]
                     if 'type' in line_object['properties']:
                         self.edge_types.add(line_object['properties']['type'])
+                elif line_object['type'] == 'deleted_edge':
+                    self.edges.append(None)
+                    self.num_deleted_edges += 1
                 #####################################
                 # active nodes
                 elif line_object['type'] == 'active_node':
@@ -2400,6 +3064,7 @@ class ActiveNetwork(BuiltinDataset):
                 #####################################
                 else:
                     continue
+            file.close()
             self.edge_types = list(self.edge_types)
             self.node_types = list(self.node_types)
         except Exception as e:
@@ -2415,7 +3080,12 @@ class ActiveNetwork(BuiltinDataset):
         # reset the current containers
         self.nodes = {}
         self.edges = []
+        # no longer shared with the dataset the network may be loaded from, see `share_data`
+        self.revision = Revision()
+        self._clear_indexes()
+        self.num_deleted_edges = 0
         self.adj_list = {}
+        self.in_adj_list = {}
         self.node_types = {}
         self.edge_types = {}
 
@@ -2423,6 +3093,8 @@ class ActiveNetwork(BuiltinDataset):
         self.active_edges = {}
 
         self.elements = []
+        # weight range the normalized weights of the edge elements are relative to, see `rescale_edge_weights`
+        self.weight_range = None
         #
         self.network_name = None
         self.node_label_field = None
@@ -2661,6 +3333,11 @@ class ActiveNetwork(BuiltinDataset):
                 if 'probability' in properties:
                     element_index = self.active_edges[edge_id]['element_index']
                     self.elements[element_index]['data']['probability'] = properties['probability']
+                # update the weight, the other edges are only rescaled if the weight range changed
+                if 'weight' in properties:
+                    self.rescale_edge_weights()
+                    element_index = self.active_edges[edge_id]['element_index']
+                    self._set_normalized_weight(self.elements[element_index]['data'])
                 # remember the interaction
                 interaction = {'action': edge_update_action,
                                'edge': {'e_index': edge_id, 'source': source, 'target': target},
@@ -2704,6 +3381,9 @@ class ActiveNetwork(BuiltinDataset):
             # add type
             if 'type' in edge_info['properties']:
                 edge_data['type'] = edge_info['properties']['type']
+            # add weight, the other edges are only rescaled if the weight range changed
+            self.rescale_edge_weights()
+            self._set_normalized_weight(edge_data)
             # add edge label
             if self.edge_label_field is not None:
                 if self.edge_label_field in edge_info:
@@ -2824,14 +3504,59 @@ class ActiveNetwork(BuiltinDataset):
         self.toggle_node_selection(new_node)
 
 
+class LazyDatasetEntry(dict):
+    """
+    entry of a lazily loaded dataset in `BuiltinDatasetsManager.datasets`
+    its 'data' is loaded on first access, and may be unloaded by the manager to stay within its memory budget, it is
+    None while the dataset is not loaded
+    """
+
+    def __init__(self, manager, dataset_id, load, **info):
+        """
+        :param manager: BuiltinDatasetsManager the entry belongs to
+        :param dataset_id: id of the dataset
+        :param load: function to load the dataset
+        :param info: name, description, ... of the dataset
+        """
+        super(LazyDatasetEntry, self).__init__(info, data=None)
+        self.manager = manager
+        self.dataset_id = dataset_id
+        self.load = load
+        self.summary = None  # number of nodes and edges and their types, kept after unloading
+
+    def __getitem__(self, key):
+        if key == 'data':
+            return self.manager.access_dataset(self.dataset_id)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if key == 'data':
+            return self.manager.access_dataset(self.dataset_id)
+        return dict.get(self, key, default)
+
+    def is_loaded(self):
+        return dict.__getitem__(self, 'data') is not None
+
+
 class BuiltinDatasetsManager(DataManager):
     """
     class for managing builtin datasets
     """
 
-    def __init__(self, connector, params, load_on_construcion=False):
+    def __init__(self, connector, params, load_on_construcion=False, memory_budget=None):
+        """
+        :param connector:
+        :param params:
+        :param load_on_construcion: True to add the builtin datasets
+        :param memory_budget: (optional) MB of lazily added datasets kept loaded, the least recently used unmodified
+            ones are unloaded beyond it
+        """
         super(BuiltinDatasetsManager, self).__init__(connector, params)
         self.datasets = {}
+        self.memory_budget = memory_budget
+        self.loaded = OrderedDict()  # ids of the loaded lazy datasets -> estimated MB, least recently used first
+        self.lock = threading.RLock()
+        self.metrics = {'loads': 0, 'evictions': 0, 'hits': 0, 'load_seconds': 0.0, 'evicted_mb': 0.0}
         if load_on_construcion:
             self.add_dataset('bbc_islam_groups', 'BBC Islam Groups',
                              '%s/datasets/preprocessed/bbc_islam_groups.json' % path2root)
@@ -2860,12 +3585,14 @@ class BuiltinDatasetsManager(DataManager):
             self.add_dataset('rhodes_bombing', 'Rhodes Bombing',
                              '%s/datasets/preprocessed/rhodes_bombing.json' % path2root)
 
-    def add_dataset(self, datset_id, name, path_2_data, settings=None, uploaded=False, from_file=True):
+    def add_dataset(self, datset_id, name, path_2_data, settings=None, uploaded=False, from_file=True,
+                    snapshot=False, lazy=False):
         """
         To add a dataset from file
         :param datset_id:
         :param name:
-        :param settings: dict of dataset settings
+        :param settings: dict of dataset settings, "indexes" declares the node indexes of the dataset, see
+            `BuiltinDataset`
         :param path_2_data: file containing the dataset, each line is a JSON object about either a node or an edge
             node object is in the following format:
             {
@@ -2887,6 +3614,9 @@ class BuiltinDatasetsManager(DataManager):
                             ...
                         }
             }
+        :param snapshot: True to open the binary snapshot of the file instead of parsing it, see `BuiltinDataset`
+        :param lazy: True to only register the dataset, it is loaded on first access to its 'data', and may be
+            unloaded again while it is not modified, see `access_dataset`
         :return: a dictionary, in the following format
             {
                 'success': 1 if the dataset is added successfully, 0 otherwise
@@ -2899,20 +3629,106 @@ class BuiltinDatasetsManager(DataManager):
         try:
             if datset_id in self.datasets:
                 return {'success': 0, 'message': 'dataset_id is already existed'}
-            dataset = BuiltinDataset(path_2_data, uploaded, from_file)
-            self.datasets[datset_id] = {
+            info = {
                 'name': name,
-                'data': dataset,
                 'description': settings["description"] if "description" in settings else "",
                 'version': settings["version"] if "version" in settings else 1.0,
                 'directed': settings["directed"] if "directed" in settings else True,
                 'multigraph': settings["multigraph"] if "multigraph" in settings else False
             }
+            indexes = settings.get("indexes")
+            if lazy and from_file and not uploaded:
+                if not os.path.isfile(path_2_data):
+                    return {'success': 0, 'message': 'there should be some error in IO'}
+                self.datasets[datset_id] = LazyDatasetEntry(
+                    self, datset_id, lambda: BuiltinDataset(path_2_data, uploaded, from_file, snapshot, indexes), **info)
+                return {'success': 1, 'message': 'dataset is registered successfully'}
+            dataset = BuiltinDataset(path_2_data, uploaded, from_file, snapshot, indexes)
+            info['data'] = dataset
+            self.datasets[datset_id] = info
             return {'success': 1, 'message': 'dataset is created successfully'}
         except Exception as e:
             print(e)
             return {'success': 0, 'message': 'there should be some error in IO'}
 
+    def access_dataset(self, dataset_id):
+        """
+        get a lazily added dataset, loading it if it is not loaded, and unloading the least recently used ones if the
+        loaded datasets exceed the memory budget
+        :param dataset_id: id of the dataset
+        :return: BuiltinDataset
+        """
+        with self.lock:
+            entry = self.datasets[dataset_id]
+            dataset = dict.__getitem__(entry, 'data')
+            if dataset is not None:
+                self.metrics['hits'] += 1
+                self.loaded.move_to_end(dataset_id)
+                return dataset
+            start = time.perf_counter()
+            dataset = entry.load()
+            self.metrics['load_seconds'] += time.perf_counter() - start
+            self.metrics['loads'] += 1
+            dict.__setitem__(entry, 'data', dataset)
+            entry.summary = {'edge_types': dataset.edge_types, 'node_types': dataset.node_types,
+                             'num_nodes': len(dataset.nodes), 'num_edges': len(dataset.edges)}
+            self.loaded[dataset_id] = dataset.estimate_memory()
+            self.evict(keep=dataset_id)
+            return dataset
+
+    def evict(self, keep=None):
+        """
+        unload the least recently used lazy datasets until the loaded ones fit in the memory budget
+        a modified dataset is never unloaded, since it cannot be loaded again from its file
+        :param keep: (optional) id of a dataset not to unload
+        :return: list of ids of the unloaded datasets
+        """
+        evicted = []
+        with self.lock:
+            if self.memory_budget is None:
+                return evicted
+            total = sum(self.loaded.values())
+            for dataset_id in list(self.loaded):
+                if total <= self.memory_budget:
+                    break
+                entry = self.datasets.get(dataset_id)
+                if not isinstance(entry, LazyDatasetEntry):
+                    # removed from the manager
+                    total -= self.loaded.pop(dataset_id)
+                    continue
+                if dataset_id == keep:
+                    continue
+                if len(dict.__getitem__(entry, 'data').journal) > 0:
+                    continue
+                dict.__setitem__(entry, 'data', None)
+                memory = self.loaded.pop(dataset_id)
+                total -= memory
+                self.metrics['evictions'] += 1
+                self.metrics['evicted_mb'] += memory
+                evicted.append(dataset_id)
+        return evicted
+
+    def get_metrics(self):
+        """
+        :return: dictionary, in the form
+            {
+                'loads': number of loads of lazy datasets
+                'evictions': number of unloads of lazy datasets
+                'hits': number of accesses to lazy datasets that were loaded
+                'load_seconds': time spent in loading lazy datasets
+                'evicted_mb': estimated MB freed by unloading
+                'loaded': ids of the loaded lazy datasets, least recently used first
+                'loaded_mb': estimated MB of the loaded lazy datasets
+                'memory_budget': the memory budget in MB, None if unlimited
+            }
+        """
+        with self.lock:
+            metrics = dict(self.metrics)
+            metrics['loaded'] = list(self.loaded)
+            metrics['loaded_mb'] = sum(self.loaded.values())
+            metrics['memory_budget'] = self.memory_budget
+        return metrics
+
     def create_network(self, network_id, name, nodes, edges, settings=None):
         """
         create a network from node and edge lists
@@ -2980,23 +3796,36 @@ class BuiltinDatasetsManager(DataManager):
         for g in networks:
             if g in self.datasets:
                 n = self.datasets[g]
-                properties = {'name': n['name'],
-                              'edge_types': n['data'].edge_types,
-                              'node_types': n['data'].node_types,
-                              'num_nodes': len(n['data'].nodes),
-                              'num_edges': len(n['data'].edges)
-                              }
+                if isinstance(n, LazyDatasetEntry) and not n.is_loaded() and n.summary is not None:
+                    # the numbers of an unloaded dataset are known since it was last loaded
+                    properties = dict(name=n['name'], **n.summary)
+                else:
+                    properties = {'name': n['name'],
+                                  'edge_types': n['data'].edge_types,
+                                  'node_types': n['data'].node_types,
+                                  'num_nodes': len(n['data'].nodes),
+                                  'num_edges': len(n['data'].edges)
+                                  }
                 found.append({'id': g, 'properties': properties})
             else:
                 not_found.append(g)
         return {'found': found, 'not_found': not_found}
 
-    def get_network(self, network, node_ids=None, params=None):
+    def get_network(self, network, node_ids=None, params=None, num_hops=1, max_fan_out=None, time_range=None,
+                    time_key=default_time_key):
         if network in self.datasets:
-            return self.datasets[network]['data'].get_network(node_ids=node_ids, params=params)
+            return self.datasets[network]['data'].get_network(node_ids=node_ids, params=params, num_hops=num_hops,
+                                                              max_fan_out=max_fan_out, time_range=time_range,
+                                                              time_key=time_key)
         else:
             return {'edges': [], 'nodes': []}
 
+    def get_csr_view(self, network, node_ids=None, params=None):
+        if network in self.datasets:
+            return self.datasets[network]['data'].get_csr_view(node_ids=node_ids, params=params)
+        else:
+            return None
+
     def get_edges(self, node_ids, network, params=None):
         if network in self.datasets:
             return self.datasets[network]['data'].get_edges(node_ids=node_ids, params=params)
@@ -3009,9 +3838,10 @@ class BuiltinDatasetsManager(DataManager):
         else:
             return {'found': [], 'not_found': node_ids}
 
-    def search_nodes(self, node_ids, network, params=None):
+    def search_nodes(self, node_ids, network, params=None, text=None, prefix=False):
         if network in self.datasets:
-            return self.datasets[network]['data'].search_nodes(node_ids=node_ids, params=params)
+            return self.datasets[network]['data'].search_nodes(node_ids=node_ids, params=params, text=text,
+                                                                prefix=prefix)
         else:
             return {'found': [], 'not_found': node_ids}
 
@@ -3075,11 +3905,7 @@ class BuiltinDatasetsManager(DataManager):
                 dataset = self.datasets[network_id]['data']
                 # create a blank active network
                 active_network = ActiveNetwork(path_2_data=None, from_file=False, uploaded=False, initialize=False)
-                active_network.nodes = dataset.nodes
-                active_network.edges = dataset.edges
-                active_network.adj_list = dataset.adj_list
-                active_network.node_types = dataset.node_types
-                active_network.edge_types = dataset.edge_types
+                active_network.share_data(dataset)
                 if network_name is not None:
                     params['network_name'] = network_name
                 if initialize:
@@ -3095,9 +3921,27 @@ class BuiltinDatasetsManager(DataManager):
             return {'success': 1, 'message': 'active network created successfully',
                     'active_network': active_network}
 
-    def save_data(self, save_path):
+    def save_data(self, save_path, network=None, active_network=None, params=None):
         """
         Save the dataset and the current state of the active_network to a file.
-        :param save_path:
-        :return:
-        """
+        the records are written as they are serialized, see `BuiltinDataset._dump_records`, and the file can be loaded
+        back with `load_active_network(from_file=True, file_path=save_path)`
+        :param save_path: the file
+        :param network: id of the dataset to save, if active_network is None
+        :param active_network: (optional) ActiveNetwork, saved with its dataset
+        :param params: (optional) dictionary with the "compressed", "compression_level" and "num_threads" options
+        :return: dictionary, with the throughput of the save in 'stats', see `json_lines.DumpStats.to_dict`
+        """
+        save_path = Path(save_path)
+        if active_network is not None:
+            dataset = active_network
+            result = active_network.dump_network(save_path.name, save_path.parent, params=params)
+        elif network in self.datasets:
+            dataset = self.datasets[network]['data']
+            result = dataset.dump_network(save_path.name, save_path.parent,
+                                          params=dict(params or {}, output_format='json'))
+        else:
+            return {'success': 0, 'message': 'dataset_id not found'}
+        if result != 1:
+            return {'success': 0, 'message': 'cannot save the data: %s' % result}
+        return {'success': 1, 'message': 'data saved successfully', 'stats': dataset.dump_stats}
@@ -0,0 +1,291 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import sys
+
+
+class _Missing:
+    """
+    marks a property, node or edge that does not exist
+    """
+
+    def __repr__(self):
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+def estimate_size(value, depth=2):
+    """
+    estimate the memory taken by a value and the values it holds, down to a given depth
+    :param value:
+    :param depth: number of levels of containers to measure
+    :return: size in bytes
+    """
+    size = sys.getsizeof(value)
+    if depth > 0:
+        if isinstance(value, dict):
+            for v in value.values():
+                size += estimate_size(v, depth - 1)
+        elif isinstance(value, (list, tuple, set)):
+            for v in value:
+                size += estimate_size(v, depth - 1)
+    return size
+
+
+def _differ(value, other):
+    if value is other:
+        return False
+    try:
+        return bool(value != other)
+    except (TypeError, ValueError):
+        # e.g., numpy arrays
+        return True
+
+
+def get_diff(before, after):
+    """
+    field level differences between two versions of properties
+    :param before: dictionary of properties, or None
+    :param after: dictionary of properties, or None
+    :return: dictionary of key: (value before, value after), MISSING for a key that is not in a version
+    """
+    before = before or {}
+    after = after or {}
+    diff = {}
+    for key, value in before.items():
+        new_value = after.get(key, MISSING)
+        if new_value is MISSING or _differ(value, new_value):
+            diff[key] = (value, new_value)
+    for key, value in after.items():
+        if key not in before:
+            diff[key] = (MISSING, value)
+    return diff
+
+
+def apply_diff(properties, diff, undo):
+    """
+    :param properties: dictionary of properties, changed in place
+    :param diff: see `get_diff`
+    :param undo: True to set the values before the change, False to set the values after it
+    :return: properties
+    """
+    i = 0 if undo else 1
+    for key, values in diff.items():
+        if values[i] is MISSING:
+            properties.pop(key, None)
+        else:
+            properties[key] = values[i]
+    return properties
+
+
+class ChangeJournal:
+    """
+    undo/redo journal of the changes of a dataset
+    the records are kept in a ring buffer of fixed capacity, the records after the cursor are the undone ones that can be
+    redone, recording a change drops them
+    checkpoints keep the state of the nodes and edges changed after them, copied on their first change, to roll the
+    dataset back to a checkpoint in one step
+    the oldest checkpoints, then the oldest records, are dropped to keep the estimated memory under max_bytes
+    """
+
+    def __init__(self, capacity=1000, max_bytes=None, checkpoint_interval=None):
+        """
+        :param capacity: maximum number of records
+        :param max_bytes: (optional) memory budget of the records and checkpoints, in bytes
+        :param checkpoint_interval: (optional) number of records after which a checkpoint is made, no periodic
+            checkpoints if None
+        """
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.checkpoint_interval = checkpoint_interval
+        self.clear()
+
+    def clear(self):
+        self.records = [None] * self.capacity
+        self.sizes = [0] * self.capacity
+        self.start = 0  # number of records dropped from the buffer so far, i.e., position of the oldest record
+        self.size = 0  # number of records in the buffer
+        self.cursor = 0  # number of records in the buffer that are applied, the others can be redone
+        self.num_bytes = 0
+        self.checkpoints = []  # in order of creation
+        self.num_since_checkpoint = 0
+
+    def __len__(self):
+        return self.cursor
+
+    def _slot(self, i):
+        return (self.start + i) % self.capacity
+
+    def get_records(self):
+        """
+        :return: list of the applied records, the oldest first
+        """
+        return [self.records[self._slot(i)] for i in range(self.cursor)]
+
+    def _drop_oldest(self):
+        slot = self._slot(0)
+        self.num_bytes -= self.sizes[slot]
+        self.records[slot] = None
+        self.sizes[slot] = 0
+        self.start += 1
+        self.size -= 1
+        self.cursor = max(self.cursor - 1, 0)
+
+    def _drop_undone(self):
+        for i in range(self.cursor, self.size):
+            slot = self._slot(i)
+            self.num_bytes -= self.sizes[slot]
+            self.records[slot] = None
+            self.sizes[slot] = 0
+        self.size = self.cursor
+        position = self.start + self.cursor
+        for checkpoint in self.checkpoints:
+            if checkpoint['position'] is not None and checkpoint['position'] > position:
+                # the records after the checkpoint no longer lead to it
+                checkpoint['position'] = None
+
+    def _drop_oldest_checkpoint(self):
+        checkpoint = self.checkpoints.pop(0)
+        self.num_bytes -= checkpoint['num_bytes']
+
+    def _keep_budget(self):
+        if self.max_bytes is None:
+            return
+        while self.num_bytes > self.max_bytes:
+            if len(self.checkpoints) > 1:
+                self._drop_oldest_checkpoint()
+            elif self.size > 1:
+                self._drop_oldest()
+            elif len(self.checkpoints) > 0:
+                self._drop_oldest_checkpoint()
+            else:
+                break
+
+    def record(self, record):
+        """
+        add the record of a change, the records that were undone are dropped
+        :param record: dictionary
+        """
+        self._drop_undone()
+        if self.size == self.capacity:
+            self._drop_oldest()
+        slot = self._slot(self.size)
+        self.records[slot] = record
+        self.sizes[slot] = estimate_size(record, 3)
+        self.num_bytes += self.sizes[slot]
+        self.size += 1
+        self.cursor = self.size
+        self.num_since_checkpoint += 1
+        if self.checkpoint_interval is not None and self.num_since_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+        self._keep_budget()
+
+    def undo(self):
+        """
+        :return: the last applied record, which is now undone, None if there is none
+        """
+        if self.cursor == 0:
+            return None
+        self.cursor -= 1
+        return self.records[self._slot(self.cursor)]
+
+    def redo(self):
+        """
+        :return: the first undone record, which is now applied again, None if there is none
+        """
+        if self.cursor == self.size:
+            return None
+        record = self.records[self._slot(self.cursor)]
+        self.cursor += 1
+        return record
+
+    def checkpoint(self):
+        """
+        start a checkpoint of the current state
+        """
+        self.checkpoints.append({'position': self.start + self.cursor, 'nodes': {}, 'edges': {}, 'num_bytes': 0})
+        self.num_since_checkpoint = 0
+        self._keep_budget()
+
+    def needs_image(self, kind, key):
+        """
+        :param kind: 'nodes' or 'edges'
+        :param key: node id or edge index
+        :return: True if the state of the node or edge before its change is to be kept by the last checkpoint
+        """
+        return len(self.checkpoints) > 0 and key not in self.checkpoints[-1][kind]
+
+    def keep_image(self, kind, key, image, item=None):
+        """
+        keep the state of a node or edge before its first change after the last checkpoint
+        :param kind: 'nodes' or 'edges'
+        :param key: node id or edge index
+        :param image: copy of the node properties, or of the edge, MISSING if it does not exist
+        :param item: (optional) the edge itself, kept as (item, image) so that it is restored in place, the records
+            before the checkpoint may hold it
+        """
+        checkpoint = self.checkpoints[-1]
+        checkpoint[kind][key] = image if item is None else (item, image)
+        size = estimate_size(image, 2)
+        checkpoint['num_bytes'] += size
+        self.num_bytes += size
+
+    def pop_checkpoint(self):
+        """
+        remove the last checkpoint, and the records after it
+        :return: the checkpoint, None if there is none
+        """
+        if len(self.checkpoints) == 0:
+            return None
+        checkpoint = self.checkpoints.pop()
+        self.num_bytes -= checkpoint['num_bytes']
+        position = checkpoint['position']
+        if position is not None and position >= self.start and position <= self.start + self.cursor:
+            self.cursor = position - self.start
+            self._drop_undone()
+        else:
+            # the records no longer lead to the checkpoint
+            self.clear_records()
+        self.num_since_checkpoint = 0
+        return checkpoint
+
+    def clear_records(self):
+        """
+        remove all records, the checkpoints are kept
+        """
+        checkpoints = self.checkpoints
+        self.clear()
+        for checkpoint in checkpoints:
+            checkpoint['position'] = None
+        self.checkpoints = checkpoints
+        self.num_bytes = sum([checkpoint['num_bytes'] for checkpoint in checkpoints])
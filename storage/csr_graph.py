@@ -0,0 +1,215 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import itertools
+import numpy as np
+from storage.edge_index import get_edge_type
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _get_ranges(indptr, rows):
+    """
+    :param indptr: CSR row pointers
+    :param rows: array of rows
+    :return: the positions of the entries of the rows, row by row, and the index in `rows` of the row of each entry
+    """
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    groups = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    positions = np.arange(total) - offsets[groups] + starts[groups]
+    return positions, groups
+
+
+class CSRGraph:
+    """
+    columnar view of the edges of a dataset, with the out-going edges of each node in compressed sparse row (CSR)
+    layout, for vectorized traversals and edge selection, see `get_ego_network`
+    the view is a copy, it is built again when the dataset changes, see `is_stale`
+    """
+
+    def __init__(self, nodes, edges, adj_list):
+        """
+        :param nodes: dictionary of node id -> properties
+        :param edges: list of edges, None for a deleted edge
+        :param adj_list: dictionary of node id -> indexes of its out-going edges, in increasing order
+        """
+        self.nodes = nodes
+        self.edges = edges
+        self.adj_list = adj_list
+        self.num_nodes = len(nodes)
+        self.num_edges = len(edges)
+        self.node_ids = list(nodes)
+        # the targets of the edges that are not nodes of the dataset get the codes after the nodes
+        self.codes = dict([(node, code) for code, node in enumerate(self.node_ids)])
+        # the adjacency lists of the nodes, one after the other, are the CSR layout
+        lists = [adj_list.get(node, ()) for node in self.node_ids]
+        lengths = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+        self.indices = np.fromiter(itertools.chain.from_iterable(lists), dtype=np.int64, count=int(lengths.sum()))
+        self.indptr = np.zeros(len(self.node_ids) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        self.sources = np.full(self.num_edges, -1, dtype=np.int64)
+        self.sources[self.indices] = np.repeat(np.arange(len(lists)), lengths)
+        # the columns are read in the order of the edges, which is much faster than in the order of the adjacency lists
+        self.e_indexes = np.flatnonzero(self.sources >= 0)
+        self.alive_edges = [edges[e_index] for e_index in self.e_indexes.tolist()]
+        codes = self.codes
+        try:
+            targets = [codes[edge['target']] for edge in self.alive_edges]
+        except KeyError:
+            targets = [self._get_code(edge['target']) for edge in self.alive_edges]
+        self.targets = np.full(self.num_edges, -1, dtype=np.int64)
+        self.targets[self.e_indexes] = targets
+        if len(self.node_ids) > len(lists):
+            self.indptr = np.append(self.indptr, np.full(len(self.node_ids) - len(lists), self.indptr[-1]))
+        self.type_codes = None  # see `get_type_codes`
+        self.type_code_map = None  # edge type -> code
+        self.columns = {}  # see `get_column`
+
+    def _get_code(self, node):
+        code = self.codes.get(node)
+        if code is None:
+            code = self.codes[node] = len(self.node_ids)
+            self.node_ids.append(node)
+        return code
+
+    def get_type_codes(self):
+        """
+        :return: array of the codes of the types of the edges, -1 for an edge without a type, see `type_code_map`
+        """
+        if self.type_codes is None:
+            type_codes = {}
+            self.type_codes = np.full(self.num_edges, -1, dtype=np.int64)
+            self.type_codes[self.e_indexes] = [type_codes.setdefault(get_edge_type(edge), len(type_codes))
+                                               for edge in self.alive_edges]
+            if None in type_codes:
+                self.type_codes[self.type_codes == type_codes.pop(None)] = -1
+            self.type_code_map = type_codes
+        return self.type_codes
+
+    def get_column(self, key):
+        """
+        :param key: a numeric property of the edges, e.g., 'weight'
+        :return: array of the property of the edges, nan for an edge without it
+        """
+        if key not in self.columns:
+            values = [(edge['properties'] or {}).get(key, np.nan) for edge in self.alive_edges]
+            column = np.full(self.num_edges, np.nan)
+            try:
+                column[self.e_indexes] = values
+            except (TypeError, ValueError):
+                column[self.e_indexes] = [_to_float(value) for value in values]
+            self.columns[key] = column
+        return self.columns[key]
+
+    def is_stale(self, nodes, edges, adj_list):
+        """
+        :return: True if the view is not of these containers, or they were resized
+        """
+        return nodes is not self.nodes or edges is not self.edges or adj_list is not self.adj_list or \
+            len(nodes) != self.num_nodes or len(edges) != self.num_edges
+
+    def get_edge_mask(self, edge_types=None, min_weight=None, min_confidence=None):
+        """
+        select edges by type, weight and confidence, a missing weight or confidence counts as 0
+        :return: boolean array over the edge indexes, None if every edge is selected
+        """
+        mask = None
+        if edge_types is not None:
+            type_codes = self.get_type_codes()
+            mask = np.isin(type_codes, [self.type_code_map[t] for t in edge_types if t in self.type_code_map])
+        for key, minimum in (('weight', min_weight), ('confidence', min_confidence)):
+            if minimum is not None:
+                column = self.get_column(key)
+                selected = np.where(np.isnan(column), 0, column) >= minimum
+                mask = selected if mask is None else mask & selected
+        return mask
+
+    def get_codes(self, node_ids):
+        """
+        :return: array of the distinct codes of the given nodes of the dataset, in order of first appearance
+        """
+        codes = [self.codes[u] for u in node_ids if u in self.codes and self.codes[u] < self.num_nodes]
+        codes = np.asarray(codes, dtype=np.int64)
+        _, first = np.unique(codes, return_index=True)
+        return codes[np.sort(first)]
+
+    def _get_out_edges(self, rows, mask, max_fan_out=None):
+        positions, groups = _get_ranges(self.indptr, rows)
+        e_indexes = self.indices[positions]
+        if mask is not None:
+            selected = mask[e_indexes]
+            e_indexes, groups = e_indexes[selected], groups[selected]
+        if max_fan_out is not None and len(e_indexes) > 0:
+            # rank of each edge among the selected out-going edges of its node
+            ranks = np.arange(len(groups)) - np.searchsorted(groups, groups)
+            e_indexes = e_indexes[ranks < max_fan_out]
+        return e_indexes
+
+    def get_ego_network(self, seeds, num_hops=1, max_fan_out=None, mask=None):
+        """
+        get the ego-network of the seed nodes, i.e., the nodes reached from them in at most num_hops out-going edges,
+        the edges followed, and the edges between the reached nodes out-going from the nodes of the last hop
+        :param seeds: array of node codes, see `get_codes`
+        :param num_hops: number of hops
+        :param max_fan_out: (optional) maximum number of edges followed from a node, the first ones in index order
+        :param mask: (optional) boolean array of the selected edges, see `get_edge_mask`
+        :return: array of the edge indexes, array of the node codes, in order of discovery
+        """
+        involved = np.zeros(len(self.node_ids), dtype=bool)
+        involved[seeds] = True
+        node_codes = [seeds]
+        edge_indexes = []
+        frontier = seeds
+        for hop in range(num_hops):
+            if len(frontier) == 0:
+                break
+            e_indexes = self._get_out_edges(frontier, mask, max_fan_out)
+            edge_indexes.append(e_indexes)
+            targets = self.targets[e_indexes]
+            targets = targets[~involved[targets]]
+            _, first = np.unique(targets, return_index=True)
+            frontier = targets[np.sort(first)]
+            involved[frontier] = True
+            node_codes.append(frontier)
+        # the edges among the reached nodes, out-going from the nodes that were not expanded
+        e_indexes = self._get_out_edges(frontier, mask)
+        edge_indexes.append(e_indexes[involved[self.targets[e_indexes]]])
+        return np.concatenate(edge_indexes), np.concatenate(node_codes)
@@ -0,0 +1,207 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import heapq
+from numbers import Number
+from storage.edge_index import get_edge_type
+
+
+def get_edge_weight(edge):
+    """
+    :param edge: edge dictionary
+    :return: weight of the edge, 1 if it has no numeric weight
+    """
+    properties = edge.get('properties')
+    if not properties:
+        return 1
+    weight = properties.get('weight', 1)
+    return weight if isinstance(weight, Number) else 1
+
+
+class DegreeIndex:
+    """
+    degrees of the nodes of a dataset, in and out, per edge type and weighted, and the number of edges from each node
+    to each of its out-going neighbors
+    the total degrees are the lengths of the adjacency lists, the other counts of a node are computed from its
+    adjacency lists on its first query, then kept and updated on every change of its edges, the index covers the first
+    `num_edges` edges of the dataset and is cleared if the dataset has other edge or adjacency lists, or another number
+    of edges
+    """
+
+    def __init__(self, dataset):
+        """
+        :param dataset: the BuiltinDataset, its adjacency lists and edges are read on the queries
+        """
+        self.dataset = dataset
+        self.clear()
+
+    def clear(self):
+        # direction -> node -> ({edge type: number of edges}, {edge type: sum of the weights of the edges})
+        self.types = {'out': {}, 'in': {}}
+        self.neighbors = {}  # source -> {target: number of edges}
+        self.num_edges = len(self.dataset.edges)
+        # the containers the counts are of
+        self.containers = (self.dataset.edges, self.dataset.adj_list, self.dataset.in_adj_list)
+
+    def _get_adj_list(self, direction):
+        return self.dataset.adj_list if direction == 'out' else self.dataset.in_adj_list
+
+    def sync(self):
+        """
+        forget the counts if the edges were changed without the index
+        """
+        containers = (self.dataset.edges, self.dataset.adj_list, self.dataset.in_adj_list)
+        if self.num_edges != len(self.dataset.edges) or \
+                any([container is not current for container, current in zip(self.containers, containers)]):
+            self.clear()
+
+    def _get_types(self, direction, node):
+        entry = self.types[direction].get(node)
+        if entry is None:
+            counts = {}
+            weights = {}
+            edges = self.dataset.edges
+            for e_index in self._get_adj_list(direction).get(node, []):
+                edge = edges[e_index]
+                edge_type = get_edge_type(edge)
+                counts[edge_type] = counts.get(edge_type, 0) + 1
+                weights[edge_type] = weights.get(edge_type, 0) + get_edge_weight(edge)
+            entry = self.types[direction][node] = (counts, weights)
+        return entry
+
+    def _get_neighbors(self, node):
+        neighbors = self.neighbors.get(node)
+        if neighbors is None:
+            neighbors = {}
+            edges = self.dataset.edges
+            for e_index in self.dataset.adj_list.get(node, []):
+                target = edges[e_index]['target']
+                neighbors[target] = neighbors.get(target, 0) + 1
+            self.neighbors[node] = neighbors
+        return neighbors
+
+    def _update(self, source, target, edge_type, weight, sign):
+        for direction, node in (('out', source), ('in', target)):
+            entry = self.types[direction].get(node)
+            if entry is not None:
+                counts, weights = entry
+                count = counts.get(edge_type, 0) + sign
+                if count == 0:
+                    del counts[edge_type]
+                    del weights[edge_type]
+                else:
+                    counts[edge_type] = count
+                    weights[edge_type] = weights.get(edge_type, 0) + sign * weight
+        neighbors = self.neighbors.get(source)
+        if neighbors is not None:
+            count = neighbors.get(target, 0) + sign
+            if count == 0:
+                del neighbors[target]
+            else:
+                neighbors[target] = count
+
+    def add(self, e_index, edge):
+        """
+        count an edge, added or put back at e_index
+        """
+        self._update(edge['source'], edge['target'], get_edge_type(edge), get_edge_weight(edge), 1)
+        self.num_edges = max(self.num_edges, e_index + 1)
+
+    def remove(self, edge):
+        """
+        stop counting a deleted edge
+        """
+        self._update(edge['source'], edge['target'], get_edge_type(edge), get_edge_weight(edge), -1)
+
+    def update(self, edge, pre_type, pre_weight):
+        """
+        count an edge again after a change of its properties
+        :param edge: the edge
+        :param pre_type: type of the edge before the change
+        :param pre_weight: weight of the edge before the change
+        """
+        self._update(edge['source'], edge['target'], pre_type, pre_weight, -1)
+        self._update(edge['source'], edge['target'], get_edge_type(edge), get_edge_weight(edge), 1)
+
+    def forget(self, node):
+        """
+        forget the counts of a node, e.g., renamed or deleted
+        """
+        for direction in ('out', 'in'):
+            self.types[direction].pop(node, None)
+        self.neighbors.pop(node, None)
+
+    def get_degree(self, node, direction='out', edge_type=None, weighted=False):
+        """
+        :param node: id of the node
+        :param direction: 'out', 'in' or 'all'
+        :param edge_type: (optional) type of the edges to count, all types if None
+        :param weighted: True to sum the weights of the edges instead of counting them
+        :return: the degree of the node
+        """
+        if direction == 'all':
+            return self.get_degree(node, 'out', edge_type, weighted) + self.get_degree(node, 'in', edge_type, weighted)
+        if edge_type is None and not weighted:
+            return len(self._get_adj_list(direction).get(node, ()))
+        counts, weights = self._get_types(direction, node)
+        table = weights if weighted else counts
+        if edge_type is None:
+            return sum(table.values())
+        return table.get(edge_type, 0)
+
+    def get_neighbor_counts(self, nodes):
+        """
+        :param nodes: list of node ids
+        :return: dictionary of target: number of edges from the nodes to the target
+        """
+        neighbor_counts = {}
+        for node in nodes:
+            neighbors = self._get_neighbors(node)
+            if len(neighbor_counts) == 0:
+                neighbor_counts.update(neighbors)
+                continue
+            for target, count in neighbors.items():
+                neighbor_counts[target] = neighbor_counts.get(target, 0) + count
+        return neighbor_counts
+
+    def get_top_nodes(self, k, direction='out', edge_type=None, weighted=False, nodes=None):
+        """
+        :param k: number of nodes
+        :param direction: see `get_degree`
+        :param edge_type: see `get_degree`
+        :param weighted: see `get_degree`
+        :param nodes: (optional) the nodes to choose from, all the nodes of the dataset if None
+        :return: list of (node, degree) of the k nodes of largest degree, the largest first
+        """
+        if nodes is None:
+            nodes = self.dataset.nodes
+        degrees = ((node, self.get_degree(node, direction, edge_type, weighted)) for node in nodes)
+        return heapq.nlargest(k, degrees, key=lambda item: item[1])
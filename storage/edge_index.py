@@ -0,0 +1,220 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+from storage import helpers
+
+
+def get_edge_type(edge):
+    """
+    :param edge: edge dictionary
+    :return: type of the edge, None if it has none
+    """
+    properties = edge.get('properties')
+    if not properties:
+        return None
+    return properties.get('type')
+
+
+class EdgeIndex:
+    """
+    hash index of the edges of a dataset by (source, target, type), to find edges without scanning adjacency lists,
+    and by (source, type), i.e., per type adjacency lists to select out-going edges of some types
+    the index covers the first `num_indexed` edges of the dataset, the edges appended after them, e.g., by code that
+    builds the edge list directly, are indexed on the next lookup, and an entry found stale is rebuilt
+    """
+
+    def __init__(self):
+        self.pairs = {}  # (source, target) -> {type: [edge indexes in increasing order]}
+        # source -> {type: [edge indexes in increasing order]}, i.e., per type adjacency lists, built on the first
+        # lookup of out-going edges by type
+        self.sources = None
+        self.num_indexed = 0
+
+    def clear(self):
+        self.pairs = {}
+        self.sources = None
+        self.num_indexed = 0
+
+    @staticmethod
+    def _insert_into(table, key, edge_type, e_index):
+        types = table.get(key)
+        if types is None:
+            table[key] = {edge_type: [e_index]}
+        elif edge_type in types:
+            positions = types[edge_type]
+            positions.append(e_index)
+            if len(positions) > 1 and positions[-2] > e_index:
+                positions.sort()
+        else:
+            types[edge_type] = [e_index]
+
+    @staticmethod
+    def _discard_from(table, key, edge_type, e_index):
+        types = table.get(key)
+        if types is None or edge_type not in types:
+            return
+        positions = types[edge_type]
+        if e_index in positions:
+            positions.remove(e_index)
+        if len(positions) == 0:
+            del types[edge_type]
+            if len(types) == 0:
+                del table[key]
+
+    def _insert(self, e_index, source, target, edge_type):
+        self._insert_into(self.pairs, (source, target), edge_type, e_index)
+        if self.sources is not None:
+            self._insert_into(self.sources, source, edge_type, e_index)
+
+    def _discard(self, e_index, source, target, edge_type):
+        self._discard_from(self.pairs, (source, target), edge_type, e_index)
+        if self.sources is not None:
+            self._discard_from(self.sources, source, edge_type, e_index)
+
+    def _build_sources(self):
+        sources = {}
+        for (source, target), types in self.pairs.items():
+            source_types = sources.setdefault(source, {})
+            for edge_type, positions in types.items():
+                source_types.setdefault(edge_type, []).extend(positions)
+        for source_types in sources.values():
+            for positions in source_types.values():
+                positions.sort()
+        self.sources = sources
+
+    def sync(self, edges):
+        """
+        index the edges appended since the last lookup
+        :param edges: list of edges of the dataset, None for deleted edges
+        """
+        if self.num_indexed >= len(edges):
+            return
+        if self.sources is not None:
+            for e_index in range(self.num_indexed, len(edges)):
+                edge = edges[e_index]
+                if edge is not None:
+                    self._insert(e_index, edge['source'], edge['target'], get_edge_type(edge))
+            self.num_indexed = max(self.num_indexed, len(edges))
+            return
+        # the indexes of the edges not indexed yet are larger than the indexed ones, they are appended in order
+        pairs = self.pairs
+        with helpers.gc_paused():
+            for e_index in range(self.num_indexed, len(edges)):
+                edge = edges[e_index]
+                if edge is None:
+                    continue
+                properties = edge['properties']
+                edge_type = properties.get('type') if properties else None
+                key = (edge['source'], edge['target'])
+                types = pairs.get(key)
+                if types is None:
+                    pairs[key] = {edge_type: [e_index]}
+                elif edge_type in types:
+                    types[edge_type].append(e_index)
+                else:
+                    types[edge_type] = [e_index]
+        self.num_indexed = max(self.num_indexed, len(edges))
+
+    def add(self, e_index, edge):
+        """
+        index an edge appended to the dataset, it is left to `sync` if the index does not cover the edges before it
+        """
+        if e_index == self.num_indexed:
+            self._insert(e_index, edge['source'], edge['target'], get_edge_type(edge))
+            self.num_indexed += 1
+
+    def insert(self, e_index, edge):
+        """
+        index again an edge whose source or target changed, after it was removed with its previous ends
+        """
+        if e_index < self.num_indexed:
+            self._insert(e_index, edge['source'], edge['target'], get_edge_type(edge))
+
+    def remove(self, e_index, edge):
+        """
+        remove an edge deleted from the dataset, called before its properties are discarded
+        """
+        if e_index < self.num_indexed:
+            self._discard(e_index, edge['source'], edge['target'], get_edge_type(edge))
+
+    def retype(self, e_index, source, target, old_type, new_type):
+        """
+        move an edge whose type changed
+        """
+        if e_index < self.num_indexed and old_type != new_type:
+            self._discard(e_index, source, target, old_type)
+            self._insert(e_index, source, target, new_type)
+
+    @staticmethod
+    def _select(types, edge_types):
+        if types is None:
+            return []
+        if edge_types is None:
+            found = [e for positions in types.values() for e in positions]
+            if len(types) > 1:
+                found.sort()
+            return found
+        return sorted([e for t in edge_types if t in types for e in types[t]])
+
+    def _lookup(self, edges, table, key, edge_types, source, target=None):
+        for attempt in range(2):
+            self.sync(edges)
+            if table == 'sources' and self.sources is None:
+                self._build_sources()
+            found = self._select(getattr(self, table).get(key), edge_types)
+            for e_index in found:
+                edge = edges[e_index] if e_index < len(edges) else None
+                if edge is None or edge['source'] != source or (target is not None and edge['target'] != target):
+                    # the edges were changed without the index, rebuild it
+                    self.clear()
+                    break
+            else:
+                return found
+        return found
+
+    def find(self, edges, source, target, edge_types=None):
+        """
+        find the edges from source to target
+        :param edges: list of edges of the dataset
+        :param source: id of the source node
+        :param target: id of the target node
+        :param edge_types: (optional) collection of edge types to find, None is the type of edges without one, all
+            types if not given
+        :return: list of edge indexes in increasing order
+        """
+        return self._lookup(edges, 'pairs', (source, target), edge_types, source, target)
+
+    def find_out_edges(self, edges, source, edge_types=None):
+        """
+        find the out-going edges of source, see `find`
+        :return: list of edge indexes in increasing order
+        """
+        return self._lookup(edges, 'sources', source, edge_types, source)
@@ -0,0 +1,118 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import numpy as np
+from storage.edge_index import get_edge_type
+
+_missing = object()
+
+
+def _always_valid(element):
+    return True
+
+
+def compile_filter(params):
+    """
+    turn selection criteria into a predicate, to check the elements of a scan without interpreting the criteria again
+    for each of them, the predicate checks the same as `helpers.is_valid_node` and `helpers.is_valid_edge`
+    :param params: dictionary of property: value the elements should have, None or empty to select all
+    :return: function of the properties of an element, True if they satisfy the criteria
+    """
+    if not params:
+        return _always_valid
+    items = tuple(params.items())
+    if len(items) == 1:
+        (key, value), = items
+
+        def is_valid(properties):
+            return key in properties and not properties[key] != value
+    else:
+        def is_valid(properties):
+            for key, value in items:
+                if key not in properties or properties[key] != value:
+                    return False
+            return True
+    return is_valid
+
+
+class EdgeFilter:
+    """
+    selection criteria of edges, compiled once for a scan
+    "edge_types", "min_weight" and "min_confidence" select on the properties of the edges, a missing weight or
+    confidence counts as 0, the other criteria are checked on the edges with `compile_filter`
+    an edge is checked with `is_valid`, or all the edges at once with `get_mask`
+    """
+
+    def __init__(self, params):
+        """
+        :param params: dictionary of criteria, None to select all
+        """
+        params = dict(params or {})
+        self.edge_types = params.pop('edge_types', None)
+        self.min_weight = params.pop('min_weight', None)
+        self.min_confidence = params.pop('min_confidence', None)
+        self.params = params
+        self.is_valid = self._compile()
+
+    def _compile(self):
+        checks = []
+        if self.edge_types is not None:
+            edge_types = set(self.edge_types)
+            checks.append(lambda edge: get_edge_type(edge) in edge_types)
+        for key, minimum in (('weight', self.min_weight), ('confidence', self.min_confidence)):
+            if minimum is not None:
+                checks.append(lambda edge, key=key, minimum=minimum: (edge['properties'] or {}).get(key, 0) >= minimum)
+        if len(self.params) > 0:
+            checks.append(compile_filter(self.params))
+        if len(checks) == 0:
+            return _always_valid
+        if len(checks) == 1:
+            return checks[0]
+
+        def is_valid(edge):
+            for check in checks:
+                if not check(edge):
+                    return False
+            return True
+        return is_valid
+
+    def get_mask(self, csr_graph, edges):
+        """
+        :param csr_graph: the CSR view of the edges, see `storage.csr_graph.CSRGraph`
+        :param edges: the list of edges
+        :return: boolean array over the edge indexes, None if every edge is selected
+        """
+        mask = csr_graph.get_edge_mask(self.edge_types, self.min_weight, self.min_confidence)
+        if len(self.params) > 0:
+            is_valid = compile_filter(self.params)
+            valid = np.fromiter((edge is not None and is_valid(edge) for edge in edges), dtype=bool, count=len(edges))
+            mask = valid if mask is None else mask & valid
+        return mask
@@ -30,10 +30,27 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 ==============================================================================
 """
 from copy import deepcopy
-import sys, scipy.special, json, re
+from contextlib import contextmanager
+import gc, sys, scipy.special, json, re
 import numpy as np
 
 
+@contextmanager
+def gc_paused():
+    """
+    pause the garbage collection while building or serializing the nodes and edges of a whole dataset
+    they form no reference cycles, the collections triggered by allocating millions of them would only traverse the
+    growing dataset again and again
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 def is_valid_node(node_properties, params):
     """
     check if a node with node_properties satisfy the selection criteria
@@ -77,12 +94,14 @@ def is_valid_edge(edge_properties, params):
 def min_max_scaling(value, min_value, max_value, value_range=(0, 1)):
     """
     Normalize a value using min-max feature scaling in a given range.
-    :param value: A number to map to the given range.
+    :param value: A number, or a NumPy array of numbers scaled all at once, to map to the given range.
     :param min_value: Minimum of numbers in domain.
     :param max_value: Maximum of numbers in domain.
     :param value_range: Tuple defining the new range of values.
-    :return:
+    :return: The lower bound of the range if the domain is a single number.
     """
+    if max_value == min_value:
+        return value * 0 + value_range[0]
     return value_range[0] + (((value - min_value) * (value_range[1] - value_range[0])) / (max_value - min_value))
 
 
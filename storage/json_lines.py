@@ -0,0 +1,336 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import io
+import gzip
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # orjson parses several times faster than the standard library and, unlike json, caches the short keys it decodes
+    import orjson
+
+    loads = orjson.loads
+except ImportError:
+    orjson = None
+    loads = json.loads
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# bytes read from a file at once by `iter_json_lines`
+chunk_size = 1 << 22
+
+# bytes of JSON lines compressed at once by `JsonLinesWriter`
+write_chunk_size = 1 << 22
+
+gzip_magic = b'\x1f\x8b'
+zstd_magic = b'\x28\xb5\x2f\xfd'
+
+
+def dumps(record):
+    """
+    :param record: a JSON serializable object
+    :return: the object in JSON, as bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(record).encode()
+
+
+def open_json_lines(path):
+    """
+    open a JSON-lines file for reading, it is decompressed on the fly if it is a gzip or zstd file, e.g., written by
+    `JsonLinesWriter`
+    :param path: the file
+    :return: file-like object opened in binary mode, which supports `peek`
+    """
+    file = open(path, 'rb')
+    magic = file.peek(4)[:4]
+    if magic[:2] == gzip_magic:
+        file.close()
+        return gzip.open(path, 'rb')
+    if magic == zstd_magic:
+        if zstandard is None:
+            file.close()
+            raise ImportError('zstandard is required to read %s' % path)
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(file, read_across_frames=True))
+    return file
+
+
+class LoadStats:
+    """
+    throughput of loading a dataset
+    """
+
+    def __init__(self):
+        self.num_bytes = 0
+        self.num_records = 0
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+        self.parser = 'json' if orjson is None else 'orjson'
+
+    def stop(self):
+        self.seconds = time.perf_counter() - self.start
+
+    def to_dict(self):
+        """
+        :return: dictionary, in the form
+            {
+                'bytes': number of bytes parsed
+                'records': number of nodes and edges parsed
+                'seconds': time spent in loading
+                'mb_per_second': MB parsed per second
+                'records_per_second': records parsed per second
+                'parser': 'orjson' or 'json', or 'snapshot' if the dataset is opened from its snapshot
+            }
+        """
+        seconds = max(self.seconds, 1e-9)
+        return {'bytes': self.num_bytes,
+                'records': self.num_records,
+                'seconds': self.seconds,
+                'mb_per_second': self.num_bytes / (1024 * 1024) / seconds,
+                'records_per_second': self.num_records / seconds,
+                'parser': self.parser}
+
+
+def _parse_lines(lines, stats):
+    for line in lines:
+        line = line.strip()
+        if len(line) == 0:
+            continue
+        if line[:1] in (b'#', '#'):  # ignore the comments
+            continue
+        stats.num_records += 1
+        yield loads(line)
+
+
+def iter_json_lines(file, stats):
+    """
+    parse a JSON-lines file chunk by chunk, so that neither the whole file nor all the parsed records are in memory at
+    once
+    :param file: file opened in binary mode
+    :param stats: LoadStats to count the bytes and records parsed in
+    :return: generator of the records
+    """
+    remainder = b''
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        stats.num_bytes += len(chunk)
+        lines = (remainder + chunk).split(b'\n')
+        remainder = lines.pop()
+        yield from _parse_lines(lines, stats)
+    yield from _parse_lines([remainder], stats)
+
+
+def iter_json_lines_content(content, stats):
+    """
+    parse JSON-lines content, e.g., of an uploaded file, line by line
+    :param content: the content, string or bytes
+    :param stats: LoadStats to count the bytes and records parsed in
+    :return: generator of the records
+    """
+    stats.num_bytes += len(content)
+    yield from _parse_lines(io.BytesIO(content) if isinstance(content, bytes) else io.StringIO(content), stats)
+
+
+class DumpStats:
+    """
+    throughput of writing a dataset
+    """
+
+    def __init__(self, compression=None, num_threads=1):
+        self.num_bytes = 0
+        self.num_written = 0
+        self.num_records = 0
+        self.num_chunks = 0
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+        self.compression = compression
+        self.num_threads = num_threads
+
+    def stop(self):
+        self.seconds = time.perf_counter() - self.start
+
+    def to_dict(self):
+        """
+        :return: dictionary, in the form
+            {
+                'bytes': number of bytes of JSON lines written
+                'written_bytes': number of bytes written to the file, after compression
+                'records': number of records written
+                'chunks': number of compressed chunks
+                'seconds': time spent in writing
+                'mb_per_second': MB of JSON lines written per second
+                'records_per_second': records written per second
+                'compression': 'gzip', 'zstd' or None
+                'num_threads': number of compression threads
+            }
+        """
+        seconds = max(self.seconds, 1e-9)
+        return {'bytes': self.num_bytes,
+                'written_bytes': self.num_written,
+                'records': self.num_records,
+                'chunks': self.num_chunks,
+                'seconds': self.seconds,
+                'mb_per_second': self.num_bytes / (1024 * 1024) / seconds,
+                'records_per_second': self.num_records / seconds,
+                'compression': self.compression,
+                'num_threads': self.num_threads}
+
+
+class JsonLinesWriter:
+    """
+    write records as JSON lines chunk by chunk, so that the output is never in memory as a whole
+    with compression, each chunk is compressed on its own into a gzip member or a zstd frame, which concatenated are a
+    valid gzip or zstd file, and the chunks can be compressed by several threads, as zlib and zstd release the GIL
+    """
+
+    def __init__(self, file, compression=None, level=None, num_threads=1, chunk_size=write_chunk_size):
+        """
+        :param file: file opened in binary mode
+        :param compression: (optional) 'gzip' or 'zstd'
+        :param level: (optional) compression level, the default of the compression if None
+        :param num_threads: number of threads compressing the chunks
+        :param chunk_size: bytes of JSON lines in a chunk
+        """
+        if compression not in (None, 'gzip', 'zstd'):
+            raise ValueError('unknown compression: %s' % compression)
+        if compression == 'zstd' and zstandard is None:
+            raise ImportError('zstandard is required for the zstd compression')
+        self.file = file
+        self.compression = compression
+        self.level = level
+        self.chunk_size = chunk_size
+        self.num_threads = max(num_threads, 1)
+        self.lines = []
+        self.size = 0
+        # compressed chunks not written yet, at most two per thread so that the memory stays bounded
+        self.pending = deque()
+        self.executor = ThreadPoolExecutor(self.num_threads) if compression and self.num_threads > 1 else None
+        self.stats = DumpStats(compression, self.num_threads)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, record):
+        """
+        :param record: a JSON serializable object, written on a line
+        """
+        line = dumps(record) + b'\n'
+        self.lines.append(line)
+        self.size += len(line)
+        self.stats.num_records += 1
+        if self.size >= self.chunk_size:
+            self._flush_chunk()
+
+    def _compress(self, data):
+        if self.compression == 'gzip':
+            return gzip.compress(data, compresslevel=6 if self.level is None else self.level)
+        if self.compression == 'zstd':
+            # a compressor must not be used by several threads at once
+            compressor = zstandard.ZstdCompressor(level=3 if self.level is None else self.level)
+            return compressor.compress(data)
+        return data
+
+    def _write(self, data):
+        self.file.write(data)
+        self.stats.num_written += len(data)
+
+    def _flush_chunk(self):
+        if self.size == 0:
+            return
+        data = b''.join(self.lines)
+        self.lines = []
+        self.size = 0
+        self.stats.num_bytes += len(data)
+        self.stats.num_chunks += 1
+        if self.executor is None:
+            self._write(self._compress(data))
+        else:
+            self.pending.append(self.executor.submit(self._compress, data))
+            while len(self.pending) > 2 * self.num_threads:
+                self._write(self.pending.popleft().result())
+
+    def close(self):
+        """
+        write the last chunk and wait for the compression of all chunks, the file is not closed
+        """
+        try:
+            self._flush_chunk()
+            while len(self.pending) > 0:
+                self._write(self.pending.popleft().result())
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+            self.stats.stop()
+
+
+class StringPool:
+    """
+    pool of the strings repeated across the records of a dataset, e.g., node types and property keys, so that each
+    distinct string is kept in memory once
+    """
+
+    def __init__(self):
+        self.strings = {}
+        # orjson already returns the same object for equal keys it has decoded before
+        self.pool_keys = orjson is None
+
+    def get(self, value):
+        """
+        :param value: any value
+        :return: the pooled equal string if `value` is a string, `value` itself otherwise
+        """
+        if type(value) is str:
+            return self.strings.setdefault(value, value)
+        return value
+
+    def get_properties(self, properties):
+        """
+        :param properties: dictionary of properties
+        :return: the properties, with pooled keys and pooled 'type'
+        """
+        if self.pool_keys:
+            properties = dict([(self.strings.setdefault(key, key), value) for key, value in properties.items()])
+        if 'type' in properties:
+            properties['type'] = self.get(properties['type'])
+        return properties
@@ -0,0 +1,232 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+from bisect import bisect_left, insort
+from storage import helpers
+
+
+def get_trigrams(text):
+    """
+    :param text: lower case text
+    :return: set of the substrings of length 3 of the text
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NodeIndex:
+    """
+    secondary indexes of the nodes of a dataset, used by `BuiltinDataset.search_nodes` instead of scanning all nodes
+    - a hash index for each of the selected property keys, and `type`, mapping a value to the nodes having it
+    - a text index of the node ids and the values of the selected text keys, by prefix and by trigrams
+    the index is built on the first search, kept up to date by the dataset methods changing nodes, and built again if
+    the number of nodes no longer matches, i.e., nodes were added or deleted directly
+    """
+
+    def __init__(self, keys=None, text_keys=None):
+        """
+        :param keys: (optional) list of property keys to index, `type` is always indexed
+        :param text_keys: (optional) list of property keys whose text values are indexed for text search, ['name'] if
+            not given
+        """
+        self.keys = ['type'] + [key for key in (keys or []) if key != 'type']
+        self.text_keys = list(text_keys) if text_keys is not None else ['name']
+        self.clear()
+
+    def clear(self):
+        self.built = False
+        self.num_nodes = 0
+        self.postings = {key: {} for key in self.keys}  # key -> {value: {node: None}}, ordered sets of nodes
+        self.texts = {}  # lower case text -> {node: None}
+        self.sorted_texts = []  # texts in increasing order, for prefix search
+        self.trigrams = None  # trigram -> set of texts containing it, built on the first search by trigrams
+
+    def build(self, nodes):
+        """
+        :param nodes: dictionary of node id -> properties of the dataset
+        """
+        self.clear()
+        with helpers.gc_paused():
+            for node, properties in nodes.items():
+                self._insert(node, properties, sort=False)
+        self.sorted_texts = sorted(self.texts)
+        self.num_nodes = len(nodes)
+        self.built = True
+
+    def _build_trigrams(self):
+        trigrams = {}
+        for text in self.texts:
+            for i in range(len(text) - 2):
+                trigram = text[i:i + 3]
+                if trigram in trigrams:
+                    trigrams[trigram].add(text)
+                else:
+                    trigrams[trigram] = {text}
+        self.trigrams = trigrams
+
+    def _get_texts(self, node, properties):
+        texts = set()
+        if isinstance(node, str):
+            texts.add(node.lower())
+        for key in self.text_keys:
+            value = properties.get(key)
+            if isinstance(value, str):
+                texts.add(value.lower())
+        return texts
+
+    def _insert(self, node, properties, sort=True):
+        """
+        :param sort: False to only add the new texts to `texts`, when building the index
+        """
+        if properties is None:
+            properties = {}
+        for key in self.keys:
+            value = properties.get(key)
+            if value is None:
+                continue
+            try:
+                self.postings[key].setdefault(value, {})[node] = None
+            except TypeError:
+                # values that are not hashable, e.g., lists, are not indexed
+                pass
+        for text in self._get_texts(node, properties):
+            if text not in self.texts:
+                self.texts[text] = {}
+                if sort:
+                    insort(self.sorted_texts, text)
+                if self.trigrams is not None:
+                    for trigram in get_trigrams(text):
+                        self.trigrams.setdefault(trigram, set()).add(text)
+            self.texts[text][node] = None
+
+    def _discard(self, node, properties):
+        if properties is None:
+            properties = {}
+        for key in self.keys:
+            value = properties.get(key)
+            if value is None:
+                continue
+            try:
+                nodes = self.postings[key].get(value)
+            except TypeError:
+                continue
+            if nodes is not None:
+                nodes.pop(node, None)
+                if len(nodes) == 0:
+                    del self.postings[key][value]
+        for text in self._get_texts(node, properties):
+            nodes = self.texts.get(text)
+            if nodes is None:
+                continue
+            nodes.pop(node, None)
+            if len(nodes) == 0:
+                del self.texts[text]
+                del self.sorted_texts[bisect_left(self.sorted_texts, text)]
+                if self.trigrams is not None:
+                    for trigram in get_trigrams(text):
+                        self.trigrams[trigram].discard(text)
+                        if len(self.trigrams[trigram]) == 0:
+                            del self.trigrams[trigram]
+
+    def add(self, node, properties):
+        """
+        index a node added to the dataset
+        """
+        if self.built:
+            self._insert(node, properties)
+            self.num_nodes += 1
+
+    def remove(self, node, properties):
+        """
+        remove a node deleted from the dataset
+        """
+        if self.built:
+            self._discard(node, properties)
+            self.num_nodes -= 1
+
+    def update(self, node, pre_properties, properties):
+        """
+        index the new properties of a node
+        """
+        if self.built:
+            self._discard(node, pre_properties)
+            self._insert(node, properties)
+
+    def _find_texts(self, text, prefix):
+        """
+        :return: list of the indexed texts starting with, or containing, the lower case text
+        """
+        if prefix:
+            found = []
+            for i in range(bisect_left(self.sorted_texts, text), len(self.sorted_texts)):
+                if not self.sorted_texts[i].startswith(text):
+                    break
+                found.append(self.sorted_texts[i])
+            return found
+        if len(text) < 3:
+            return [t for t in self.texts if text in t]
+        if self.trigrams is None:
+            self._build_trigrams()
+        postings = sorted([self.trigrams.get(trigram, set()) for trigram in get_trigrams(text)], key=len)
+        candidates = set.intersection(*postings) if len(postings[0]) > 0 else set()
+        return [t for t in candidates if text in t]
+
+    def select(self, nodes, params=None, text=None, prefix=False):
+        """
+        find the candidate nodes for a search with the most selective indexes, the candidates are to be checked
+        against the params
+        :param nodes: dictionary of node id -> properties of the dataset
+        :param params: dictionary of property values to match
+        :param text: (optional) text to find, case insensitively, in the node ids and the values of the text keys
+        :param prefix: True if the node id or a text value should start with the text, else contain it
+        :return: list of the candidate node ids, or None if no index applies to the search
+        """
+        indexed = []
+        for key, value in (params or {}).items():
+            if key not in self.postings:
+                continue
+            try:
+                hash(value)
+            except TypeError:
+                continue
+            indexed.append((key, value))
+        if len(indexed) == 0 and text is None:
+            return None
+        if not self.built or self.num_nodes != len(nodes):
+            self.build(nodes)
+        postings = [self.postings[key].get(value, {}) for key, value in indexed]
+        if text is not None:
+            text_nodes = {}
+            for t in self._find_texts(text.lower(), prefix):
+                text_nodes.update(self.texts[t])
+            postings.append(text_nodes)
+        # start from the most selective index and intersect the others
+        postings.sort(key=len)
+        return [node for node in postings[0] if all(node in others for others in postings[1:])]
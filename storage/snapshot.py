@@ -0,0 +1,391 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import json
+import shutil
+import hashlib
+import itertools
+import tempfile
+import numpy as np
+
+# version of the snapshot layout, a snapshot of another version is regenerated
+format_version = 1
+
+# a string column whose distinct values are at most this fraction of its values, e.g., 'type', is stored as codes
+# into a table of the distinct values
+category_ratio = 0.25
+
+
+def get_snapshot_path(path_2_data):
+    """
+    :param path_2_data: JSON dataset file
+    :return: directory of the snapshot of the dataset, next to the file
+    """
+    return '%s.snapshot' % path_2_data
+
+
+def get_file_hash(path):
+    """
+    :param path: a file
+    :return: sha256 hex digest of the content of the file
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 22), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _get_source_info(path_2_data):
+    status = os.stat(path_2_data)
+    return {'path': os.path.abspath(path_2_data), 'size': status.st_size, 'mtime_ns': status.st_mtime_ns}
+
+
+def read_manifest(snapshot_path):
+    """
+    :param snapshot_path: directory of a snapshot
+    :return: the manifest of the snapshot, or None if there is no readable snapshot
+    """
+    try:
+        with open(os.path.join(snapshot_path, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format_version') != format_version:
+        return None
+    return manifest
+
+
+def is_up_to_date(path_2_data, snapshot_path):
+    """
+    check if the snapshot is of the current content of the dataset file
+    the content hash is computed only if the size or the modification time of the file changed, and the manifest is
+    updated if the content turns out to be the same
+    :param path_2_data: JSON dataset file
+    :param snapshot_path: directory of the snapshot
+    :return: True if the snapshot can be opened instead of parsing the file
+    """
+    manifest = read_manifest(snapshot_path)
+    if manifest is None:
+        return False
+    source = _get_source_info(path_2_data)
+    if source['size'] == manifest['source']['size'] and source['mtime_ns'] == manifest['source']['mtime_ns']:
+        return True
+    if source['size'] != manifest['source']['size'] or get_file_hash(path_2_data) != manifest['source']['sha256']:
+        return False
+    manifest['source'].update(source)
+    try:
+        _write_json(os.path.join(snapshot_path, 'manifest.json'), manifest)
+    except OSError:
+        pass
+    return True
+
+
+def _write_json(path, content):
+    temp_path = '%s.tmp' % path
+    with open(temp_path, 'w') as f:
+        json.dump(content, f)
+    os.replace(temp_path, path)
+
+
+def _load_array(path):
+    """
+    memory-map a .npy file, numpy cannot map an empty one
+    """
+    try:
+        return np.load(path, mmap_mode='r')
+    except ValueError:
+        return np.load(path)
+
+
+def _save_strings(directory, name, strings):
+    """
+    save strings as one UTF-8 text and the offsets of the strings in it, in characters
+    """
+    lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    np.save(os.path.join(directory, '%s.offsets.npy' % name), offsets)
+    np.save(os.path.join(directory, '%s.text.npy' % name),
+            np.frombuffer(''.join(strings).encode('utf-8'), dtype=np.uint8))
+
+
+def _load_strings(directory, name):
+    offsets = _load_array(os.path.join(directory, '%s.offsets.npy' % name)).tolist()
+    text = _load_array(os.path.join(directory, '%s.text.npy' % name))
+    text = memoryview(text).tobytes().decode('utf-8') if len(text) > 0 else ''
+    return [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def _get_kind(values):
+    kinds = set(map(type, values))
+    if len(kinds) == 1:
+        kind = kinds.pop()
+        if kind is bool:
+            return 'bool'
+        if kind is float:
+            return 'float'
+        if kind is int and -2 ** 63 <= min(values) and max(values) < 2 ** 63:
+            return 'int'
+        if kind is str:
+            return 'category' if len(set(values)) <= category_ratio * len(values) else 'str'
+    return 'json'
+
+
+def _save_column(directory, name, positions, values):
+    """
+    save the values of a property present in the records at `positions`, or in all records if `positions` is None
+    :return: kind of the column, 'bool', 'int', 'float', 'str', 'category' or, for any other values, 'json'
+    """
+    if positions is not None:
+        np.save(os.path.join(directory, '%s.positions.npy' % name), np.asarray(positions, dtype=np.int64))
+    kind = _get_kind(values)
+    if kind in ('bool', 'int', 'float'):
+        np.save(os.path.join(directory, '%s.values.npy' % name),
+                np.asarray(values, dtype={'bool': np.bool_, 'int': np.int64, 'float': np.float64}[kind]))
+    elif kind == 'category':
+        categories = {}
+        codes = np.fromiter((categories.setdefault(v, len(categories)) for v in values), dtype=np.int32,
+                            count=len(values))
+        np.save(os.path.join(directory, '%s.codes.npy' % name), codes)
+        _save_strings(directory, '%s.categories' % name, list(categories))
+    elif kind == 'str':
+        _save_strings(directory, '%s.values' % name, values)
+    else:
+        _save_strings(directory, '%s.values' % name, [json.dumps(v) for v in values])
+    return kind
+
+
+def _load_column(directory, name, kind, dense=True):
+    """
+    :return: positions of the records the property is present in, None if it is in all records, and the values of
+        the property
+    """
+    positions = None
+    if not dense:
+        positions = _load_array(os.path.join(directory, '%s.positions.npy' % name)).tolist()
+    if kind in ('bool', 'int', 'float'):
+        values = _load_array(os.path.join(directory, '%s.values.npy' % name)).tolist()
+    elif kind == 'category':
+        categories = _load_strings(directory, '%s.categories' % name)
+        codes = _load_array(os.path.join(directory, '%s.codes.npy' % name)).tolist()
+        values = [categories[c] for c in codes]
+    elif kind == 'str':
+        values = _load_strings(directory, '%s.values' % name)
+    else:
+        values = [json.loads(v) for v in _load_strings(directory, '%s.values' % name)]
+    return positions, values
+
+
+def _save_records(directory, table, records, excluded_keys=()):
+    """
+    save the dictionaries of a table (node properties, edge properties, ...) column by column
+    :param excluded_keys: keys of the dictionaries not to save
+    :return: list of the columns, each is {'key': property key, 'kind': kind of the column, 'dense': True if the
+        property is in all records}
+    """
+    records = list(records)
+    missing = object()
+    saved = []
+    # keys in order of first appearance
+    keys = [key for key in dict.fromkeys(itertools.chain.from_iterable(records)) if key not in excluded_keys]
+    for c, key in enumerate(keys):
+        values = [record.get(key, missing) for record in records]
+        positions = None
+        if missing in values:
+            positions = [i for i in range(len(values)) if values[i] is not missing]
+            values = [values[i] for i in positions]
+        kind = _save_column(directory, '%s.%d' % (table, c), positions, values)
+        saved.append({'key': key, 'kind': kind, 'dense': positions is None})
+    return saved
+
+
+def _load_records(directory, table, columns, records):
+    """
+    add the columns of a table to the dictionaries of its records
+    """
+    for c, column in enumerate(columns):
+        key = column['key']
+        positions, values = _load_column(directory, '%s.%d' % (table, c), column['kind'], column['dense'])
+        if positions is None:
+            for record, value in zip(records, values):
+                record[key] = value
+        else:
+            for i, value in zip(positions, values):
+                records[i][key] = value
+    return records
+
+
+def _save_adjacency(directory, name, codes, num_nodes):
+    """
+    save the adjacency of edges grouped by one end node in CSR layout: the indexes of the edges of the node with code
+    c are indices[indptr[c]:indptr[c + 1]]
+    """
+    indices = np.argsort(codes, kind='stable').astype(np.int64)
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=num_nodes), out=indptr[1:])
+    np.save(os.path.join(directory, '%s.indptr.npy' % name), indptr)
+    np.save(os.path.join(directory, '%s.indices.npy' % name), indices)
+
+
+def _load_adjacency(directory, name, node_ids):
+    indptr = _load_array(os.path.join(directory, '%s.indptr.npy' % name))
+    indices = _load_array(os.path.join(directory, '%s.indices.npy' % name)).tolist()
+    adj_list = {}
+    bounds = indptr.tolist()
+    for c in np.flatnonzero(np.diff(indptr)).tolist():
+        adj_list[node_ids[c]] = indices[bounds[c]:bounds[c + 1]]
+    return adj_list
+
+
+def write_snapshot(dataset, path_2_data, snapshot_path):
+    """
+    write a snapshot of a dataset loaded from a JSON file, it replaces the previous snapshot at once so that readers
+    never see a partial snapshot
+    the snapshot is a directory of .npy files, which are memory-mapped when the snapshot is opened:
+        node_ids: table of node ids, the nodes of the dataset first, then the other end nodes of edges
+        edges.source, edges.target: codes of the end nodes of edges in the node id table
+        out, in: CSR adjacency of edges by source and by target
+        nodes.<i>, edges.<i>, edge_fields.<i>: property columns of the nodes, of the edges and the other fields of the
+            edges, 'type' and other repeated strings are stored as codes into a table of their distinct values
+        manifest.json: source file, its size, modification time and content hash, and the columns
+    :param dataset: BuiltinDataset
+    :param path_2_data: the JSON file the dataset is loaded from
+    :param snapshot_path: directory to write the snapshot to
+    """
+    source = _get_source_info(path_2_data)
+    source['sha256'] = get_file_hash(path_2_data)
+    parent = os.path.dirname(os.path.abspath(snapshot_path))
+    directory = tempfile.mkdtemp(prefix='.snapshot-', dir=parent)
+    try:
+        edges = dataset.edges
+        # the nodes of the dataset first, then the other end nodes of edges in order of appearance
+        node_ids = list(dict.fromkeys(itertools.chain(dataset.nodes, [edge['source'] for edge in edges],
+                                                      [edge['target'] for edge in edges])))
+        codes = dict(zip(node_ids, range(len(node_ids))))
+        num_edges = len(edges)
+        sources = np.fromiter((codes[edge['source']] for edge in edges), dtype=np.int64, count=num_edges)
+        targets = np.fromiter((codes[edge['target']] for edge in edges), dtype=np.int64, count=num_edges)
+        np.save(os.path.join(directory, 'edges.source.npy'), sources)
+        np.save(os.path.join(directory, 'edges.target.npy'), targets)
+        _save_adjacency(directory, 'out', sources, len(node_ids))
+        _save_adjacency(directory, 'in', targets, len(node_ids))
+        manifest = {
+            'format_version': format_version,
+            'source': source,
+            'num_nodes': len(dataset.nodes),
+            'num_edges': num_edges,
+            'meta_info': dataset.meta_info,
+            # counted per record of the file, duplicated nodes included
+            'node_types': list(dataset.node_types.items()),
+            'edge_types': list(dataset.edge_types.items()),
+            'node_id_kind': _save_column(directory, 'node_ids', None, node_ids),
+            'columns': {
+                'nodes': _save_records(directory, 'nodes', dataset.nodes.values()),
+                'edges': _save_records(directory, 'edges', [edge['properties'] for edge in edges]),
+                'edge_fields': _save_records(directory, 'edge_fields', edges, ('source', 'target', 'properties'))
+            }
+        }
+        _write_json(os.path.join(directory, 'manifest.json'), manifest)
+        _replace_directory(directory, snapshot_path)
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+
+
+def _replace_directory(directory, path):
+    """
+    move a directory to a path, the previous directory at the path is renamed aside first and removed only after the
+    new one is in place, a reader may find no directory at the path for a moment, or find the new one while it reads,
+    see `read_snapshot`
+    """
+    old_directory = None
+    if os.path.isdir(path):
+        old_directory = '%s.old' % directory
+        os.rename(path, old_directory)
+    try:
+        os.rename(directory, path)
+    except OSError:
+        if old_directory is not None:
+            os.rename(old_directory, path)
+        raise
+    if old_directory is not None:
+        shutil.rmtree(old_directory, ignore_errors=True)
+
+
+def read_snapshot(dataset, snapshot_path):
+    """
+    load the nodes, edges and adjacency lists of a dataset from its snapshot
+    the snapshot may be replaced by another process while it is read, see `write_snapshot`, an OSError is raised then
+    and the dataset is left partially loaded
+    :param dataset: BuiltinDataset, with no nodes or edges yet
+    :param snapshot_path: directory of the snapshot
+    :return: the manifest of the snapshot
+    """
+    manifest = read_manifest(snapshot_path)
+    if manifest is None:
+        raise FileNotFoundError('no snapshot at %s' % snapshot_path)
+    try:
+        _read_snapshot(dataset, snapshot_path, manifest)
+    except (IndexError, KeyError, ValueError) as e:
+        # files of the previous and of the new snapshot are mixed
+        raise OSError('snapshot %s was replaced while it was read: %s' % (snapshot_path, e))
+    if read_manifest(snapshot_path) != manifest:
+        raise OSError('snapshot %s was replaced while it was read' % snapshot_path)
+    return manifest
+
+
+def _read_snapshot(dataset, snapshot_path, manifest):
+    """
+    load the columns listed in the manifest into the dataset
+    """
+    _, node_ids = _load_column(snapshot_path, 'node_ids', manifest['node_id_kind'])
+    columns = manifest['columns']
+    num_nodes = manifest['num_nodes']
+    num_edges = manifest['num_edges']
+
+    node_properties = _load_records(snapshot_path, 'nodes', columns['nodes'], [{} for _ in range(num_nodes)])
+    dataset.nodes = dict(zip(node_ids[:num_nodes], node_properties))
+
+    sources = _load_array(os.path.join(snapshot_path, 'edges.source.npy')).tolist()
+    targets = _load_array(os.path.join(snapshot_path, 'edges.target.npy')).tolist()
+    edges = [{'source': node_ids[s], 'target': node_ids[t]} for s, t in zip(sources, targets)]
+    _load_records(snapshot_path, 'edge_fields', columns['edge_fields'], edges)
+    edge_properties = _load_records(snapshot_path, 'edges', columns['edges'], [{} for _ in range(num_edges)])
+    for edge, properties in zip(edges, edge_properties):
+        edge['properties'] = properties
+    dataset.edges = edges
+    dataset.node_types = dict([(t, n) for t, n in manifest['node_types']])
+    dataset.edge_types = dict([(t, n) for t, n in manifest['edge_types']])
+    dataset.adj_list = _load_adjacency(snapshot_path, 'out', node_ids)
+    dataset.in_adj_list = _load_adjacency(snapshot_path, 'in', node_ids)
+    dataset.meta_info = manifest['meta_info']
@@ -0,0 +1,159 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import datetime
+from numbers import Number
+import numpy as np
+
+default_time_key = 'timestamp'  # property of the edges holding their time
+
+
+def to_time(value):
+    """
+    :param value: a number, an ISO 8601 string, e.g., "2020-01-29 00:00:00", a datetime or a date, naive ones are in
+        UTC
+    :return: the value in seconds since the epoch, nan if it is not a time
+    """
+    if isinstance(value, bool):
+        return np.nan
+    if isinstance(value, Number):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value.strip())
+        except ValueError:
+            return np.nan
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.timestamp()
+    return np.nan
+
+
+def to_duration(value):
+    """
+    :param value: a number of seconds or a timedelta
+    :return: the number of seconds
+    """
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+class TemporalIndex:
+    """
+    the edges of a dataset sorted by the time in one of their properties, the edges of a time range are a slice of the
+    sorted edge indexes, found by binary search
+    the edges without the property, or whose property is not a time, see `to_time`, are not indexed
+    the index is a copy, it is built again when the dataset changes, see `is_stale`
+    """
+
+    def __init__(self, edges, time_key=default_time_key):
+        """
+        :param edges: list of edges, None for a deleted edge
+        :param time_key: property of the edges holding their time
+        """
+        self.edges = edges
+        self.num_edges = len(edges)
+        self.time_key = time_key
+        times = np.fromiter((to_time((edge['properties'] or {}).get(time_key)) if edge is not None else np.nan
+                             for edge in edges), dtype=np.float64, count=len(edges))
+        e_indexes = np.flatnonzero(~np.isnan(times))
+        order = np.argsort(times[e_indexes], kind='stable')
+        self.e_indexes = e_indexes[order]  # indexes of the timed edges, in increasing time
+        self.times = times[self.e_indexes]  # their times
+
+    def __len__(self):
+        return len(self.e_indexes)
+
+    def is_stale(self, edges):
+        """
+        :return: True if the index is not of this edge list, or it was resized
+        """
+        return edges is not self.edges or len(edges) != self.num_edges
+
+    def get_bounds(self):
+        """
+        :return: the first and the last time, None if no edge is timed
+        """
+        if len(self.times) == 0:
+            return None
+        return float(self.times[0]), float(self.times[-1])
+
+    def _get_slice(self, start, end):
+        lo = 0 if start is None else int(np.searchsorted(self.times, to_time(start), side='left'))
+        hi = len(self.times) if end is None else int(np.searchsorted(self.times, to_time(end), side='left'))
+        return lo, max(lo, hi)
+
+    def get_edge_indexes(self, start=None, end=None):
+        """
+        :param start: (optional) first time of the range, included, from the first edge if None
+        :param end: (optional) end of the range, excluded, to the last edge if None
+        :return: array of the indexes of the edges in the range, in increasing time, a view of the index
+        """
+        lo, hi = self._get_slice(start, end)
+        return self.e_indexes[lo:hi]
+
+    def get_mask(self, start=None, end=None):
+        """
+        :return: boolean array over the edge indexes, True for the edges in the range, see `get_edge_indexes`
+        """
+        mask = np.zeros(self.num_edges, dtype=bool)
+        mask[self.get_edge_indexes(start, end)] = True
+        return mask
+
+    def iter_windows(self, width, step=None, start=None, end=None):
+        """
+        slide a window over the times of the edges
+        :param width: length of a window, in seconds or as a timedelta
+        :param step: (optional) shift between windows, in seconds or as a timedelta, the width if None, i.e.,
+            consecutive windows do not overlap
+        :param start: (optional) start of the first window, the first time if None
+        :param end: (optional) no window starts at or after end, the last time if None
+        :return: generator of (window start, window end, array of the indexes of the edges in the window), the arrays
+            are views of the index, so a window costs two binary searches whatever its number of edges
+        """
+        width = to_duration(width)
+        step = width if step is None else to_duration(step)
+        if width <= 0 or step <= 0:
+            raise ValueError('the width and the step of the windows must be positive')
+        bounds = self.get_bounds()
+        if bounds is None and (start is None or end is None):
+            return
+        window_start = bounds[0] if start is None else to_time(start)
+        last = bounds[1] if end is None else to_time(end)
+        while window_start <= last if end is None else window_start < last:
+            window_end = window_start + width
+            lo, hi = self._get_slice(window_start, window_end)
+            yield window_start, window_end, self.e_indexes[lo:hi]
+            window_start += step
@@ -0,0 +1,144 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+from collections import Counter
+from numbers import Number
+
+
+def get_weight(edge):
+    """
+    :param edge: edge dictionary, None for a deleted edge
+    :return: weight of the edge, None if it has no numeric weight
+    """
+    if edge is None or not edge.get('properties'):
+        return None
+    weight = edge['properties'].get('weight')
+    if isinstance(weight, bool) or not isinstance(weight, Number):
+        return None
+    return weight
+
+
+class WeightStats:
+    """
+    range of the weights of the edges of a dataset, kept with the number of edges of each weight, so that counting an
+    added or removed edge is O(1), and the range is searched again among the distinct weights only when the last edge
+    of the smallest or largest weight is removed
+    the counts are built on the first query and cover the first `num_edges` edges of the dataset, they are built again
+    if the dataset has another edge list, or another number of edges
+    """
+
+    def __init__(self, dataset):
+        """
+        :param dataset: the BuiltinDataset, its edges are read to build the counts
+        """
+        self.dataset = dataset
+        self.clear()
+
+    def clear(self):
+        self.counts = None  # weight -> number of edges, None if not built
+        self.min_weight = None
+        self.max_weight = None
+        self.num_edges = None
+        self.edges = None  # the edge list the counts are of
+
+    def build(self):
+        # count the values of the property first, then drop those that are not weights, there are much fewer values
+        try:
+            counts = Counter([(edge['properties'] or {}).get('weight') for edge in self.dataset.edges
+                              if edge is not None])
+        except TypeError:  # an unhashable value
+            counts = Counter([get_weight(edge) for edge in self.dataset.edges])
+        self.counts = dict([(weight, count) for weight, count in counts.items()
+                            if get_weight({'properties': {'weight': weight}}) is not None])
+        self._find_range()
+        self.edges = self.dataset.edges
+        self.num_edges = len(self.dataset.edges)
+
+    def _find_range(self):
+        if len(self.counts) == 0:
+            self.min_weight = self.max_weight = None
+        else:
+            self.min_weight = min(self.counts)
+            self.max_weight = max(self.counts)
+
+    def _add_weight(self, weight):
+        if weight is None:
+            return
+        self.counts[weight] = self.counts.get(weight, 0) + 1
+        if self.min_weight is None or weight < self.min_weight:
+            self.min_weight = weight
+        if self.max_weight is None or weight > self.max_weight:
+            self.max_weight = weight
+
+    def _remove_weight(self, weight):
+        if weight is None or weight not in self.counts:
+            return
+        self.counts[weight] -= 1
+        if self.counts[weight] == 0:
+            del self.counts[weight]
+            if weight == self.min_weight or weight == self.max_weight:
+                self._find_range()
+
+    def add(self, e_index, edge):
+        """
+        count an edge, added or put back at e_index
+        """
+        if self.counts is None:
+            return
+        self._add_weight(get_weight(edge))
+        self.num_edges = max(self.num_edges, e_index + 1)
+
+    def remove(self, edge):
+        """
+        stop counting a deleted edge
+        """
+        if self.counts is not None:
+            self._remove_weight(get_weight(edge))
+
+    def update(self, edge, pre_weight):
+        """
+        count an edge again after a change of its properties
+        :param edge: the edge
+        :param pre_weight: weight of the edge before the change, see `get_weight`
+        """
+        if self.counts is not None:
+            self._remove_weight(pre_weight)
+            self._add_weight(get_weight(edge))
+
+    def get_range(self):
+        """
+        :return: (smallest weight, largest weight) of the edges, None if no edge has a weight
+        """
+        if self.counts is None or self.edges is not self.dataset.edges or self.num_edges != len(self.dataset.edges):
+            self.build()
+        if self.min_weight is None:
+            return None
+        return self.min_weight, self.max_weight
@@ -0,0 +1,102 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+import json
+import subprocess
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+# heavyweight packages whose presence in sys.modules is reported
+heavy_modules = ['tensorflow', 'gensim', 'sklearn', 'pandas', 'scipy']
+
+# script run in a fresh interpreter for each measurement, so that nothing is imported in advance
+probe = '''
+import sys, time, json, resource
+sys.path.insert(0, %(root)r)
+start = time.time()
+from analyzer import request_taker
+import_time = time.time() - start
+start = time.time()
+if %(stage)r != 'import':
+    request_taker.get_info()
+if %(stage)r == 'dispatch':
+    network = {'edges': [{'source': i, 'target': (i + 1) %% 50, 'properties': {}} for i in range(50)]}
+    request_taker.InMemoryAnalyzer().perform_analysis(
+        {'task_id': 'node_embedding', 'network': network,
+         'options': {'method': 'nmf', 'parameters': {'K': 4}}}, params=None)
+stage_time = time.time() - start
+rss = 0
+with open('/proc/self/status') as f:
+    for line in f:
+        if line.startswith('VmRSS:'):
+            rss = int(line.split()[1]) / 1024
+print(json.dumps({'import_time': import_time, 'stage_time': stage_time, 'rss_mb': rss,
+                  'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'heavy_modules': [m for m in %(heavy)r if m in sys.modules]}))
+'''
+
+
+def measure(stage, repeat=5):
+    """
+    measure the start-up of the analyzer in fresh interpreters
+    :param stage: 'import' to only import analyzer.request_taker, 'info' to also call get_info(),
+            'dispatch' to also perform a small node embedding task
+    :param repeat: number of interpreters to start, the median time is reported
+    :return: dictionary of the measurements
+    """
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', probe % {'root': path2root, 'stage': stage,
+                                                                  'heavy': heavy_modules}],
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().split('\n')[-1]))
+    runs.sort(key=lambda r: r['import_time'] + r['stage_time'])
+    return runs[len(runs) // 2]
+
+
+def benchmark_analyzer_startup():
+    for stage in ['import', 'info', 'dispatch']:
+        result = measure(stage)
+        print('%-8s import = %.3fs, stage = %.3fs, idle RSS = %.1f MB, peak RSS = %.1f MB, loaded = %s' % (
+            stage, result['import_time'], result['stage_time'], result['rss_mb'], result['peak_rss_mb'],
+            ', '.join(result['heavy_modules']) or '-'))
+
+
+if __name__ == '__main__':
+    benchmark_analyzer_startup()
@@ -0,0 +1,158 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+import base64
+import json
+import tempfile
+from storage.builtin_datasets import ActiveNetwork, BuiltinDatasetsManager
+
+path_2_data = '%s/datasets/preprocessed/moreno_crime.json' % path2root
+
+
+def _load_active_network():
+    manager = BuiltinDatasetsManager(None, None)
+    manager.add_dataset('moreno_crime', 'Moreno Crime', path_2_data)
+    dataset = manager.datasets['moreno_crime']['data']
+    selected_nodes = list(dataset.nodes)[:40]
+    return manager.load_active_network(network_id='moreno_crime', node_ids=selected_nodes,
+                                       initialize=True)['active_network']
+
+
+def _add_predicted_edge(network, source, target):
+    data = {'element_type': 'edge', 'id': '{}_{}'.format(source, target), 'source': source, 'target': target,
+            'type': 'predicted', 'predicted': True, 'selected': False, 'info': {'type': 'predicted'}}
+    network.elements.append({'group': 'edges', 'data': data})
+    network.predicted_edges.setdefault(source, []).append(len(network.elements) - 1)
+
+
+def _check_elements(network):
+    num_predicted = sum([len(indexes) for indexes in network.predicted_edges.values()])
+    assert len(network.elements) == len(network.active_nodes) + len(network.active_edges) + num_predicted
+    for node, info in network.active_nodes.items():
+        assert network.elements[info['element_index']]['data']['id'] == node
+    for e_index, info in network.active_edges.items():
+        data = network.elements[info['element_index']]['data']
+        assert data['id'] == e_index
+        assert data['source'] in network.active_nodes and data['target'] in network.active_nodes
+    for source, indexes in network.predicted_edges.items():
+        assert all([network.elements[i]['data']['source'] == source for i in indexes])
+
+
+def test_deactivate_nodes():
+    network = _load_active_network()
+    _check_elements(network)
+    nodes = list(network.active_nodes)
+    removed = set(nodes[::3])
+    kept_edges = set([e for e in network.active_edges if network.edges[e]['source'] not in removed and
+                      network.edges[e]['target'] not in removed])
+    assert network.deactivate_nodes(list(removed))['success'] == 1
+    assert set(network.active_nodes) == set(nodes) - removed
+    assert set(network.active_edges) == kept_edges
+    _check_elements(network)
+
+
+def test_deactivate_edges():
+    network = _load_active_network()
+    edges = list(network.active_edges)
+    removed = edges[::2]
+    assert network.deactivate_edges(removed)['success'] == 1
+    assert set(network.active_edges) == set(edges) - set(removed)
+    _check_elements(network)
+
+
+def test_remove_predicted_edges():
+    network = _load_active_network()
+    nodes = list(network.active_nodes)
+    for target in nodes[1:4]:
+        _add_predicted_edge(network, nodes[0], target)
+    for target in nodes[2:4]:
+        _add_predicted_edge(network, nodes[1], target)
+    _check_elements(network)
+    # the predicted edges of the second node are the last elements, they take the places of the removed ones
+    network.remove_element([network.active_edges[e]['element_index'] for e in list(network.active_edges)[:2]])
+    _check_elements(network)
+    network.remove_predicted_edges([nodes[0]])
+    assert nodes[0] not in network.predicted_edges
+    assert len(network.predicted_edges[nodes[1]]) == 2
+    _check_elements(network)
+
+
+def test_dump():
+    network = _load_active_network()
+    network.deactivate_nodes(list(network.active_nodes)[:5])
+    with tempfile.TemporaryDirectory() as output_dir:
+        assert network.dump_network('network.json', output_dir) == 1
+        loaded = ActiveNetwork(path_2_data=None, from_file=False, initialize=False)
+        loaded.load_from_file(os.path.join(output_dir, 'network.json'))
+    assert loaded.elements == network.elements
+    _check_elements(loaded)
+
+
+
+def _get_upload(edges):
+    # content of an uploaded JSON-lines network, as given by the upload component
+    nodes = sorted(set([u for edge in edges for u in edge]))
+    lines = [{'type': 'node', 'id': u, 'properties': {'type': 'person', 'name': u}} for u in nodes]
+    lines += [{'type': 'edge', 'source': source, 'target': target, 'properties': {'type': 'call', 'weight': weight}}
+              for (source, target), weight in edges.items()]
+    content = '\n'.join([json.dumps(line) for line in lines])
+    return 'data:application/octet-stream;base64,' + base64.b64encode(content.encode('utf-8')).decode('utf-8')
+
+
+def test_deactivate_nodes_after_upload():
+    network = ActiveNetwork(path_2_data=None, from_file=False, initialize=False)
+    network.deserialize_network(_get_upload({('a', 'b'): 1, ('c', 'b'): 2}))
+    # a second upload replaces the first network
+    network.deserialize_network(_get_upload({('b', 'c'): 1, ('d', 'e'): 2}))
+    assert set(network.active_edges) == {0, 1}
+    network.deactivate_nodes(['b'])
+    assert set(network.active_edges) == {1}
+    assert set(network.active_nodes) == {'c', 'd', 'e'}
+    _check_elements(network)
+
+
+if __name__ == '__main__':
+    test_deactivate_nodes()
+    test_deactivate_edges()
+    test_remove_predicted_edges()
+    test_dump()
+    test_deactivate_nodes_after_upload()
@@ -0,0 +1,117 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from storage.builtin_datasets import BuiltinDatasetsManager
+from analyzer.request_taker import InMemoryAnalyzer
+
+
+def test_perform_batch():
+    connector = None  # no connection needed for this file-base datasets
+    params = None  # no parameter defined for now
+    data_manager = BuiltinDatasetsManager(connector, params)
+    data_manager.add_dataset('moreno_crime', 'Moreno Crime Network',
+                             '%s/datasets/preprocessed/moreno_crime.json' % path2root)
+    network = data_manager.get_network(network='moreno_crime')
+
+    tasks = [({"task_id": "social_influence_analysis",
+               "options": {"method": "pagerank", "parameters": {}}}, None),
+             ({"task_id": "community_detection",
+               "options": {"method": "modularity", "parameters": {}}}, None),
+             ({"task_id": "link_prediction",
+               "options": {"method": "jaccard_coefficient", "parameters": {}}}, None),
+             ({"task_id": "node_embedding",
+               "options": {"method": "svd", "parameters": {"K": 8}}}, None)]
+
+    analyzer = InMemoryAnalyzer()
+    result = analyzer.perform_batch(network, tasks)
+    print('message = ', result['message'])
+    print('timings = ', result['timings'])
+    print('conversion = ', result['conversion'])
+    assert result['success'] == 1
+    assert len(result['results']) == len(tasks)
+    # pagerank converts to a directed graph, the others share one undirected graph and one sparse matrix
+    assert result['conversion']['conversions'] == 3
+    assert result['conversion']['reuses'] == 1
+
+    # the batch gives the same results as performing the tasks one by one
+    for (task, task_params), batch_result in zip(tasks, result['results']):
+        task = dict(task)
+        task['network'] = network
+        single_result = analyzer.perform_analysis(task=task, params=task_params)
+        if task['task_id'] == 'community_detection':
+            assert single_result['communities'] == batch_result['communities']
+        if task['task_id'] == 'social_influence_analysis':
+            assert single_result['scores'] == batch_result['scores']
+
+
+def test_perform_batch_in_database_network():
+    data_manager = BuiltinDatasetsManager(None, None)
+    data_manager.add_dataset('moreno_crime', 'Moreno Crime Network',
+                             '%s/datasets/preprocessed/moreno_crime.json' % path2root)
+    tasks = [({"task_id": "social_influence_analysis",
+               "options": {"method": "pagerank", "parameters": {}}}, None),
+             ({"task_id": "node_embedding",
+               "options": {"method": "svd", "parameters": {"K": 8}}}, None),
+             ({"task_id": "no_such_task",
+               "options": {"method": "none", "parameters": {}}}, None)]
+
+    analyzer = InMemoryAnalyzer(data_manager)
+    result = analyzer.perform_batch('moreno_crime', tasks)
+    print('message = ', result['message'])
+    assert result['success'] == 0
+    single_result = analyzer.perform_analysis({'task_id': 'social_influence_analysis', 'network': 'moreno_crime',
+                                               'options': tasks[0][0]['options']}, params=None)
+    assert result['results'][0]['success'] == 1
+    assert result['results'][0]['scores'] == single_result['scores']
+    assert result['results'][1]['success'] == 1
+    # an undefined task is reported as it is by `perform_analysis`
+    assert result['results'][2] is None
+
+    # without a data manager the network cannot be resolved
+    result = InMemoryAnalyzer().perform_batch('moreno_crime', tasks)
+    assert result['success'] == 0
+    assert result['results'] == [None] * len(tasks)
+
+
+if __name__ == '__main__':
+    test_perform_batch()
+    test_perform_batch_in_database_network()
@@ -0,0 +1,102 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+import time
+import threading
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+import networkx as nx
+from analyzer.request_taker import InMemoryAnalyzer
+from analyzer.common.budget import ExecutionBudget
+
+
+def _random_network(num_nodes, num_edges):
+    graph = nx.gnm_random_graph(num_nodes, num_edges, seed=0)
+    return {'edges': [{'source': u, 'target': v, 'properties': {}} for u, v in graph.edges()]}
+
+
+def test_budget_timeout_partial_result():
+    network = _random_network(3000, 30000)
+    task = {"task_id": "social_influence_analysis",
+            "network": network,
+            "options": {"method": "betweenness", "parameters": {}}}
+    analyzer = InMemoryAnalyzer()
+    start = time.time()
+    result = analyzer.perform_analysis(task=task, params={'timeout': 0.5})
+    print('message = ', result['message'], ', time = ', time.time() - start)
+    assert result['success'] == 1
+    assert result['partial']
+    assert time.time() - start < 5
+
+
+def test_budget_cancellation():
+    network = _random_network(3000, 30000)
+    task = {"task_id": "community_detection",
+            "network": network,
+            "options": {"method": "modularity", "parameters": {}}}
+    budget = ExecutionBudget()
+    threading.Timer(0.2, budget.cancel).start()
+    analyzer = InMemoryAnalyzer()
+    start = time.time()
+    result = analyzer.perform_analysis(task=task, params={'budget': budget})
+    print('message = ', result['message'], ', time = ', time.time() - start)
+    assert result['success'] == 0
+    assert result['message'] == 'the task is stopped: cancelled'
+
+
+def test_budget_not_exceeded():
+    network = _random_network(100, 300)
+    task = {"task_id": "social_influence_analysis",
+            "network": network,
+            "options": {"method": "betweenness", "parameters": {}}}
+    analyzer = InMemoryAnalyzer()
+    result = analyzer.perform_analysis(task=task, params={'timeout': 60})
+    assert result['success'] == 1
+    assert 'partial' not in result
+    graph = nx.gnm_random_graph(100, 300, seed=0)
+    expected = nx.betweenness_centrality(graph)
+    for u in expected:
+        assert abs(result['scores'][u] - expected[u]) < 1e-9
+
+
+if __name__ == '__main__':
+    test_budget_timeout_partial_result()
+    test_budget_cancellation()
+    test_budget_not_exceeded()
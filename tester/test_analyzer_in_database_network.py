@@ -0,0 +1,101 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from storage.builtin_datasets import BuiltinDatasetsManager
+from analyzer.request_taker import InMemoryAnalyzer
+
+
+def test_in_database_network():
+    connector = None  # no connection needed for this file-base datasets
+    params = None  # no parameter defined for now
+    data_manager = BuiltinDatasetsManager(connector, params)
+    data_manager.add_dataset('moreno_crime', 'Moreno Crime Network',
+                             '%s/datasets/preprocessed/moreno_crime.json' % path2root)
+    network = data_manager.get_network(network='moreno_crime')
+
+    analyzer = InMemoryAnalyzer(data_manager)
+    for task_id, method, parameters in [('social_influence_analysis', 'pagerank', {}),
+                                        ('social_influence_analysis', 'closeness_centrality', {}),
+                                        ('node_embedding', 'svd', {'K': 8})]:
+        options = {'method': method, 'parameters': parameters}
+        in_memory_result = analyzer.perform_analysis({'task_id': task_id, 'network': network, 'options': options},
+                                                    params=None)
+        in_database_result = analyzer.perform_analysis({'task_id': task_id, 'network': 'moreno_crime',
+                                                        'options': options}, params=None)
+        print(task_id, method, in_database_result['message'])
+        assert in_database_result['success'] == 1
+        if task_id == 'node_embedding':
+            assert set(in_database_result['vectors']) == set(in_memory_result['vectors'])
+        else:
+            for node, score in in_memory_result['scores'].items():
+                assert abs(in_database_result['scores'][node] - score) < 1e-9
+
+
+def test_in_database_network_filtered():
+    data_manager = BuiltinDatasetsManager(None, None)
+    data_manager.add_dataset('moreno_crime', 'Moreno Crime Network',
+                             '%s/datasets/preprocessed/moreno_crime.json' % path2root)
+    network = data_manager.get_network(network='moreno_crime')
+    node_ids = [network['edges'][0]['source']]
+    ego_network = data_manager.get_network(network='moreno_crime', node_ids=node_ids)
+
+    # the analyzer is given the data manager with the task parameters
+    analyzer = InMemoryAnalyzer()
+    result = analyzer.perform_analysis({'task_id': 'social_influence_analysis', 'network': 'moreno_crime',
+                                        'node_ids': node_ids,
+                                        'options': {'method': 'closeness_centrality', 'parameters': {}}},
+                                       params={'data_manager': data_manager})
+    assert result['success'] == 1
+    ego_nodes = set()
+    for edge in ego_network['edges']:
+        ego_nodes.update([edge['source'], edge['target']])
+    assert set(result['scores']) == ego_nodes
+
+    # without a data manager the network cannot be resolved
+    assert analyzer.perform_analysis({'task_id': 'social_influence_analysis', 'network': 'moreno_crime',
+                                      'options': {'method': 'closeness_centrality', 'parameters': {}}},
+                                     params=None) is None
+
+
+if __name__ == '__main__':
+    test_in_database_network()
+    test_in_database_network_filtered()
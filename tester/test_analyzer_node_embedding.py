@@ -45,6 +45,7 @@ if path2root not in sys.path:
 from storage.toy_datasets.toy_data_manager import ToyDataManager
 from storage.builtin_datasets import BuiltinDatasetsManager
 from analyzer.request_taker import InMemoryAnalyzer
+import tempfile
 
 
 def test_node_embedding():
@@ -92,5 +93,49 @@ def test_node_embedding():
     print('len of vectors = ', len(result['vectors']))
 
 
+def test_node_embedding_store():
+    connector = None  # no connection needed for this file-base datasets
+    params = None  # no parameter defined for now
+    data_manager = BuiltinDatasetsManager(connector, params)
+    data_manager.add_dataset('rhodes_bombing', 'Rhodes Bombing',
+                             '%s/datasets/preprocessed/rhodes_bombing.json' % path2root)
+    network = data_manager.get_network(network='rhodes_bombing')
+
+    task = {"task_id": "node_embedding",
+            "network": network,
+            "options": {"method": "nmf", "parameters": {"K": 8}}}
+    params = {"embedding_store": tempfile.mkdtemp(), "dataset_id": "rhodes_bombing"}
+
+    # the first call trains and persists the embedding, the second one loads it from the store
+    analyzer = InMemoryAnalyzer()
+    trained = analyzer.perform_analysis(task=task, params=params)
+    loaded = analyzer.perform_analysis(task=task, params=params)
+    assert loaded['message'] == 'the embedding is loaded from the store'
+    assert set(loaded['vectors'].keys()) == set(trained['vectors'].keys())
+    for node, vector in trained['vectors'].items():
+        assert abs(float(loaded['vectors'][node][0]) - float(vector[0])) < 1e-5
+
+
+def test_node_embedding_large_scale_options():
+    connector = None  # no connection needed for this file-base datasets
+    params = None  # no parameter defined for now
+    data_manager = BuiltinDatasetsManager(connector, params)
+    data_manager.add_dataset('moreno_crime', 'Moreno Crime Network',
+                             '%s/datasets/preprocessed/moreno_crime.json' % path2root)
+    network = data_manager.get_network(network='moreno_crime')
+
+    analyzer = InMemoryAnalyzer()
+    for method, parameters in [('svd', {'K': 16, 'solver': 'randomized'}),
+                               ('svd', {'K': 16, 'solver': 'randomized', 'proximity': 'second'}),
+                               ('nmf', {'K': 16, 'solver': 'mu', 'max_time': 1}),
+                               ('nmf', {'K': 16, 'proximity': 'second', 'max_time': 1})]:
+        task = {"task_id": "node_embedding",
+                "network": network,
+                "options": {"method": method, "parameters": parameters}}
+        result = analyzer.perform_analysis(task=task, params=None)
+        assert result['success'] == 1
+        assert all(len(vector) == 16 for vector in result['vectors'].values())
+
+
 if __name__ == '__main__':
     test_node_embedding()
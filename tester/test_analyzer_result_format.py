@@ -0,0 +1,102 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+import numpy as np
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from storage.builtin_datasets import BuiltinDatasetsManager
+from analyzer.request_taker import InMemoryAnalyzer
+from analyzer.common.results import to_dict
+
+
+def _get_network():
+    data_manager = BuiltinDatasetsManager(None, None)
+    data_manager.add_dataset('moreno_crime', 'Moreno Crime Network',
+                             '%s/datasets/preprocessed/moreno_crime.json' % path2root)
+    return data_manager.get_network(network='moreno_crime')
+
+
+def test_arrays_result_format():
+    network = _get_network()
+    analyzer = InMemoryAnalyzer()
+    for task_id, method in [('social_influence_analysis', 'pagerank'),
+                            ('social_influence_analysis', 'betweenness'),
+                            ('community_detection', 'modularity'),
+                            ('community_detection', 'k_cliques'),
+                            ('community_detection', 'spectral')]:
+        task = {'task_id': task_id, 'network': network, 'options': {'method': method, 'parameters': {}}}
+        dict_result = analyzer.perform_analysis(task, params=None)
+        arrays_result = analyzer.perform_analysis(task, params={'result_format': 'arrays'})
+        print(task_id, method, arrays_result['message'])
+        assert arrays_result['success'] == 1
+        assert isinstance(arrays_result['node_ids'], np.ndarray)
+        converted = to_dict(arrays_result)
+        if task_id == 'social_influence_analysis':
+            assert len(arrays_result['scores']) == len(arrays_result['node_ids'])
+            assert set(converted['scores']) == set(dict_result['scores'])
+            for node, score in dict_result['scores'].items():
+                assert abs(converted['scores'][node] - score) < 1e-9
+        else:
+            assert len(arrays_result['labels']) == len(arrays_result['node_ids'])
+            assert converted['membership'] == dict_result['membership']
+
+
+def test_scaling_and_binning():
+    network = _get_network()
+    analyzer = InMemoryAnalyzer()
+    task = {'task_id': 'social_influence_analysis', 'network': network,
+            'options': {'method': 'pagerank', 'parameters': {}}}
+    result = analyzer.perform_analysis(task, params={'result_format': 'arrays', 'scale': (0.2, 0.99), 'bins': 4})
+    scaled = result['scaled_scores']
+    assert abs(scaled.min() - 0.2) < 1e-9 and abs(scaled.max() - 0.99) < 1e-9
+    assert np.argmax(scaled) == np.argmax(result['scores'])
+    assert result['score_bins'].min() == 0 and result['score_bins'].max() == 3
+
+    # the scaled scores of the dictionary format are keyed by node id as well
+    dict_result = analyzer.perform_analysis(task, params={'scale': (0.2, 0.99), 'bins': 4})
+    converted = to_dict(result)
+    for node, score in dict_result['scaled_scores'].items():
+        assert abs(converted['scaled_scores'][node] - score) < 1e-9
+    assert dict_result['score_bins'] == converted['score_bins']
+
+
+if __name__ == '__main__':
+    test_arrays_result_format()
+    test_scaling_and_binning()
@@ -0,0 +1,86 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+import json
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from storage.builtin_datasets import BuiltinDatasetsManager
+from analyzer.request_taker import InMemoryAnalyzer
+from analyzer.common import tracing
+
+
+def test_tracing():
+    connector = None  # no connection needed for this file-base datasets
+    params = None  # no parameter defined for now
+    data_manager = BuiltinDatasetsManager(connector, params)
+    data_manager.add_dataset('rhodes_bombing', 'Rhodes Bombing',
+                             '%s/datasets/preprocessed/rhodes_bombing.json' % path2root)
+    network = data_manager.get_network(network='rhodes_bombing')
+
+    task = {"task_id": "community_detection",
+            "network": network,
+            "options": {"method": "modularity", "parameters": {}}}
+    tracing.counters.reset()
+    analyzer = InMemoryAnalyzer()
+    result = analyzer.perform_analysis(task=task, params={'trace': True})
+    assert result['success'] == 1
+
+    spans = result['trace']
+    print('spans = ', spans)
+    assert [s['name'] for s in spans] == ['compute', 'conversion', 'serialisation']
+    conversion = spans[1]
+    assert conversion['depth'] == 1
+    assert conversion['args']['nodes'] > 0 and conversion['args']['edges'] > 0
+
+    trace = tracing.to_chrome_trace(spans)
+    assert len(json.loads(json.dumps(trace))['traceEvents']) == 3
+
+    metrics = tracing.counters.to_prometheus()
+    print(metrics)
+    assert 'analyzer_phase_count_total{method="modularity",task_id="community_detection",phase="conversion"} 1' \
+        in metrics
+
+    # spans are only attached on request
+    result = analyzer.perform_analysis(task=task, params=None)
+    assert 'trace' not in result
+
+
+if __name__ == '__main__':
+    test_tracing()
@@ -0,0 +1,95 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from storage.builtin_datasets import BuiltinDataset
+from storage import json_lines
+
+path_2_data = '%s/datasets/preprocessed/moreno_crime.json' % path2root
+
+
+def test_load_in_chunks():
+    dataset = BuiltinDataset(path_2_data)
+    chunk_size = json_lines.chunk_size
+    json_lines.chunk_size = 1000  # split many records across chunks
+    try:
+        chunked_dataset = BuiltinDataset(path_2_data)
+    finally:
+        json_lines.chunk_size = chunk_size
+    assert chunked_dataset.nodes == dataset.nodes
+    assert chunked_dataset.edges == dataset.edges
+    assert chunked_dataset.adj_list == dataset.adj_list
+    assert chunked_dataset.in_adj_list == dataset.in_adj_list
+    assert chunked_dataset.edge_types == dataset.edge_types
+
+
+def test_adjacency():
+    dataset = BuiltinDataset(path_2_data)
+    print('load stats = ', dataset.load_stats)
+    assert dataset.load_stats['records'] == len(dataset.nodes) + len(dataset.edges)
+    assert dataset.load_stats['bytes'] == os.path.getsize(path_2_data)
+    num_edges = 0
+    for u in dataset.adj_list:
+        assert dataset.adj_list[u] == sorted(dataset.adj_list[u])
+        for e in dataset.adj_list[u]:
+            assert dataset.edges[e]['source'] == u
+        num_edges += len(dataset.adj_list[u])
+    assert num_edges == len(dataset.edges)
+    for v in dataset.in_adj_list:
+        for e in dataset.in_adj_list[v]:
+            assert dataset.edges[e]['target'] == v
+
+
+def test_load_uploaded_content():
+    with open(path_2_data) as f:
+        content = f.read()
+    content = content.replace('\n', '\n\n# a comment\n', 10)
+    dataset = BuiltinDataset(content, uploaded=True)
+    file_dataset = BuiltinDataset(path_2_data)
+    assert dataset.edges == file_dataset.edges
+    assert dataset.adj_list == file_dataset.adj_list
+    assert dataset.node_types == file_dataset.node_types
+
+
+if __name__ == '__main__':
+    test_load_in_chunks()
+    test_adjacency()
+    test_load_uploaded_content()
@@ -0,0 +1,122 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+import shutil
+import tempfile
+import threading
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from storage.builtin_datasets import BuiltinDataset
+from storage.snapshot import get_snapshot_path, write_snapshot
+
+
+def _assert_same_dataset(dataset, other):
+    assert dataset.nodes == other.nodes
+    assert dataset.edges == other.edges
+    assert dataset.adj_list == other.adj_list
+    assert dataset.in_adj_list == other.in_adj_list
+    assert dataset.node_types == other.node_types
+    assert dataset.edge_types == other.edge_types
+
+
+def test_snapshot():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path_2_data = os.path.join(temp_dir, 'moreno_crime.json')
+        shutil.copy('%s/datasets/preprocessed/moreno_crime.json' % path2root, path_2_data)
+        dataset = BuiltinDataset(path_2_data, snapshot=True)
+        assert dataset.load_stats['parser'] != 'snapshot'
+        assert os.path.isdir(get_snapshot_path(path_2_data))
+
+        snapshot_dataset = BuiltinDataset(path_2_data, snapshot=True)
+        print('load stats = ', snapshot_dataset.load_stats)
+        assert snapshot_dataset.load_stats['parser'] == 'snapshot'
+        _assert_same_dataset(snapshot_dataset, dataset)
+
+        # the snapshot is still used if the file is only touched
+        os.utime(path_2_data, ns=(0, 0))
+        assert BuiltinDataset(path_2_data, snapshot=True).load_stats['parser'] == 'snapshot'
+
+        # the snapshot is regenerated if the content of the file changes
+        with open(path_2_data, 'a') as f:
+            f.write('{"type": "edge", "source": "person_0", "target": "person_new", '
+                    '"properties": {"type": "Suspect", "weight": 2, "note": [1, "a"]}}\n')
+        changed_dataset = BuiltinDataset(path_2_data, snapshot=True)
+        assert changed_dataset.load_stats['parser'] != 'snapshot'
+        assert len(changed_dataset.edges) == len(dataset.edges) + 1
+        _assert_same_dataset(BuiltinDataset(path_2_data, snapshot=True), changed_dataset)
+
+        # a dataset opened from its snapshot is exported back to JSON lines
+        assert snapshot_dataset.dump_network('dumped.json', temp_dir, params={'output_format': 'json'}) == 1
+        _assert_same_dataset(BuiltinDataset(os.path.join(temp_dir, 'dumped.json')), dataset)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_snapshot_replaced_while_read():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path_2_data = os.path.join(temp_dir, 'moreno_crime.json')
+        shutil.copy('%s/datasets/preprocessed/moreno_crime.json' % path2root, path_2_data)
+        dataset = BuiltinDataset(path_2_data, snapshot=True)
+        snapshot_path = get_snapshot_path(path_2_data)
+        done = threading.Event()
+
+        def write():
+            while not done.is_set():
+                write_snapshot(dataset, path_2_data, snapshot_path)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            # readers fall back to parsing the file when the snapshot is replaced under them
+            for _ in range(30):
+                _assert_same_dataset(BuiltinDataset(path_2_data, snapshot=True), dataset)
+        finally:
+            done.set()
+            writer.join()
+        assert sorted(os.listdir(temp_dir)) == ['moreno_crime.json', os.path.basename(snapshot_path)]
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    test_snapshot()
+    test_snapshot_replaced_while_read()
@@ -0,0 +1,122 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from collections import Counter
+from storage.builtin_datasets import BuiltinDataset, bulk_action
+
+path_2_data = '%s/datasets/preprocessed/rhodes_bombing.json' % path2root
+
+
+def _check_dataset(dataset):
+    edges = [edge for edge in dataset.edges if edge is not None]
+    assert dataset.edge_types == dict(Counter([edge['properties']['type'] for edge in edges]))
+    for node, e_indexes in dataset.adj_list.items():
+        assert e_indexes == sorted(e_indexes)
+        assert all(dataset.edges[e]['source'] == node for e in e_indexes)
+    for node, e_indexes in dataset.in_adj_list.items():
+        assert e_indexes == sorted(e_indexes)
+        assert all(dataset.edges[e]['target'] == node for e in e_indexes)
+    assert sum([len(e_indexes) for e_indexes in dataset.adj_list.values()]) == len(edges)
+    assert sum([len(e_indexes) for e_indexes in dataset.in_adj_list.values()]) == len(edges)
+
+
+def test_save_edges():
+    dataset = BuiltinDataset(path_2_data)
+    nodes = list(dataset.nodes)
+    existing = dataset.edges[0]
+    num_edges = len(dataset.edges)
+    edges = [{'source': nodes[0], 'target': nodes[-1], 'properties': {'type': 'first'}},
+             {'source': nodes[0], 'target': nodes[-1], 'properties': {'type': 'second'}},
+             {'source': nodes[-1], 'target': nodes[-1], 'properties': {'type': 'first'}},
+             {'source': existing['source'], 'target': existing['target'], 'properties': {'type': 'first'}},
+             {'source': nodes[0], 'target': 'not a node', 'properties': {'type': 'first'}}]
+    errors = dataset.save_edges(edges)
+    assert [error['message'] for error in errors] == ['target not found!']
+    # the second edge updates the first one
+    assert len(dataset.edges) == num_edges + 2
+    assert dataset.edges[num_edges]['properties'] == {'type': 'second'}
+    assert existing['properties'] == {'type': 'first'}
+    assert dataset.find_edge_index(nodes[-1], nodes[-1]) == num_edges + 1
+    _check_dataset(dataset)
+
+    # a single compound action
+    action = dataset.recent_changes[-1]
+    assert action['action'] == bulk_action
+    assert [change['action'] for change in action['changes']] == \
+        ['add_edge', 'update_edge', 'add_edge', 'update_edge']
+
+
+def test_save_nodes():
+    dataset = BuiltinDataset(path_2_data)
+    node = list(dataset.nodes)[0]
+    properties = dict(dataset.nodes[node])
+    errors = dataset.save_nodes({node: {'type': 'organization', 'name': 'renamed'},
+                                 'New_Node': {'type': 'organization'},
+                                 'Empty_Node': None})
+    assert len(errors) == 1 and errors[0]['node'] == 'Empty_Node'
+    assert dataset.nodes[node] == {'type': 'organization', 'name': 'renamed'}
+    assert dataset.node_types == dict(Counter([p['type'] for p in dataset.nodes.values()]))
+    action = dataset.recent_changes[-1]
+    assert action['action'] == bulk_action
+    assert action['changes'][0]['diff']['type'] == (properties['type'], 'organization')
+    assert dataset.search_nodes(params={'type': 'organization'})['found'][0]['id'] == node
+
+
+def test_delete_nodes():
+    dataset = BuiltinDataset(path_2_data)
+    nodes = sorted(dataset.adj_list, key=lambda n: -len(dataset.adj_list[n]))[:5]
+    num_edges = len([e for e in dataset.edges if e['source'] in nodes or e['target'] in nodes])
+    errors = dataset.delete_nodes(nodes + ['not a node'])
+    assert [error['node'] for error in errors] == ['not a node']
+    assert dataset.edges.count(None) == num_edges
+    assert all(node not in dataset.nodes and node not in dataset.adj_list for node in nodes)
+    _check_dataset(dataset)
+    action = dataset.recent_changes[-1]
+    assert action['action'] == bulk_action
+    assert Counter([change['action'] for change in action['changes']]) == \
+        {'delete_edge': num_edges, 'delete_node': len(nodes)}
+
+
+if __name__ == '__main__':
+    test_save_edges()
+    test_save_nodes()
+    test_delete_nodes()
@@ -0,0 +1,184 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+import copy
+from collections import Counter
+from storage.builtin_datasets import BuiltinDataset
+from storage.change_journal import ChangeJournal, MISSING, get_diff, apply_diff
+
+path_2_data = '%s/datasets/preprocessed/rhodes_bombing.json' % path2root
+
+
+def _get_state(dataset):
+    adj_list = {node: [dataset.edges[e] for e in e_indexes] for node, e_indexes in dataset.adj_list.items()
+                if len(e_indexes) > 0}
+    return copy.deepcopy((dataset.nodes, [edge for edge in dataset.edges if edge is not None], adj_list,
+                          dataset.node_types, dataset.edge_types))
+
+
+def _change(dataset):
+    nodes = list(dataset.nodes)
+    dataset.update_a_node(nodes[0], {'type': 'organization', 'name': 'renamed'})
+    dataset.add_a_node('New_Node', {'type': 'person'})
+    dataset.add_an_edge('New_Node', nodes[1], {'type': 'new'})
+    dataset.update_an_edge(e_index=0, properties={'type': 'updated'})
+    dataset.save_edges([{'source': nodes[2], 'target': 'New_Node', 'properties': {'type': 'new'}},
+                        {'source': nodes[1], 'target': nodes[2], 'properties': {'type': 'new'}}])
+    dataset.delete_a_node(nodes[3])
+    dataset.rename_node(nodes[4], 'Renamed_Node')
+    dataset.delete_edges([1, 2])
+
+
+def test_diff():
+    before = {'type': 'person', 'name': 'a', 'age': 3}
+    after = {'type': 'person', 'name': 'b', 'city': 'x'}
+    diff = get_diff(before, after)
+    assert diff == {'name': ('a', 'b'), 'age': (3, MISSING), 'city': (MISSING, 'x')}
+    assert apply_diff(dict(before), diff, undo=False) == after
+    assert apply_diff(dict(after), diff, undo=True) == before
+
+
+def test_undo_redo():
+    dataset = BuiltinDataset(path_2_data)
+    original = _get_state(dataset)
+    _change(dataset)
+    changed = _get_state(dataset)
+    num_changes = len(dataset.recent_changes)
+    for i in range(num_changes):
+        assert dataset.undo()['success'] == 1
+    assert dataset.undo()['success'] == 0
+    assert _get_state(dataset) == original
+    assert dataset.search_nodes(params={'type': 'person'})['found'] is not None
+    for i in range(num_changes):
+        assert dataset.redo()['success'] == 1
+    assert dataset.redo()['success'] == 0
+    assert _get_state(dataset) == changed
+    # a new change drops the undone ones
+    dataset.undo()
+    dataset.add_a_node('Other_Node', {'type': 'person'})
+    assert dataset.redo()['success'] == 0
+
+
+def test_ring_buffer():
+    journal = ChangeJournal(capacity=5)
+    for i in range(12):
+        journal.record({'action': 'test', 'i': i})
+    assert [record['i'] for record in journal.get_records()] == [7, 8, 9, 10, 11]
+    assert journal.undo()['i'] == 11
+    assert len(journal) == 4
+    # the byte budget drops the oldest records
+    journal = ChangeJournal(capacity=100, max_bytes=4000)
+    for i in range(100):
+        journal.record({'action': 'test', 'data': 'x' * 100})
+    assert 0 < len(journal) < 100
+    assert journal.num_bytes <= 4000
+
+
+def test_rollback():
+    dataset = BuiltinDataset(path_2_data)
+    assert dataset.rollback()['success'] == 0
+    original = _get_state(dataset)
+    dataset.checkpoint()
+    _change(dataset)
+    # only the changed nodes and edges are kept by the checkpoint
+    checkpoint = dataset.journal.checkpoints[-1]
+    assert len(checkpoint['nodes']) < len(dataset.nodes)
+    assert checkpoint['nodes']['New_Node'] is MISSING
+    assert dataset.rollback()['success'] == 1
+    assert _get_state(dataset) == original
+    assert len(dataset.recent_changes) == 0
+    assert dataset.edge_types == dict(Counter([edge['properties']['type'] for edge in dataset.edges
+                                               if edge is not None]))
+
+
+
+def test_edit_after_undo_past_checkpoint():
+    dataset = BuiltinDataset(path_2_data)
+    dataset.add_a_node('a')
+    dataset.checkpoint()
+    dataset.add_a_node('b')
+    dataset.undo()
+    dataset.undo()
+    # the checkpoint no longer leads anywhere, the next edits must not trip on it
+    assert dataset.add_a_node('c')['success'] == 1
+    assert dataset.add_a_node('d')['success'] == 1
+    assert 'a' not in dataset.nodes and 'b' not in dataset.nodes
+    assert 'c' in dataset.nodes and 'd' in dataset.nodes
+    assert dataset.undo()['success'] == 1
+    assert 'd' not in dataset.nodes
+
+
+def test_undo_redo_after_rollback():
+    dataset = BuiltinDataset(path_2_data)
+    nodes = list(dataset.nodes)
+    # an edge updated after the checkpoint
+    dataset.add_an_edge(nodes[0], nodes[1], {'type': 'zz', 'weight': 1})
+    e_index = len(dataset.edges) - 1
+    dataset.checkpoint()
+    dataset.update_an_edge(e_index=e_index, properties={'type': 'zz', 'weight': 5})
+    assert dataset.rollback()['success'] == 1
+    assert dataset.edges[e_index]['properties'] == {'type': 'zz', 'weight': 1}
+    dataset.undo()
+    assert dataset.edges[e_index] is None
+    dataset.redo()
+    assert dataset.edges[e_index]['properties'] == {'type': 'zz', 'weight': 1}
+    # an edge updated, then deleted after the checkpoint
+    dataset.checkpoint()
+    dataset.update_an_edge(e_index=e_index, properties={'type': 'zz', 'weight': 7})
+    dataset.delete_an_edge(e_index=e_index)
+    assert dataset.rollback()['success'] == 1
+    assert dataset.edges[e_index]['properties'] == {'type': 'zz', 'weight': 1}
+    assert e_index in dataset.adj_list[nodes[0]]
+    dataset.undo()
+    dataset.redo()
+    assert dataset.edges[e_index]['properties'] == {'type': 'zz', 'weight': 1}
+    assert dataset.edge_types == dict(Counter([edge['properties']['type'] for edge in dataset.edges
+                                               if edge is not None]))
+
+
+if __name__ == '__main__':
+    test_diff()
+    test_undo_redo()
+    test_ring_buffer()
+    test_rollback()
+    test_edit_after_undo_past_checkpoint()
+    test_undo_redo_after_rollback()
@@ -0,0 +1,157 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+import base64
+import json
+from collections import Counter
+from storage.builtin_datasets import ActiveNetwork, BuiltinDataset
+from storage.degree_index import DegreeIndex
+
+path_2_data = '%s/datasets/preprocessed/moreno_crime.json' % path2root
+
+
+def _warm_index(dataset):
+    # compute the counts of every node, so that the changes have to update them
+    index = dataset.get_degree_index()
+    for node in list(dataset.nodes):
+        index.get_degree(node, 'all', weighted=True)
+        index.get_neighbor_counts([node])
+
+
+def _check_index(dataset):
+    index = dataset.get_degree_index()
+    expected = DegreeIndex(dataset)
+    for node in list(index.neighbors) + list(dataset.nodes):
+        assert index.get_neighbor_counts([node]) == expected.get_neighbor_counts([node])
+        for direction in ('out', 'in'):
+            counts, weights = index._get_types(direction, node)
+            expected_counts, expected_weights = expected._get_types(direction, node)
+            assert counts == expected_counts
+            assert all([abs(weights[t] - w) < 1e-9 for t, w in expected_weights.items()])
+
+
+def test_degrees():
+    dataset = BuiltinDataset(path_2_data)
+    node = dataset.edges[0]['source']
+    edge_type = dataset.edges[0]['properties']['type']
+    out_edges = [dataset.edges[e] for e in dataset.adj_list[node]]
+    assert dataset.get_degree(node) == len(out_edges)
+    assert dataset.get_degree(node, 'in') == len(dataset.in_adj_list.get(node, []))
+    assert dataset.get_degree(node, edge_type=edge_type) == \
+        len([edge for edge in out_edges if edge['properties']['type'] == edge_type])
+    assert dataset.get_degree(node, weighted=True) == sum([edge['properties'].get('weight', 1) for edge in out_edges])
+    assert dataset.get_degree('not a node') == 0
+    # the largest degrees
+    degrees = Counter([edge['source'] for edge in dataset.edges])
+    top = dataset.get_top_degree_nodes(5)
+    assert [degree for node, degree in top] == [degree for node, degree in degrees.most_common(5)]
+
+
+def test_neighbor_counts():
+    dataset = BuiltinDataset(path_2_data)
+    nodes = list(dataset.nodes)[:30]
+    expected = Counter([dataset.edges[e]['target'] for u in nodes for e in dataset.adj_list.get(u, [])])
+    assert dataset.get_neighbor_counts(nodes) == dict(expected)
+    assert dataset.get_neighbor_counts(None) == {}
+
+
+def test_changes():
+    dataset = BuiltinDataset(path_2_data)
+    _warm_index(dataset)
+    nodes = list(dataset.nodes)
+    dataset.add_an_edge(nodes[0], nodes[1], {'type': 'new', 'weight': 2.5})
+    dataset.update_an_edge(e_index=0, properties={'type': 'updated', 'weight': 4})
+    dataset.delete_an_edge(e_index=1)
+    dataset.save_edges([{'source': nodes[2], 'target': nodes[3], 'properties': {'type': 'new'}}])
+    dataset.rename_node(nodes[4], 'Renamed_Node')
+    dataset.delete_a_node(nodes[5])
+    _check_index(dataset)
+    while dataset.undo()['success'] == 1:
+        pass
+    _check_index(dataset)
+    dataset.compact()
+    assert dataset.get_degree(nodes[0]) == len(dataset.adj_list[nodes[0]])
+
+
+def test_truncate():
+    network = ActiveNetwork(path_2_data)
+    network.active_nodes = dict([(node, None) for node in network.nodes])
+    network.active_edges = dict([(e, None) for e in range(len(network.edges))])
+    core = list(network.nodes)[-1:]
+    network.truncate(core, max_num=10)
+    assert core[0] in network.active_nodes
+    # the nodes of largest degree are kept, ties are broken arbitrarily
+    threshold = network.get_top_degree_nodes(10, direction='all')[-1][1]
+    kept = [node for node in network.active_nodes if node not in core]
+    assert len(kept) in (9, 10)
+    assert all([network.get_degree(node, 'all') >= threshold for node in kept])
+    assert all([network.edges[e]['source'] in network.active_nodes for e in network.active_edges])
+
+
+
+def _get_upload(edges):
+    # content of an uploaded JSON-lines network, as given by the upload component
+    nodes = sorted(set([u for edge in edges for u in edge[:2]]))
+    lines = [{'type': 'node', 'id': u, 'properties': {'type': 'person', 'name': u}} for u in nodes]
+    lines += [{'type': 'edge', 'source': source, 'target': target, 'properties': {'type': edge_type, 'weight': weight}}
+              for source, target, edge_type, weight in edges]
+    content = '\n'.join([json.dumps(line) for line in lines])
+    return 'data:application/octet-stream;base64,' + base64.b64encode(content.encode('utf-8')).decode('utf-8')
+
+
+def test_upload():
+    network = ActiveNetwork(path_2_data=None, from_file=False, initialize=False)
+    network.deserialize_network(_get_upload([('a', 'b', 'x', 1), ('b', 'c', 'y', 1)]))
+    assert network.get_degree('a', 'out', 'x', weighted=True) == 1
+    assert network.get_neighbor_counts(['b']) == {'c': 1}
+    # another network with as many edges
+    network.deserialize_network(_get_upload([('a', 'b', 'x', 10), ('b', 'd', 'y', 1)]))
+    assert network.get_degree('a', 'out', 'x', weighted=True) == 10
+    assert network.get_neighbor_counts(['b']) == {'d': 1}
+
+
+if __name__ == '__main__':
+    test_degrees()
+    test_neighbor_counts()
+    test_changes()
+    test_truncate()
+    test_upload()
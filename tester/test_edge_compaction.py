@@ -0,0 +1,119 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from storage.builtin_datasets import BuiltinDataset, ActiveNetwork
+
+path_2_data = '%s/datasets/preprocessed/rhodes_bombing.json' % path2root
+
+
+def _get_pairs(dataset):
+    return sorted([(edge['source'], edge['target'], str(edge['properties'])) for edge in dataset.edges
+                   if edge is not None])
+
+
+def _check_adjacency(dataset):
+    for node, e_indexes in dataset.adj_list.items():
+        assert all(dataset.edges[e]['source'] == node for e in e_indexes)
+        assert e_indexes == sorted(e_indexes)
+    for node, e_indexes in dataset.in_adj_list.items():
+        assert all(dataset.edges[e]['target'] == node for e in e_indexes)
+    num_out = sum([len(e_indexes) for e_indexes in dataset.adj_list.values()])
+    assert num_out == len(dataset.edges)
+
+
+def test_compact():
+    dataset = BuiltinDataset(path_2_data)
+    num_edges = len(dataset.edges)
+    dataset.delete_edges(list(range(0, num_edges, 3)))
+    pairs = _get_pairs(dataset)
+    kept = dataset.edges[1]
+    result = dataset.compact()
+    assert result['success'] == 1
+    assert result['num_removed'] == len(range(0, num_edges, 3))
+    assert result['reclaimed_mb'] >= 0
+    assert result['translation'][0] == -1 and dataset.edges[result['translation'][1]] is kept
+    assert None not in dataset.edges and dataset.num_deleted_edges == 0
+    assert _get_pairs(dataset) == pairs
+    _check_adjacency(dataset)
+    # the changes before a compaction cannot be undone
+    assert len(dataset.recent_changes) == 0
+    assert dataset.undo()['success'] == 0
+    edge = dataset.edges[-1]
+    assert dataset.find_edge_index(edge['source'], edge['target']) == \
+        min([e for e in dataset.adj_list[edge['source']] if dataset.edges[e]['target'] == edge['target']])
+
+
+def test_compact_if_needed():
+    dataset = BuiltinDataset(path_2_data)
+    dataset.compaction_ratio = 0.2
+    num_edges = len(dataset.edges)
+    dataset.delete_edges(list(range(int(num_edges * 0.1))))
+    assert dataset.edges.count(None) == int(num_edges * 0.1)
+    # deleting past the ratio compacts
+    edges = [(edge['source'], edge['target']) for edge in dataset.edges[int(num_edges * 0.1):int(num_edges * 0.3)]]
+    dataset.delete_edges(edges, is_indexes=False)
+    assert None not in dataset.edges
+    _check_adjacency(dataset)
+
+
+def test_compact_active_network():
+    active_network = ActiveNetwork(path_2_data)
+    selected_nodes = list(active_network.nodes)[:10]
+    active_network.initialize(selected_nodes)
+    active_edges = dict([(e, active_network.edges[e]) for e in active_network.active_edges])
+    e_index = min(active_edges)
+    # delete edges that are not active
+    deleted = [e for e in range(len(active_network.edges)) if e not in active_edges][:20]
+    active_network.delete_edges(deleted)
+    active_network.toggle_edge_selection(e_index)
+    translation = active_network.compact()['translation']
+    assert dict([(e, active_network.edges[e]) for e in active_network.active_edges]) == \
+        dict([(translation[e], edge) for e, edge in active_edges.items()])
+    assert active_network.selected_edges == {translation[e_index]}
+    for e, info in active_network.active_edges.items():
+        assert active_network.elements[info['element_index']]['data']['id'] == e
+
+
+if __name__ == '__main__':
+    test_compact()
+    test_compact_if_needed()
+    test_compact_active_network()
@@ -0,0 +1,160 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from storage.builtin_datasets import BuiltinDataset
+
+path_2_data = '%s/datasets/preprocessed/rhodes_bombing.json' % path2root
+
+
+def _scan(dataset, source, target):
+    """
+    find the edges from source to target by scanning the edge list
+    """
+    return [e_index for e_index, edge in enumerate(dataset.edges)
+            if edge is not None and edge['source'] == source and edge['target'] == target]
+
+
+def _check_index(dataset):
+    for e_index, edge in enumerate(dataset.edges):
+        if edge is None:
+            continue
+        found = dataset.find_edge_indexes(edge['source'], edge['target'])
+        assert found == _scan(dataset, edge['source'], edge['target'])
+        assert dataset.find_edge_index(edge['source'], edge['target']) == found[0]
+
+
+def test_find_edges():
+    dataset = BuiltinDataset(path_2_data)
+    _check_index(dataset)
+    edge = dataset.edges[0]
+    source, target = edge['source'], edge['target']
+    edge_type = edge['properties'].get('type')
+    assert dataset.find_edge_indexes(source, target, edge_types=[edge_type]) == _scan(dataset, source, target)
+    assert dataset.find_edge_indexes(source, target, edge_types=['not a type']) == []
+    assert dataset.find_edge_index(source, 'not a node') == -1
+
+
+def test_save_and_delete_edges():
+    dataset = BuiltinDataset(path_2_data)
+    nodes = list(dataset.nodes)
+    source, target = nodes[0], nodes[-1]
+    dataset.delete_edges([(source, target), (target, source)], is_indexes=False)
+    assert dataset.find_edge_index(source, target) == -1
+
+    # add, then change the type of the edge
+    assert dataset.save_edges([{'source': source, 'target': target, 'properties': {'type': 'first'}}]) == []
+    e_index = dataset.find_edge_index(source, target)
+    assert e_index == len(dataset.edges) - 1
+    assert dataset.find_edge_indexes(source, target, edge_types=['first']) == [e_index]
+    assert dataset.save_edges([{'source': source, 'target': target, 'properties': {'type': 'second'}}]) == []
+    assert dataset.find_edge_indexes(source, target, edge_types=['first']) == []
+    assert dataset.find_edge_indexes(source, target, edge_types=['second']) == [e_index]
+
+    # delete
+    assert dataset.delete_an_edge(source=source, target=target, is_index=False)['success'] == 1
+    assert dataset.find_edge_index(source, target) == -1
+    assert dataset.delete_an_edge(e_index=e_index)['success'] == 0
+    assert e_index not in dataset.adj_list[source] and e_index not in dataset.in_adj_list[target]
+    _check_index(dataset)
+
+
+def test_bulk_delete():
+    dataset = BuiltinDataset(path_2_data)
+    pairs = [(edge['source'], edge['target']) for edge in dataset.edges[:len(dataset.edges) // 2]]
+    errors = dataset.delete_edges(pairs, is_indexes=False)
+    # each pair deletes one of its edges, or is reported once all of them are deleted
+    assert len(errors) + dataset.edges.count(None) == len(pairs)
+    for source, target in pairs:
+        found = _scan(dataset, source, target)
+        assert dataset.find_edge_index(source, target) == (found[0] if found else -1)
+    for node, e_indexes in list(dataset.adj_list.items()) + list(dataset.in_adj_list.items()):
+        assert all(dataset.edges[e_index] is not None for e_index in e_indexes)
+    _check_index(dataset)
+
+    # delete a node with its edges
+    node = max(dataset.adj_list, key=lambda n: len(dataset.adj_list[n]))
+    neighbors = [dataset.edges[e_index]['target'] for e_index in dataset.adj_list[node]]
+    assert dataset.delete_a_node(node)['success'] == 1
+    for neighbor in neighbors:
+        assert dataset.find_edge_index(node, neighbor) == -1
+        if neighbor in dataset.in_adj_list:
+            assert all(dataset.edges[e_index] is not None for e_index in dataset.in_adj_list[neighbor])
+    _check_index(dataset)
+
+
+def test_stale_index():
+    dataset = BuiltinDataset(path_2_data)
+    _check_index(dataset)
+    # edges changed without the index are found again after a rebuild
+    dataset.edges.reverse()
+    _check_index(dataset)
+
+
+
+def test_get_neighbors():
+    dataset = BuiltinDataset(path_2_data)
+    node = max(dataset.adj_list, key=lambda n: len(dataset.adj_list[n]))
+    dataset.delete_an_edge(e_index=dataset.adj_list[node][0])
+    out_edges = [dataset.edges[e_index] for e_index in dataset.adj_list[node]]
+    targets = list(dict.fromkeys(edge['target'] for edge in out_edges))
+    result = dataset.get_neighbors([node, 'not a node'])
+    assert result['not_found'] == ['not a node']
+    assert [neighbor['neighbor_id'] for neighbor in result['found'][0]['neighbors']] == targets
+    result = dataset.get_edges([node])
+    assert [edge['target'] for edge in result['found'][0]['edges']] == targets
+
+    # select the edges by type
+    edge_type = out_edges[0]['properties'].get('type')
+    typed_targets = list(dict.fromkeys(edge['target'] for edge in out_edges
+                                       if edge['properties'].get('type') == edge_type))
+    result = dataset.get_neighbors([node], params={'edge_types': [edge_type]})
+    assert [neighbor['neighbor_id'] for neighbor in result['found'][0]['neighbors']] == typed_targets
+    result = dataset.get_edges([node], params={'edge_types': ['not a type']})
+    assert result['found'][0]['edges'] == []
+
+
+if __name__ == '__main__':
+    test_find_edges()
+    test_save_and_delete_edges()
+    test_bulk_delete()
+    test_stale_index()
+    test_get_neighbors()
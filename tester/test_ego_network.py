@@ -0,0 +1,126 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+import random
+import numpy as np
+from storage.builtin_datasets import BuiltinDataset
+
+path_2_data = '%s/datasets/preprocessed/moreno_crime.json' % path2root
+
+
+def _get_ego_network(dataset, node_ids, num_hops=1, max_fan_out=None, is_valid=None):
+    """
+    the ego-network, found with the adjacency lists
+    """
+    involved = set(node_ids)
+    frontier = list(dict.fromkeys(node_ids))
+    edges = []
+    for hop in range(num_hops):
+        next_frontier = []
+        for u in frontier:
+            e_indexes = [e for e in dataset.adj_list.get(u, []) if is_valid is None or is_valid(dataset.edges[e])]
+            for e in e_indexes[:max_fan_out]:
+                edges.append(e)
+                v = dataset.edges[e]['target']
+                if v not in involved:
+                    involved.add(v)
+                    next_frontier.append(v)
+        frontier = next_frontier
+    for u in frontier:
+        edges.extend([e for e in dataset.adj_list.get(u, []) if dataset.edges[e]['target'] in involved and
+                      (is_valid is None or is_valid(dataset.edges[e]))])
+    return sorted(edges), involved
+
+
+def test_ego_network():
+    dataset = BuiltinDataset(path_2_data)
+    nodes = list(dataset.nodes)
+    r = random.Random(0)
+    for i in range(20):
+        node_ids = r.sample(nodes, 3)
+        for num_hops, max_fan_out in ((1, None), (2, None), (2, 1), (0, None)):
+            network = dataset.get_network(node_ids, return_edge_index=True, num_hops=num_hops,
+                                          max_fan_out=max_fan_out)
+            edges, involved = _get_ego_network(dataset, node_ids, num_hops, max_fan_out)
+            assert sorted(network['edges']) == edges
+            assert set([node['id'] for node in network['nodes']]) == involved
+    # the whole network
+    assert len(dataset.get_network()['edges']) == len(dataset.edges)
+
+
+def test_edge_selection():
+    dataset = BuiltinDataset(path_2_data)
+    edge_type = dataset.edges[0]['properties']['type']
+    dataset.update_an_edge(e_index=1, properties={'type': edge_type, 'weight': 100})
+    node_ids = [dataset.edges[0]['source'], dataset.edges[1]['source']]
+    for params, is_valid in (({'edge_types': [edge_type]}, lambda e: e['properties'].get('type') == edge_type),
+                             ({'edge_types': ['unknown']}, lambda e: False),
+                             ({'min_weight': 50}, lambda e: e['properties'].get('weight', 0) >= 50)):
+        network = dataset.get_network(node_ids, params, return_edge_index=True)
+        assert sorted(network['edges']) == _get_ego_network(dataset, node_ids, is_valid=is_valid)[0]
+    network = dataset.get_network(node_ids, {'min_weight': 50}, as_arrays=True)
+    assert isinstance(network['edges'], np.ndarray) and network['edges'].tolist() == [1]
+
+
+def test_changes():
+    dataset = BuiltinDataset(path_2_data)
+    u = dataset.edges[0]['source']
+    dataset.get_network([u])
+    dataset.delete_an_edge(e_index=0)
+    dataset.add_an_edge(u, dataset.edges[5]['target'], {'type': 'new'})
+    assert sorted(dataset.get_network([u], return_edge_index=True)['edges']) == _get_ego_network(dataset, [u])[0]
+    # an edge deleted through another dataset sharing the containers
+    other = BuiltinDataset(path_2_data, from_file=False)
+    other.nodes, other.edges, other.adj_list, other.in_adj_list = \
+        dataset.nodes, dataset.edges, dataset.adj_list, dataset.in_adj_list
+    other.delete_an_edge(e_index=dataset.adj_list[u][0])
+    edges = _get_ego_network(dataset, [u])[0]
+    assert sorted(dataset.get_network([u], return_edge_index=True)['edges']) == edges
+    view = dataset.get_csr_view([u])
+    assert len(view['rows']) == len(edges)
+    assert view['node_ids'][view['rows'][0]] == u
+
+
+if __name__ == '__main__':
+    test_ego_network()
+    test_edge_selection()
+    test_changes()
@@ -0,0 +1,81 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+import numpy as np
+from storage import helpers
+from storage.builtin_datasets import BuiltinDataset
+from storage.filters import EdgeFilter, compile_filter
+
+path_2_data = '%s/datasets/preprocessed/rhodes_bombing.json' % path2root
+
+
+def test_compile_filter():
+    dataset = BuiltinDataset(path_2_data)
+    node = list(dataset.nodes)[0]
+    node_type = dataset.nodes[node]['type']
+    for params in (None, {}, {'type': node_type}, {'type': node_type, 'name': dataset.nodes[node].get('name')},
+                   {'type': 'unknown'}, {'unknown': 1}):
+        is_valid = compile_filter(params)
+        for properties in dataset.nodes.values():
+            assert is_valid(properties) == helpers.is_valid_node(properties, params)
+
+
+def test_edge_filter():
+    dataset = BuiltinDataset(path_2_data)
+    edge_type = dataset.edges[0]['properties']['type']
+    dataset.update_an_edge(e_index=1, properties={'type': edge_type, 'weight': 3, 'confidence': 0.5})
+    csr_graph = dataset.get_csr_graph()
+    for params in (None, {'edge_types': [edge_type]}, {'edge_types': [edge_type], 'min_weight': 2},
+                   {'min_confidence': 0.4}, {'edge_types': ['unknown']}, {'source': dataset.edges[0]['source']}):
+        edge_filter = EdgeFilter(params)
+        mask = edge_filter.get_mask(csr_graph, dataset.edges)
+        valid = [edge_filter.is_valid(edge) for edge in dataset.edges]
+        if mask is None:
+            assert all(valid)
+        else:
+            assert mask.tolist() == valid
+    assert np.flatnonzero(EdgeFilter({'min_weight': 2}).get_mask(csr_graph, dataset.edges)).tolist() == [1]
+
+
+if __name__ == '__main__':
+    test_compile_filter()
+    test_edge_filter()
@@ -0,0 +1,100 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from storage.builtin_datasets import BuiltinDatasetsManager
+
+datasets = ['moreno_crime', 'noordintop', 'baseball_steroid_use', 'rhodes_bombing']
+
+
+def _add_datasets(data_manager):
+    for dataset_id in datasets:
+        result = data_manager.add_dataset(dataset_id, dataset_id,
+                                          '%s/datasets/preprocessed/%s.json' % (path2root, dataset_id), lazy=True)
+        assert result['success'] == 1
+
+
+def test_lazy_loading():
+    data_manager = BuiltinDatasetsManager(None, None)
+    _add_datasets(data_manager)
+    assert data_manager.get_metrics()['loads'] == 0
+    network = data_manager.get_network('rhodes_bombing')
+    assert len(network['edges']) > 0
+    assert data_manager.datasets['rhodes_bombing']['data'].edges
+    metrics = data_manager.get_metrics()
+    print('metrics = ', metrics)
+    assert metrics['loads'] == 1 and metrics['hits'] == 1
+    assert metrics['loaded'] == ['rhodes_bombing']
+
+    # a dataset that is not found is not registered
+    result = data_manager.add_dataset('missing', 'missing', '%s/datasets/missing.json' % path2root, lazy=True)
+    assert result['success'] == 0 and 'missing' not in data_manager.datasets
+
+
+def test_eviction():
+    data_manager = BuiltinDatasetsManager(None, None, memory_budget=4)
+    _add_datasets(data_manager)
+    num_edges = {}
+    for dataset_id in datasets:
+        num_edges[dataset_id] = len(data_manager.datasets[dataset_id]['data'].edges)
+    metrics = data_manager.get_metrics()
+    print('metrics = ', metrics)
+    assert metrics['evictions'] > 0
+    assert metrics['loaded'][-1] == datasets[-1]
+    assert metrics['loaded_mb'] <= 4 or len(metrics['loaded']) == 1
+
+    # an unloaded dataset is loaded again, the summary of the unloaded ones is kept
+    assert len(data_manager.datasets[datasets[0]]['data'].edges) == num_edges[datasets[0]]
+    for found in data_manager.search_networks()['found']:
+        assert found['properties']['num_edges'] == num_edges[found['id']]
+
+    # a modified dataset is not unloaded
+    modified = data_manager.datasets['moreno_crime']['data']
+    modified.add_a_node('new_node', {'type': 'person'})
+    for dataset_id in datasets:
+        data_manager.datasets[dataset_id]['data']
+    assert data_manager.datasets['moreno_crime']['data'] is modified
+    assert 'new_node' in data_manager.datasets['moreno_crime']['data'].nodes
+
+
+if __name__ == '__main__':
+    test_lazy_loading()
+    test_eviction()
@@ -0,0 +1,138 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from storage import helpers
+from storage.builtin_datasets import BuiltinDataset, BuiltinDatasetsManager
+
+path_2_data = '%s/datasets/preprocessed/rhodes_bombing.json' % path2root
+indexes = {'keys': ['faction', 'role'], 'text_keys': ['name']}
+
+
+def _scan(dataset, params=None, text=None, prefix=False):
+    """
+    search the nodes by checking all of them
+    """
+    found = set()
+    for node, properties in dataset.nodes.items():
+        if not helpers.is_valid_node(properties, params):
+            continue
+        if text is not None:
+            values = [node, properties.get('name')]
+            values = [v.lower() for v in values if isinstance(v, str)]
+            if prefix and not any(v.startswith(text.lower()) for v in values):
+                continue
+            if not prefix and not any(text.lower() in v for v in values):
+                continue
+        found.add(node)
+    return found
+
+
+def _search(dataset, params=None, text=None, prefix=False):
+    result = dataset.search_nodes(params=params, text=text, prefix=prefix)
+    found = [node['id'] for node in result['found']]
+    assert len(found) == len(set(found))
+    return set(found)
+
+
+def test_indexed_search():
+    dataset = BuiltinDataset(path_2_data, indexes=indexes)
+    node = list(dataset.nodes)[0]
+    properties = dataset.nodes[node]
+    searches = [({'type': 'person'}, None, False),
+                ({'type': 'person', 'faction': properties['faction']}, None, False),
+                ({'faction': properties['faction'], 'role': properties['role'], 'num_resources': 0}, None, False),
+                ({'type': 'not a type'}, None, False),
+                (None, 'xiros', False),
+                (None, 'an', False),
+                (None, 'ALEX', True),
+                ({'type': 'person'}, 'os', False)]
+    for params, text, prefix in searches:
+        found = _search(dataset, params, text, prefix)
+        assert found == _scan(dataset, params, text, prefix)
+    assert dataset.node_index.built
+    assert len(_search(dataset, {'type': 'person'}, 'xiros')) > 0
+
+    # searches of the given nodes keep checking them one by one
+    result = dataset.search_nodes([node, 'not a node'], params={'faction': properties['faction']}, text=node[:3])
+    assert [u['id'] for u in result['found']] == [node] and result['not_found'] == ['not a node']
+
+
+def test_index_maintenance():
+    dataset = BuiltinDataset(path_2_data, indexes=indexes)
+    assert _search(dataset, {'faction': 'new faction'}) == set()
+    node = list(dataset.nodes)[0]
+    dataset.save_nodes({'New_Member': {'type': 'person', 'name': 'Newest Member', 'faction': 'new faction'}})
+    assert _search(dataset, {'faction': 'new faction'}) == {'New_Member'}
+    assert _search(dataset, text='newest') == {'New_Member'}
+
+    # update and rename
+    dataset.update_a_node(node, {'type': 'person', 'name': 'Renamed Member', 'faction': 'new faction'})
+    assert _search(dataset, {'faction': 'new faction'}) == {'New_Member', node}
+    assert dataset.rename_node(node, 'Old_Member')['success'] == 1
+    assert _search(dataset, {'faction': 'new faction'}) == {'New_Member', 'Old_Member'}
+    assert _search(dataset, text=node) == _scan(dataset, text=node)
+    assert dataset.get_edges(['Old_Member'])['found'][0]['edges'] == \
+        [edge for edge in dataset.edges if edge is not None and edge['source'] == 'Old_Member']
+
+    # delete
+    dataset.delete_a_node('New_Member')
+    assert _search(dataset, {'faction': 'new faction'}) == {'Old_Member'}
+    assert _search(dataset, text='newest') == set()
+
+    # nodes added directly are indexed again
+    dataset.nodes['Direct_Member'] = {'type': 'person', 'faction': 'new faction'}
+    assert _search(dataset, {'faction': 'new faction'}) == {'Old_Member', 'Direct_Member'}
+
+
+def test_configured_indexes():
+    data_manager = BuiltinDatasetsManager(None, None)
+    data_manager.add_dataset('rhodes_bombing', 'rhodes_bombing', path_2_data, settings={'indexes': indexes},
+                             lazy=True)
+    assert data_manager.datasets['rhodes_bombing']['data'].node_index.keys == ['type', 'faction', 'role']
+    result = data_manager.search_nodes(None, 'rhodes_bombing', text='xiros')
+    assert len(result['found']) > 0
+
+
+if __name__ == '__main__':
+    test_indexed_search()
+    test_index_maintenance()
+    test_configured_indexes()
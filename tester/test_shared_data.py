@@ -0,0 +1,93 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+from storage.builtin_datasets import BuiltinDatasetsManager
+
+path_2_data = '%s/datasets/preprocessed/911_hijackers.json' % path2root
+
+
+def _load():
+    manager = BuiltinDatasetsManager(None, None)
+    manager.add_dataset('911_hijackers', '911 Hijackers', path_2_data)
+    dataset = manager.datasets['911_hijackers']['data']
+    active_network = manager.load_active_network(network_id='911_hijackers', initialize=False)['active_network']
+    return dataset, active_network
+
+
+def _build_indexes(dataset):
+    # the indexes are built before the change
+    edge = dataset.edges[0]
+    dataset.find_edge_indexes(edge['source'], edge['target'])
+    dataset.get_network([edge['source']])
+    dataset.get_degree(edge['source'])
+    dataset.get_weight_range()
+
+
+def test_change_through_active_network():
+    dataset, active_network = _load()
+    _build_indexes(dataset)
+    _build_indexes(active_network)
+    s, t = dataset.edges[0]['source'], dataset.edges[0]['target']
+    assert active_network.update_an_edge(e_index=0, properties={'type': 'NEWTYPE', 'weight': 1000})['success'] == 1
+    for network in (dataset, active_network):
+        assert network.find_edge_indexes(s, t, ['NEWTYPE']) == [0]
+        assert len(network.get_network([s], {'edge_types': ['NEWTYPE']})['edges']) == 1
+        assert network.get_degree(s, 'out', edge_type='NEWTYPE') == 1
+        assert network.get_weight_range()[1] == 1000
+
+
+def test_change_through_dataset():
+    dataset, active_network = _load()
+    _build_indexes(dataset)
+    _build_indexes(active_network)
+    s = dataset.edges[0]['source']
+    dataset.add_a_node('new_node', {'type': 'person', 'name': 'new'})
+    assert dataset.add_an_edge(s, 'new_node', {'type': 'NEWTYPE', 'weight': 1000})['success'] == 1
+    assert active_network.find_edge_index(s, 'new_node') == len(dataset.edges) - 1
+    assert active_network.get_degree('new_node', 'in', edge_type='NEWTYPE') == 1
+    assert active_network.get_weight_range()[1] == 1000
+    assert active_network.search_nodes(params={'type': 'person'}, text='new')['found'][0]['id'] == 'new_node'
+
+
+if __name__ == '__main__':
+    test_change_through_active_network()
+    test_change_through_dataset()
@@ -0,0 +1,99 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+import tempfile
+import threading
+import analyzer.similarity_search as similarity_search
+from analyzer.embedding_store import EmbeddingStore
+
+
+def _get_network(pairs):
+    return {'edges': [{'source': u, 'target': v, 'properties': {'weight': 1}} for u, v in pairs]}
+
+
+pairs = [('a', 'b'), ('b', 'c'), ('c', 'd'), ('d', 'a'), ('a', 'c'), ('d', 'e'), ('e', 'f'), ('f', 'x'), ('x', 'a'),
+         ('x', 'b')]
+
+
+def test_new_version():
+    with tempfile.TemporaryDirectory() as root_dir:
+        store = EmbeddingStore(root_dir)
+        network = _get_network(pairs)
+        index = similarity_search.get_index(network, 'svd', {'K': 2}, num_lists=1, store=store, dataset_id='data')
+        assert 'x' in index.node_index
+        # the same version reuses the index
+        assert similarity_search.get_index(network, 'svd', {'K': 2}, num_lists=1, store=store,
+                                           dataset_id='data') is index
+        # a new version without x gets a new index without x
+        network = _get_network([(u, v) for u, v in pairs if 'x' not in (u, v)])
+        new_index = similarity_search.get_index(network, 'svd', {'K': 2}, num_lists=1, store=store,
+                                                dataset_id='data')
+        assert new_index is not index
+        assert 'x' not in new_index.node_index
+        assert len(new_index) == 6
+        neighbors = new_index.query_nodes(['a'], top_k=10)['a']
+        assert 'x' not in [v for v, score in neighbors]
+        # the previous index is unchanged, it may still be queried
+        assert 'x' in index.node_index
+
+
+def test_cache_bound():
+    with tempfile.TemporaryDirectory() as root_dir:
+        store = EmbeddingStore(root_dir)
+        network = _get_network(pairs)
+        max_num_indexes = similarity_search.max_num_indexes
+        similarity_search.max_num_indexes = 3
+        try:
+            threads = [threading.Thread(target=similarity_search.get_index,
+                                        args=(network, 'svd', {'K': 2}, 1, store, 'data_%d' % i)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(similarity_search._indexes) <= 3
+        finally:
+            similarity_search.max_num_indexes = max_num_indexes
+
+
+if __name__ == '__main__':
+    test_new_version()
+    test_cache_bound()
@@ -0,0 +1,108 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+import io
+import gzip
+import tempfile
+from storage.builtin_datasets import BuiltinDataset, BuiltinDatasetsManager
+from storage import json_lines
+
+path_2_data = '%s/datasets/preprocessed/moreno_crime.json' % path2root
+
+
+def test_writer_chunks():
+    records = [{'id': i, 'type': 'node', 'properties': {'name': 'node %d' % i}} for i in range(1000)]
+    for num_threads in (1, 4):
+        output = io.BytesIO()
+        with json_lines.JsonLinesWriter(output, compression='gzip', num_threads=num_threads,
+                                        chunk_size=1000) as writer:
+            for record in records:
+                writer.write(record)
+        stats = writer.stats.to_dict()
+        # every chunk is a gzip member, in the order of the records
+        assert stats['chunks'] > 10
+        assert stats['records'] == len(records)
+        assert stats['written_bytes'] == len(output.getvalue())
+        lines = gzip.decompress(output.getvalue()).splitlines()
+        assert stats['bytes'] == sum([len(line) + 1 for line in lines])
+        assert [json_lines.loads(line) for line in lines] == records
+
+
+def test_dump_and_load():
+    dataset = BuiltinDataset(path_2_data)
+    with tempfile.TemporaryDirectory() as output_dir:
+        for compressed in (None, 'gzip'):
+            name = 'dump_%s.json' % compressed
+            params = {'output_format': 'json', 'compressed': compressed, 'num_threads': 2}
+            assert dataset.dump_network(name, output_dir, params) == 1
+            print('dump stats = ', dataset.dump_stats)
+            assert dataset.dump_stats['records'] == len(dataset.nodes) + len(dataset.edges)
+            # the file exists
+            assert dataset.dump_network(name, output_dir, params) == 0
+            loaded = BuiltinDataset(os.path.join(output_dir, name), snapshot=False)
+            assert loaded.nodes == dataset.nodes
+            assert loaded.edges == dataset.edges
+            assert loaded.adj_list == dataset.adj_list
+
+
+def test_save_data():
+    manager = BuiltinDatasetsManager(None, None)
+    manager.add_dataset('moreno_crime', 'Moreno Crime', path_2_data)
+    manager.datasets['moreno_crime']['data'].delete_an_edge(e_index=0)
+    active_network = manager.load_active_network(network_id='moreno_crime', initialize=False)['active_network']
+    with tempfile.TemporaryDirectory() as output_dir:
+        save_path = os.path.join(output_dir, 'saved.json.gz')
+        result = manager.save_data(save_path, active_network=active_network, params={'compressed': True})
+        assert result['success'] == 1
+        assert result['stats']['compression'] == 'gzip'
+        loaded = manager.load_active_network(from_file=True, file_path=save_path,
+                                             initialize=False)['active_network']
+        # the deleted edge keeps its place
+        assert loaded.edges == active_network.edges
+        assert loaded.nodes == active_network.nodes
+        assert manager.save_data(save_path, network='unknown')['success'] == 0
+
+
+if __name__ == '__main__':
+    test_writer_chunks()
+    test_dump_and_load()
+    test_save_data()
@@ -0,0 +1,144 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+import datetime
+import numpy as np
+from storage.builtin_datasets import BuiltinDataset
+from storage.temporal_index import to_time
+
+path_2_data = '%s/datasets/preprocessed/moreno_crime.json' % path2root
+day = 24 * 3600
+
+
+def _load_dataset():
+    # the edges get a date in the first half of 2020, one in ten has none
+    dataset = BuiltinDataset(path_2_data)
+    for e_index, edge in enumerate(dataset.edges):
+        if e_index % 10 != 9:
+            date = datetime.date(2020, 1, 1) + datetime.timedelta(days=(e_index * 7) % 182)
+            edge['properties']['timestamp'] = '%s 00:00:00' % date.isoformat()
+    return dataset
+
+
+def _get_expected(dataset, start, end, params=None):
+    start, end = to_time(start), to_time(end)
+    expected = []
+    for e_index, edge in enumerate(dataset.edges):
+        if edge is None or 'timestamp' not in edge['properties']:
+            continue
+        if start <= to_time(edge['properties']['timestamp']) < end:
+            if params is None or edge['properties'].get('type') in params['edge_types']:
+                expected.append(e_index)
+    return expected
+
+
+def test_to_time():
+    assert to_time(5) == 5.0
+    assert to_time('2020-01-02') - to_time('2020-01-01 00:00:00') == day
+    assert to_time(datetime.date(2020, 1, 1)) == to_time('2020-01-01')
+    assert np.isnan(to_time('not a date'))
+    assert np.isnan(to_time(None))
+
+
+def test_time_range():
+    dataset = _load_dataset()
+    network = dataset.get_network(time_range=('2020-02-01', '2020-03-01'), as_arrays=True)
+    assert sorted(network['edges'].tolist()) == _get_expected(dataset, '2020-02-01', '2020-03-01')
+    # the edges are a slice of the index, not a copy
+    assert np.shares_memory(network['edges'], dataset.get_temporal_index().e_indexes)
+    ends = set([dataset.edges[e][end] for e in network['edges'].tolist() for end in ('source', 'target')])
+    assert set(network['nodes']) == ends
+    # open ranges and edge criteria
+    assert len(dataset.get_network(time_range=(None, None), return_edge_index=True)['edges']) == \
+        len([edge for edge in dataset.edges if 'timestamp' in edge['properties']])
+    params = {'edge_types': ['Suspect']}
+    network = dataset.get_network(params=params, time_range=('2020-03-01', None), return_edge_index=True)
+    assert sorted(network['edges']) == _get_expected(dataset, '2020-03-01', '2021-01-01', params)
+    # the ego-network of a node only follows the edges in the range
+    node = dataset.edges[0]['source']
+    network = dataset.get_network([node], time_range=('2020-01-01', '2020-02-01'), return_edge_index=True)
+    in_range = set(_get_expected(dataset, '2020-01-01', '2020-02-01'))
+    assert set(network['edges']) <= in_range
+    assert set([e for e in dataset.adj_list[node] if e in in_range]) <= set(network['edges'])
+
+
+def test_windows():
+    dataset = _load_dataset()
+    windows = list(dataset.iter_time_windows(datetime.timedelta(days=30), start='2020-01-01', end='2020-07-01',
+                                             as_arrays=True))
+    assert len(windows) == 7
+    seen = []
+    for window_start, window_end, network in windows:
+        assert window_end - window_start == 30 * day
+        assert sorted(network['edges'].tolist()) == _get_expected(dataset, window_start, window_end)
+        seen.extend(network['edges'].tolist())
+    assert sorted(seen) == _get_expected(dataset, '2020-01-01', '2021-01-01')
+    # overlapping windows, from the first to the last time
+    windows = list(dataset.iter_time_windows(60 * day, step=30 * day, return_edge_index=True))
+    assert windows[0][0] == to_time('2020-01-01')
+    assert windows[-1][0] <= to_time('2020-06-30') < windows[-1][1]
+    for window_start, window_end, network in windows:
+        assert sorted(network['edges']) == _get_expected(dataset, window_start, window_end)
+
+
+def test_changes():
+    dataset = _load_dataset()
+    time_range = ('2021-01-01', '2021-02-01')
+    assert dataset.get_network(time_range=time_range)['edges'] == []
+    dataset.update_an_edge(e_index=0, properties={'timestamp': '2021-01-15'})
+    result = dataset.add_an_edge(dataset.edges[1]['source'], dataset.edges[1]['target'],
+                                 {'type': 'new', 'timestamp': '2021-01-20'})
+    assert result['success'] == 1
+    network = dataset.get_network(time_range=time_range, return_edge_index=True)
+    assert network['edges'] == [0, len(dataset.edges) - 1]
+    dataset.delete_an_edge(e_index=0)
+    assert dataset.get_network(time_range=time_range, return_edge_index=True)['edges'] == [len(dataset.edges) - 1]
+    dataset.undo()
+    assert dataset.get_network(time_range=time_range, return_edge_index=True)['edges'] == \
+        [0, len(dataset.edges) - 1]
+
+
+if __name__ == '__main__':
+    test_to_time()
+    test_time_range()
+    test_windows()
+    test_changes()
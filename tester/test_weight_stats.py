@@ -0,0 +1,129 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+"""
+import os
+import sys
+
+# find path to root directory of the project so as to import from other packages
+tokens = os.path.abspath(__file__).split('/')
+# print('tokens = ', tokens)
+path2root = '/'.join(tokens[:-2])
+# print('path2root = ', path2root)
+if path2root not in sys.path:
+    sys.path.append(path2root)
+
+import base64
+import json
+from storage.builtin_datasets import ActiveNetwork, BuiltinDataset
+from storage.weight_stats import WeightStats
+
+path_2_data = '%s/datasets/preprocessed/israel_lea_case1_speakers.json' % path2root
+
+
+def _get_expected_range(dataset):
+    weights = [edge['properties']['weight'] for edge in dataset.edges if edge is not None]
+    return min(weights), max(weights)
+
+
+def _check_elements(network):
+    min_weight, max_weight = network.get_weight_range()
+    assert network.weight_range == (min_weight, max_weight)
+    for e_index, info in network.active_edges.items():
+        data = network.elements[info['element_index']]['data']
+        weight = network.edges[e_index]['properties']['weight']
+        assert abs(data['normalized_weight'] - (weight - min_weight) / (max_weight - min_weight)) < 1e-9
+
+
+def test_weight_range():
+    dataset = BuiltinDataset(path_2_data)
+    assert dataset.get_weight_range() == _get_expected_range(dataset)
+    nodes = list(dataset.nodes)
+    dataset.add_an_edge(nodes[0], nodes[1], {'type': 'new_call', 'weight': 100.0})
+    assert dataset.get_weight_range() == (1.0, 100.0)
+    e_index = min([e for e, edge in enumerate(dataset.edges) if edge['properties']['weight'] == 1.0])
+    dataset.update_an_edge(e_index=e_index, properties={'weight': 0.5})
+    assert dataset.get_weight_range() == (0.5, 100.0)
+    dataset.delete_an_edge(e_index=len(dataset.edges) - 1)
+    assert dataset.get_weight_range() == _get_expected_range(dataset)
+    # the counts are the same as built again
+    expected = WeightStats(dataset)
+    expected.build()
+    assert dataset.weight_stats.counts == expected.counts
+    while dataset.undo()['success'] == 1:
+        pass
+    assert dataset.get_weight_range() == _get_expected_range(dataset) == (1.0, 29.0)
+
+
+def test_rescale():
+    network = ActiveNetwork(path_2_data)
+    nodes = list(network.nodes)
+    network.initialize(nodes[:5])
+    _check_elements(network)
+    # the range does not change, no element is rewritten
+    network.expand_nodes(list(network.active_nodes))
+    assert network.rescale_edge_weights() == 0
+    _check_elements(network)
+    # a larger weight rescales every edge
+    source, target = list(network.active_nodes)[:2]
+    network.add_an_active_edge(source, target, {'type': 'new_call', 'weight': 58.0})
+    assert network.weight_range == (1.0, 58.0)
+    _check_elements(network)
+    e_index = len(network.edges) - 1
+    network.update_an_active_edge(e_index, {'weight': 20.0})
+    assert network.weight_range == (1.0, 29.0)
+    _check_elements(network)
+
+
+
+def _get_upload(edges):
+    # content of an uploaded JSON-lines network, as given by the upload component
+    nodes = sorted(set([u for edge in edges for u in edge]))
+    lines = [{'type': 'node', 'id': u, 'properties': {'type': 'person', 'name': u}} for u in nodes]
+    lines += [{'type': 'edge', 'source': source, 'target': target, 'properties': {'type': 'call', 'weight': weight}}
+              for (source, target), weight in edges.items()]
+    content = '\n'.join([json.dumps(line) for line in lines])
+    return 'data:application/octet-stream;base64,' + base64.b64encode(content.encode('utf-8')).decode('utf-8')
+
+
+def test_upload():
+    network = ActiveNetwork(path_2_data=None, from_file=False, initialize=False)
+    network.deserialize_network(_get_upload({('a', 'b'): 1, ('b', 'c'): 2}))
+    assert network.get_weight_range() == (1, 2)
+    # another network with as many edges
+    network.deserialize_network(_get_upload({('a', 'b'): 10, ('b', 'c'): 20}))
+    assert network.get_weight_range() == (10, 20)
+    _check_elements(network)
+
+
+if __name__ == '__main__':
+    test_weight_range()
+    test_rescale()
+    test_upload()
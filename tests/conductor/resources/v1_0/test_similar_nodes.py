@@ -0,0 +1,71 @@
+"""
+=================================== LICENSE ==================================
+Copyright (c) 2021, Consortium Board ROXANNE
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+Redistributions of source code must retain the above copyright
+notice, this list of conditions and the following disclaimer.
+
+Redistributions in binary form must reproduce the above copyright
+notice, this list of conditions and the following disclaimer in the
+documentation and/or other materials provided with the distribution.
+
+Neither the name of the ROXANNE nor the
+names of its contributors may be used to endorse or promote products
+derived from this software without specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY CONSORTIUM BOARD ROXANNE ``AS IS'' AND ANY
+EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL CONSORTIUM BOARD TENCOMPETENCE BE LIABLE FOR ANY
+DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+(INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+==============================================================================
+==============================================================================
+
+ Unit tests for similar nodes resource """
+import pytest
+from falcon.testing import TestClient
+from conductor.src.auth_models import User
+
+
+@pytest.fixture
+def prepared_dataset(prepared_user: User):
+    """ Create dataset to do similarity queries on """
+    prepared_user.create_dataset("data", "stuff", None, from_file=False)
+    dataset = prepared_user.get_dataset("data")
+    dataset.save_nodes({
+        "Satam_Suqami": {"type": "person", "name": "Satam Suqami"},
+        "Majed_Moqed": {"type": "person", "name": "Majed Moqed"},
+        "Khalid_Al-Mihdhar": {"type": "person", "name": "Khalid Al-Mihdhar"},
+        "Nawaf_Alhazmi": {"type": "person", "name": "Nawaf Alhazmi"}
+    })
+    dataset.save_edges([
+        {"source": "Majed_Moqed", "target": "Khalid_Al-Mihdhar", "properties": {"type": "prior_contact", "observed": True, "weight": 1}},
+        {"source": "Khalid_Al-Mihdhar", "target": "Nawaf_Alhazmi", "properties": {"type": "prior_contact", "observed": True, "weight": 1}},
+        {"source": "Nawaf_Alhazmi", "target": "Satam_Suqami", "properties": {"type": "prior_contact", "observed": True, "weight": 1}},
+        {"source": "Satam_Suqami", "target": "Majed_Moqed", "properties": {"type": "prior_contact", "observed": True, "weight": 1}}
+    ])
+    return dataset
+
+
+def test_similar_nodes_resource_should_return_top_k_nodes_on_post_request(client: TestClient, prepared_header, prepared_dataset, prepared_user: User):
+    """ post request with node ids on similar nodes resource should return the most similar nodes """
+    payload = {
+        "nodes": ["Majed_Moqed"],
+        "top_k": 2,
+        "options": {"method": "exact", "parameters": {"embedding_method": "svd", "K": 2}}
+    }
+    response = client.simulate_post("/v1.0/datasets/data/similar_nodes", headers=prepared_header, json=payload)
+    print(response.json)
+    neighbors = response.json["neighbors"]["Majed_Moqed"]
+    assert len(neighbors) == 2
+    assert all(n["id"] != "Majed_Moqed" for n in neighbors)
+    assert neighbors[0]["similarity"] >= neighbors[1]["similarity"]
@@ -101,13 +101,13 @@ DATA_INFO = {d['id']: {'path': d['path'], 'name': d['name']} for d in DATASETS +
 
 
 # ADD DATASETS TO DATASET MANAGER
-# Technically not all datasets need to be loaded -
-# Maybe just load the one set needed for retrieving entities when network is chosen.
-builtin_datasets = BuiltinDatasetsManager(connector=None, params=None)
+# The datasets are loaded when a network is chosen, and unloaded again when they are not used.
+DATASETS_MEMORY_BUDGET = 512  # MB
+builtin_datasets = BuiltinDatasetsManager(connector=None, params=None, memory_budget=DATASETS_MEMORY_BUDGET)
 for ds in DATASETS:
-    builtin_datasets.add_dataset(ds['id'], ds['name'], ds['path'])
+    builtin_datasets.add_dataset(ds['id'], ds['name'], ds['path'], snapshot=True, lazy=True)
 for ds in EXTERNAL_DATASETS:
-    builtin_datasets.add_dataset(ds['id'], ds['name'], ds['path'])
+    builtin_datasets.add_dataset(ds['id'], ds['name'], ds['path'], snapshot=True, lazy=True)
 
 
 # LAYOUT USED FOR CYTOSCAPE VISUALIZATION
@@ -319,7 +319,8 @@ def main_callback(*args):
             try:
                 active_network = ActiveNetwork(path_2_data=DATA_INFO[callback_kwargs['network_selection']]['path'],
                                                initialize=True, selected_nodes=callback_kwargs['entities'],
-                                               params={'network_name': DATA_INFO[callback_kwargs['network_selection']]['name']})
+                                               params={'network_name': DATA_INFO[callback_kwargs['network_selection']]['name']},
+                                               snapshot=True)
 
                 node_table, edge_table, label_table = get_interaction_tables(active_network)
                 network_info = dash_formatter.dash_network_info(active_network.get_active_network_info())
@@ -719,7 +720,8 @@ def main_callback(*args):
                 edge_interaction_table.append(dash_formatter.get_element_interaction_row(edge_type, 'edge'))
             network_info = dash_formatter.dash_network_info(active_network.get_active_network_info())
             node_infos = []
-            if active_network.node_label_field not in active_network.elements[0]['data']['info']:
+            node_element = next(e for e in active_network.elements if e['group'] == 'nodes')
+            if active_network.node_label_field not in node_element['data']['info']:
                 active_network.node_label_field = 'id'
             labels = [active_network.node_label_field]
             for e in active_network.elements:
@@ -777,7 +779,8 @@ def main_callback(*args):
         try:
             active_network = ActiveNetwork(path_2_data=DATA_INFO[callback_kwargs['network_selection']]['path'],
                                            initialize=True, selected_nodes=callback_kwargs['entities'],
-                                           params={'network_name': DATA_INFO[callback_kwargs['network_selection']]['name']})
+                                           params={'network_name': DATA_INFO[callback_kwargs['network_selection']]['name']},
+                                           snapshot=True)
 
             node_interaction_table = dash_formatter.get_node_interaction_table()
             edge_interaction_table = dash_formatter.get_edge_interaction_table()
@@ -787,7 +790,8 @@ def main_callback(*args):
                 edge_interaction_table.append(dash_formatter.get_element_interaction_row(edge_type, 'edge'))
             network_info = dash_formatter.dash_network_info(active_network.get_active_network_info())
             node_infos = []
-            if active_network.node_label_field not in active_network.elements[0]['data']['info']:
+            node_element = next(e for e in active_network.elements if e['group'] == 'nodes')
+            if active_network.node_label_field not in node_element['data']['info']:
                 active_network.node_label_field = 'id'
             labels = [active_network.node_label_field]
             for e in active_network.elements:
@@ -840,7 +844,8 @@ def main_callback(*args):
                 edge_interaction_table.append(dash_formatter.get_element_interaction_row(edge_type, 'edge'))
             network_info = dash_formatter.dash_network_info(active_network.get_active_network_info())
             node_infos = []
-            if active_network.node_label_field not in active_network.elements[0]['data']['info']:
+            node_element = next(e for e in active_network.elements if e['group'] == 'nodes')
+            if active_network.node_label_field not in node_element['data']['info']:
                 active_network.node_label_field = 'id'
             labels = [active_network.node_label_field]
             for e in active_network.elements:
@@ -1411,7 +1416,8 @@ def get_interaction_tables(active_network):
         edge_interaction_table.append(dash_formatter.get_element_interaction_row(edge_type, 'edge'))
     network_info = dash_formatter.dash_network_info(active_network.get_active_network_info())
     node_infos = []
-    if active_network.node_label_field not in active_network.elements[0]['data']['info']:
+    node_element = next(e for e in active_network.elements if e['group'] == 'nodes')
+    if active_network.node_label_field not in node_element['data']['info']:
         active_network.node_label_field = 'id'
     labels = [active_network.node_label_field]
     for e in active_network.elements: